@@ -1,6 +1,6 @@
 "use client";
 
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { Plus, Search, Filter, Loader2, StickyNote, Trash2, Calendar, Pencil } from "lucide-react";
 import { useState } from "react";
 import api from "@/lib/api";
@@ -18,6 +18,11 @@ interface Note {
   createdAt?: string;
 }
 
+interface NoteListPage {
+  items: Note[];
+  next_cursor: string | null;
+}
+
 export default function NotesPage() {
   const [isDrawerOpen, setIsDrawerOpen] = useState(false);
   const [selectedNote, setSelectedNote] = useState<Note | null>(null);
@@ -30,14 +35,19 @@ export default function NotesPage() {
   
   const queryClient = useQueryClient();
 
-  // 1. Fetch Notes
-  const { data: notes, isLoading, isError, error } = useQuery<Note[]>({
+  // 1. Fetch Notes, one page at a time (pinned first, newest first)
+  const { data, isLoading, isError, error, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
     queryKey: ["notes"],
-    queryFn: async () => {
-      const response = await api.get("/notes/");
+    queryFn: async ({ pageParam }): Promise<NoteListPage> => {
+      const params = new URLSearchParams({ include_content: "true" });
+      if (pageParam) params.set("cursor", pageParam);
+      const response = await api.get(`/notes/?${params}`);
       return response.data;
-    }
+    },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor
   });
+  const notes = data?.pages.flatMap((page) => page.items);
 
   // 2. Fetch Companies & People for Relation
   const { data: companies } = useQuery<Array<{id: string, _id?: string, name: string}>>({
@@ -226,6 +236,18 @@ export default function NotesPage() {
             ))}
           </div>
         )}
+        {hasNextPage && (
+          <div className="flex justify-center">
+            <button
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="text-brand-primary hover:underline text-sm font-bold flex items-center gap-2 disabled:opacity-50"
+            >
+              {isFetchingNextPage && <Loader2 size={16} className="animate-spin" />}
+              Load more notes
+            </button>
+          </div>
+        )}
       </div>
 
       {/* SlideOver Form */}
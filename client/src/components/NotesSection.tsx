@@ -1,6 +1,6 @@
 "use client";
 
-import { useQuery, useMutation, useQueryClient } from "@tanstack/react-query";
+import { useInfiniteQuery, useMutation, useQueryClient } from "@tanstack/react-query";
 import { MessageCircle, Plus, Trash2, Loader2, Pin } from "lucide-react";
 import { useState } from "react";
 import api from "@/lib/api";
@@ -14,6 +14,11 @@ interface Note {
   created_at: string;
 }
 
+interface NoteListPage {
+  items: Note[];
+  next_cursor: string | null;
+}
+
 interface NotesSectionProps {
   relatedToType: string;
   relatedToId: string;
@@ -24,17 +29,21 @@ export default function NotesSection({ relatedToType, relatedToId }: NotesSectio
   const [newNoteContent, setNewNoteContent] = useState("");
   const queryClient = useQueryClient();
 
-  // Fetch Notes
-  const { data: notes, isLoading, isError, refetch } = useQuery<Note[]>({
+  // Fetch Notes, one page at a time (pinned first, newest first)
+  const { data, isLoading, isError, refetch, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
     queryKey: ["notes", relatedToType, relatedToId],
-    queryFn: async () => {
-      if (!relatedToId) return [];
-      const response = await api.get(`/notes/?related_to_type=${relatedToType}&related_to_id=${relatedToId}`);
+    queryFn: async ({ pageParam }): Promise<NoteListPage> => {
+      const params = new URLSearchParams({ related_to_type: relatedToType, related_to_id: relatedToId, include_content: "true" });
+      if (pageParam) params.set("cursor", pageParam);
+      const response = await api.get(`/notes/?${params}`);
       return response.data;
     },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor,
     enabled: !!relatedToId,
     retry: 1
   });
+  const notes = data?.pages.flatMap((page) => page.items);
 
   // Create Note Mutation
   const createMutation = useMutation({
@@ -143,7 +152,7 @@ export default function NotesSection({ relatedToType, relatedToId }: NotesSectio
         </div>
       ) : (
         <div className="space-y-4">
-          {notes?.sort((a, b) => (Number(b.is_pinned) - Number(a.is_pinned))).map((note) => {
+          {notes?.map((note) => {
              const noteId = note.id || note._id;
              if (!noteId) return null;
              return (
@@ -171,6 +180,16 @@ export default function NotesSection({ relatedToType, relatedToId }: NotesSectio
               </div>
             );
           })}
+          {hasNextPage && (
+            <button
+              onClick={() => fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="w-full text-xs text-brand-primary hover:text-brand-accent font-bold py-2 rounded-full bg-brand-primary/10 transition-colors disabled:opacity-50 flex items-center justify-center gap-1"
+            >
+              {isFetchingNextPage && <Loader2 size={12} className="animate-spin" />}
+              Load more
+            </button>
+          )}
         </div>
       )}
     </div>
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Query
+from typing import Optional
+from pymongo import DESCENDING
+from app.models.activity import Activity
+from app.schemas.activity import ActivityOut
+from app.schemas.common import CursorPage
+from app.core.pagination import decode_cursor, after_cursor, cursor_page
+
+router = APIRouter()
+
+ACTIVITY_SORT = [("_id", DESCENDING)]
+
+@router.get("/", response_model=CursorPage[ActivityOut])
+async def list_activity(
+    entity_type: Optional[str] = Query(None, description="company, person, product, deal, task, note or lead"),
+    owner_id: Optional[str] = None,
+    created_by: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Recent creates, updates and deletes across the CRM, newest first."""
+    query = {}
+    if entity_type:
+        query["entity_type"] = entity_type
+    if owner_id:
+        query["owner_id"] = owner_id
+    if created_by:
+        query["created_by"] = created_by
+    if cursor:
+        query.update(after_cursor(ACTIVITY_SORT, decode_cursor(cursor)))
+    
+    rows = await Activity.get_motor_collection().find(query).sort("_id", -1).limit(limit + 1).to_list(limit + 1)
+    items, next_cursor = cursor_page(rows, limit, ACTIVITY_SORT)
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from pymongo import DESCENDING
+from app.models.audit_entry import AuditEntry
+from app.schemas.audit import AuditEntryOut
+from app.schemas.common import CursorPage
+from app.core.pagination import decode_cursor, after_cursor, cursor_page
+from app.core.projection import to_jsonable
+
+router = APIRouter()
+
+AUDIT_SORT = [("_id", DESCENDING)]
+
+@router.get("/", response_model=CursorPage[AuditEntryOut])
+async def list_audit_entries(
+    entity_type: Optional[str] = Query(None, description="company, person, product, deal, task, note or lead"),
+    entity_id: Optional[str] = None,
+    actor: Optional[str] = Query(None, description="Email of the user who made the changes"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Change history of one entity (entity_type + entity_id) or one user (actor), newest first."""
+    if entity_id and not entity_type:
+        raise HTTPException(status_code=400, detail="entity_id needs entity_type")
+    query = {}
+    if entity_type:
+        query["entity_type"] = entity_type
+    if entity_id:
+        query["entity_id"] = entity_id
+    if actor:
+        query["actor"] = actor
+    if cursor:
+        query.update(after_cursor(AUDIT_SORT, decode_cursor(cursor)))
+    
+    rows = await AuditEntry.get_motor_collection().find(query).sort("_id", -1).limit(limit + 1).to_list(limit + 1)
+    items, next_cursor = cursor_page(rows, limit, AUDIT_SORT)
+    # Old/new values are stored as written (ObjectIds, UUIDs, ...)
+    return {"items": to_jsonable(items), "next_cursor": next_cursor}
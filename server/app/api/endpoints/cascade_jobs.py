@@ -0,0 +1,30 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List, Optional
+from app.models.cascade_job import CascadeJob
+from app.core.cascade import ENTITY_MODELS
+
+router = APIRouter()
+
+@router.get("/", response_model=List[CascadeJob])
+async def list_cascade_jobs(
+    status: Optional[str] = None,
+    entity_type: Optional[str] = Query(None, description=f"One of: {', '.join(ENTITY_MODELS)}"),
+    entity_id: Optional[str] = None,
+    limit: int = Query(50, le=500),
+):
+    query = {}
+    if status:
+        query["status"] = status
+    if entity_type:
+        query["entity_type"] = entity_type
+    if entity_id:
+        query["entity_id"] = entity_id
+    return await CascadeJob.find(query).sort("-created_at").limit(limit).to_list()
+
+@router.get("/{id}", response_model=CascadeJob)
+async def get_cascade_job(id: str):
+    """Progress of one cleanup job: status plus per-collection processed counts."""
+    job = await CascadeJob.get(id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Cascade job not found")
+    return job
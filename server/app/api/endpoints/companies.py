@@ -1,7 +1,16 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional
 from app.models.company import Company
 from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyOut
+from app.schemas.common import BatchGetRequest, BatchGetResponse
+from app.core.batch import fetch_by_ids, split_ids
+from app.core.activity import record_activity
+from app.core.audit import record_audit, current_actor
+from app.core.cascade import create_cascade_job, cascade_worker
+from app.core.company_cache import company_cache
+from app.core.company_names import company_renames
+from app.core.projection import parse_fields, find_projected, get_projected, projected_response
+from app.core.updates import update_fields_with_previous
 from beanie import PydanticObjectId
 
 router = APIRouter()
@@ -10,36 +19,66 @@ router = APIRouter()
 async def create_company(company_in: CompanyCreate):
     company = Company(**company_in.dict())
     await company.insert()
+    await record_activity("create", company)
     return company
 
 @router.get("/", response_model=List[CompanyOut])
 async def list_companies(
     skip: int = 0, 
     limit: int = 100,
-    industry: Optional[str] = None
+    industry: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
     query = {}
     if industry:
         query["industry"] = industry
     
+    field_names = parse_fields(fields, CompanyOut)
+    if field_names:
+        return projected_response(await find_projected(Company, query, field_names, skip=skip, limit=limit))
+    
     companies = await Company.find(query).skip(skip).limit(limit).to_list()
     return companies
 
+@router.get("/batch", response_model=BatchGetResponse[CompanyOut])
+async def batch_get_companies(
+    ids: str = Query(..., description="Comma-separated company ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    return await fetch_by_ids(Company, split_ids(ids), CompanyOut, fields=fields)
+
+@router.post("/batch", response_model=BatchGetResponse[CompanyOut])
+async def batch_get_companies_by_body(body: BatchGetRequest):
+    # Same as GET /batch, for id sets too large for a query string
+    return await fetch_by_ids(Company, body.ids, CompanyOut, fields=body.fields)
+
 @router.get("/{id}", response_model=CompanyOut)
-async def get_company(id: str):
+async def get_company(id: str, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    field_names = parse_fields(fields, CompanyOut)
+    if field_names:
+        row = await get_projected(Company, id, field_names)
+        if not row:
+            raise HTTPException(status_code=404, detail="Company not found")
+        return projected_response(row)
+    
     company = await Company.get(id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     return company
 
 @router.put("/{id}", response_model=CompanyOut)
-async def update_company(id: str, company_in: CompanyUpdate):
-    company = await Company.get(id)
-    if not company:
-        raise HTTPException(status_code=404, detail="Company not found")
-    
+async def update_company(id: str, company_in: CompanyUpdate, actor: Optional[str] = Depends(current_actor)):
     update_data = company_in.dict(exclude_unset=True)
-    await company.update({"$set": update_data})
+    # Returns the company as stored after the update, plus the raw pre-update copy for the audit diff
+    result = await update_fields_with_previous(Company, id, update_data)
+    if not result:
+        raise HTTPException(status_code=404, detail="Company not found")
+    before, company = result
+    await record_audit(Company, company.id, before, update_data, actor)
+    if "name" in update_data:
+        # People, deals and products carry a company_name snapshot; refresh it in the background
+        company_renames.enqueue(company.id)
+    await record_activity("update", company, update_data)
     return company
 
 @router.delete("/{id}")
@@ -47,5 +86,10 @@ async def delete_company(id: str):
     company = await Company.get(id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
+    job = await create_cascade_job("company", company.id)
     await company.delete()
-    return {"message": "Company deleted successfully"}
+    company_cache.invalidate(company.id)
+    await record_activity("delete", company)
+    # People, deals, notes etc. that referenced it are cleaned up in the background
+    cascade_worker.enqueue(job.id)
+    return {"message": "Company deleted successfully", "cascade_job_id": str(job.id)}
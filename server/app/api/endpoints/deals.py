@@ -1,30 +1,36 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query
 
 from typing import List, Optional
 from app.models.deal import Deal
-from app.schemas.deal import DealCreate, DealUpdate, DealOut
+from app.schemas.deal import DealCreate, DealUpdate, DealOut, DealMoveRequest, DealMoveResponse
+from app.schemas.common import BatchGetRequest, BatchGetResponse
+from app.core.batch import fetch_by_ids, split_ids
+from app.core.activity import record_activity
+from app.core.audit import record_audit, current_actor
 
 from app.models.company import Company
 from app.models.person import Person
+from app.core.links import ref_id
+from app.core.company_cache import company_cache
+from app.core.events import publish_change
+from app.core.loader import EntityLoader, Relations, expand_includes, include_id_fields, include_transform
+from app.core.projection import parse_fields, find_projected, iter_projected, get_projected, projected_response
+from app.core.streaming import stream_response, schema_serializer, json_serializer, STREAM_PATTERN, STREAM_DESCRIPTION
+from app.core.config import STREAM_BATCH_SIZE, MAX_BATCH_IDS
+from app.core.updates import update_fields_with_previous, link_ref
+from app.core.stage_history import record_stage_change, stage_conversion, time_in_stage
+from app.schemas.company import CompanySummary
+from app.schemas.person import PersonSummary
 from beanie import PydanticObjectId
 from bson.errors import InvalidId
+from beanie.odm.utils.encoder import Encoder
+from pymongo import UpdateOne
+from datetime import datetime
+from uuid import UUID, uuid4
 
 router = APIRouter()
 
 
-def get_link_id(link_obj) -> Optional[str]:
-    """Safely extract ID from a Beanie Link or Document."""
-    if link_obj is None:
-        return None
-    # If it's a Link with ref attribute (unfetched)
-    if hasattr(link_obj, 'ref') and link_obj.ref is not None:
-        return str(link_obj.ref.id)
-    # If it's a fetched document with id
-    if hasattr(link_obj, 'id') and link_obj.id is not None:
-        return str(link_obj.id)
-    return None
-
-
 def validate_object_id(id_str: str, field_name: str = "id") -> PydanticObjectId:
     """Validate and convert string to PydanticObjectId, raising HTTPException on failure."""
     try:
@@ -33,34 +39,59 @@ def validate_object_id(id_str: str, field_name: str = "id") -> PydanticObjectId:
         raise HTTPException(status_code=400, detail=f"Invalid {field_name}: {id_str}")
 
 
+DEAL_RELATIONS: Relations = {
+    "company": (Company, "company_id", CompanySummary),
+    "contact": (Person, "contact_id", PersonSummary),
+}
+
+
+def build_deal_response(deal: Deal) -> dict:
+    """Build a consistent response dict for a Deal."""
+    # Links are exposed as flat ids; embedded summaries only come from `include=`
+    d_dict = deal.dict(exclude={"company", "contact"})
+    d_dict["id"] = str(deal.id)
+    d_dict["company_id"] = ref_id(deal, "company")
+    d_dict["contact_id"] = ref_id(deal, "contact")
+    d_dict["revision_id"] = str(deal.revision_id) if deal.revision_id else None
+    return d_dict
+
+
 @router.get("/", response_model=List[DealOut])
 async def get_deals(
     company_id: str = None,
-    contact_id: str = None
+    contact_id: str = None,
+    include: Optional[str] = Query(None, description="Linked entities to embed: company, contact"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[str] = Query(None, pattern=STREAM_PATTERN, description=STREAM_DESCRIPTION),
+    loader: EntityLoader = Depends(EntityLoader)
 ):
-    queries = []
+    query = {}
     if company_id:
-        validated_company_id = validate_object_id(company_id, "company_id")
-        queries.append(Deal.company.id == validated_company_id)
+        query["company_id"] = validate_object_id(company_id, "company_id")
     
     if contact_id:
-        validated_contact_id = validate_object_id(contact_id, "contact_id")
-        queries.append(Deal.contact.id == validated_contact_id)
+        query["contact_id"] = validate_object_id(contact_id, "contact_id")
     
-    if queries:
-        deals = await Deal.find(*queries).sort("-created_at").to_list()
-    else:
-        deals = await Deal.find({}).sort("-created_at").to_list()
-        
-    results = []
-    for deal in deals:
-        d_dict = deal.dict()
-        d_dict["id"] = str(deal.id)
-        d_dict["company_id"] = get_link_id(deal.company)
-        d_dict["contact_id"] = get_link_id(deal.contact)
-        results.append(d_dict)
+    field_names = parse_fields(fields, DealOut)
+    if field_names:
+        # Keep the ids `include=` needs even if the caller didn't ask for them
+        field_names += [f for f in include_id_fields(include, DEAL_RELATIONS) if f not in field_names]
+        if stream:
+            rows = iter_projected(Deal, query, field_names, sort=[("created_at", -1)], batch_size=STREAM_BATCH_SIZE)
+            return stream_response(rows, json_serializer, stream, include_transform(include, DEAL_RELATIONS))
+        rows = await find_projected(Deal, query, field_names, sort=[("created_at", -1)])
+        return projected_response(await expand_includes(rows, include, DEAL_RELATIONS, loader))
+    
+    if stream:
+        # Iterate the cursor batch by batch instead of materializing the whole list
+        cursor = Deal.find(query, batch_size=STREAM_BATCH_SIZE).sort("-created_at")
+        rows = (build_deal_response(deal) async for deal in cursor)
+        return stream_response(rows, schema_serializer(DealOut), stream, include_transform(include, DEAL_RELATIONS))
+    
+    deals = await Deal.find(query).sort("-created_at").to_list()
         
-    return results
+    results = [build_deal_response(deal) for deal in deals]
+    return await expand_includes(results, include, DEAL_RELATIONS, loader)
 
 
 @router.post("/", response_model=DealOut)
@@ -73,10 +104,12 @@ async def create_deal(deal_in: DealCreate):
     
     if company_id:
         validated_company_id = validate_object_id(company_id, "company_id")
-        company = await Company.get(validated_company_id)
+        company = await company_cache.get(validated_company_id)
         if not company:
             raise HTTPException(status_code=404, detail=f"Company not found: {company_id}")
         deal.company = company
+        deal.company_id = company.id
+        deal.company_name = company.name
             
     if contact_id:
         validated_contact_id = validate_object_id(contact_id, "contact_id")
@@ -84,59 +117,184 @@ async def create_deal(deal_in: DealCreate):
         if not contact:
             raise HTTPException(status_code=404, detail=f"Contact not found: {contact_id}")
         deal.contact = contact
-            
+        deal.contact_id = contact.id
+    
+    deal.stage_changed_at = datetime.utcnow()
     await deal.insert()
+    await record_stage_change(deal.id, None, deal.stage, deal.stage_changed_at, owner_id=deal.owner_id)
+    publish_change(Deal, "create", deal.id)
+    await record_activity("create", deal)
     
-    # Prepare response
-    d_dict = deal.dict()
-    d_dict["id"] = str(deal.id)
-    d_dict["company_id"] = get_link_id(deal.company)
-    d_dict["contact_id"] = get_link_id(deal.contact)
-        
-    return d_dict
+    return build_deal_response(deal)
+
+
+@router.get("/batch", response_model=BatchGetResponse[DealOut])
+async def batch_get_deals(
+    ids: str = Query(..., description="Comma-separated deal ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    return await fetch_by_ids(Deal, split_ids(ids), DealOut, build_deal_response, fields)
+
+
+@router.post("/batch", response_model=BatchGetResponse[DealOut])
+async def batch_get_deals_by_body(body: BatchGetRequest):
+    # Same as GET /batch, for id sets too large for a query string
+    return await fetch_by_ids(Deal, body.ids, DealOut, build_deal_response, body.fields)
+
+
+@router.post("/moves", response_model=DealMoveResponse)
+async def move_deals(body: DealMoveRequest, actor: Optional[str] = Depends(current_actor)):
+    """
+    Apply board moves (stage / probability / position) to many deals in one bulk_write.
+    
+    Each move carries the revision_id the client last saw and only applies if the
+    deal still has it, so a card someone else edited in the meantime comes back
+    under `conflicts` with its current state instead of being overwritten.
+    """
+    if not body.moves:
+        raise HTTPException(status_code=400, detail="At least one move is required")
+    if len(body.moves) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many moves: {len(body.moves)} (max {MAX_BATCH_IDS}); split the request",
+        )
+    
+    now = datetime.utcnow()
+    parsed = []
+    for move in body.moves:
+        deal_id = validate_object_id(move.id, "deal id")
+        if any(deal_id == seen for seen, _, _ in parsed):
+            raise HTTPException(status_code=400, detail=f"Deal {move.id} appears in more than one move")
+        try:
+            expected = UUID(move.revision_id) if move.revision_id else None
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid revision_id: {move.revision_id}")
+        parsed.append((deal_id, expected, move.dict(include={"stage", "probability", "position"}, exclude_unset=True)))
+    
+    collection = Deal.get_motor_collection()
+    
+    # Stage history needs the stage each deal is leaving, the audit trail the old values of every moved field
+    cursor = collection.find(
+        {"_id": {"$in": [deal_id for deal_id, _, _ in parsed]}},
+        {"stage": 1, "probability": 1, "position": 1, "stage_changed_at": 1, "created_at": 1, "owner_id": 1},
+    )
+    previous = {raw["_id"]: raw async for raw in cursor}
+    
+    operations = []
+    new_revisions = {}
+    changed_fields = {}
+    moved_values = {}
+    transitions = {}
+    for deal_id, expected, changes in parsed:
+        before = previous.get(deal_id)
+        if "stage" in changes and before and before.get("stage") != changes["stage"]:
+            changes["stage_changed_at"] = now
+            transitions[deal_id] = before
+        new_revisions[deal_id] = uuid4()
+        changes.update(updated_at=now, revision_id=new_revisions[deal_id])
+        changed_fields[deal_id] = list(changes)
+        moved_values[deal_id] = changes
+        operations.append(UpdateOne(
+            Encoder().encode({"_id": deal_id, "revision_id": expected}),
+            {"$set": Encoder().encode(changes)},
+        ))
+    
+    await collection.bulk_write(operations, ordered=False)
+    
+    # One read back: a deal carrying the revision we wrote was moved, anything else lost the race
+    deals = await Deal.find({"_id": {"$in": list(new_revisions)}}).to_list()
+    found = {deal.id: deal for deal in deals}
+    updated, conflicts = [], []
+    for deal_id, revision in new_revisions.items():
+        deal = found.get(deal_id)
+        if deal is None:
+            continue
+        if deal.revision_id != revision:
+            conflicts.append(build_deal_response(deal))
+            continue
+        updated.append(build_deal_response(deal))
+        publish_change(Deal, "update", deal_id, changed_fields[deal_id])
+        if deal_id in previous:
+            await record_audit(Deal, deal_id, previous[deal_id], moved_values[deal_id], actor)
+        await record_activity("update", deal, changed_fields[deal_id])
+        before = transitions.get(deal_id)
+        if before:
+            await record_stage_change(
+                deal_id, before.get("stage"), deal.stage, now,
+                before.get("stage_changed_at") or before.get("created_at"), before.get("owner_id"),
+            )
+    missing = [str(deal_id) for deal_id in new_revisions if deal_id not in found]
+    return {"updated": updated, "conflicts": conflicts, "missing": missing}
+
+
+def parse_percentiles(percentiles: str) -> List[float]:
+    try:
+        values = [float(p) for p in percentiles.split(",") if p.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid percentiles: {percentiles}")
+    if not values or any(not 0 < p <= 100 for p in values):
+        raise HTTPException(status_code=400, detail="Percentiles must be between 0 and 100")
+    return values
+
+
+@router.get("/analytics/stage-conversion")
+async def get_stage_conversion(
+    start: Optional[datetime] = Query(None, description="First day to include (UTC)"),
+    end: Optional[datetime] = Query(None, description="Last day to include (UTC)"),
+):
+    """Stage-to-stage conversion: of the deals leaving a stage, the share that went to each next stage."""
+    return await stage_conversion(start, end)
+
+
+@router.get("/analytics/time-in-stage")
+async def get_time_in_stage(
+    start: Optional[datetime] = Query(None, description="First day to include (UTC)"),
+    end: Optional[datetime] = Query(None, description="Last day to include (UTC)"),
+    percentiles: str = Query("50,75,90", description="Comma-separated percentiles"),
+):
+    """Time deals spent in each stage before leaving it, in seconds; percentiles are histogram estimates."""
+    return await time_in_stage(start, end, parse_percentiles(percentiles))
 
 
 @router.get("/{id}", response_model=DealOut)
-async def get_deal(id: str):
+async def get_deal(id: str, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
     validated_id = validate_object_id(id, "deal id")
-    deal = await Deal.get(validated_id, fetch_links=True)
+    field_names = parse_fields(fields, DealOut)
+    if field_names:
+        row = await get_projected(Deal, id, field_names)
+        if not row:
+            raise HTTPException(status_code=404, detail="Deal not found")
+        return projected_response(row)
+    
+    deal = await Deal.get(validated_id)
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
         
-    # Prepare response
-    d_dict = deal.dict()
-    d_dict["id"] = str(deal.id)
-    d_dict["company_id"] = get_link_id(deal.company)
-    d_dict["contact_id"] = get_link_id(deal.contact)
-        
-    return d_dict
+    return build_deal_response(deal)
 
 
 @router.put("/{id}", response_model=DealOut)
-async def update_deal(id: str, deal_in: DealUpdate):
+async def update_deal(id: str, deal_in: DealUpdate, actor: Optional[str] = Depends(current_actor)):
     validated_id = validate_object_id(id, "deal id")
-    deal = await Deal.get(validated_id, fetch_links=True)
-    if not deal:
-        raise HTTPException(status_code=404, detail="Deal not found")
     
     update_data = deal_in.dict(exclude_unset=True)
     company_id = update_data.pop("company_id", None)
     contact_id = update_data.pop("contact_id", None)
     
-    # Update basic fields
-    for key, value in update_data.items():
-        setattr(deal, key, value)
-    
     # Update links with proper validation
     if company_id is not None:
         if company_id:  # Non-empty string means set a company
             validated_company_id = validate_object_id(company_id, "company_id")
-            company = await Company.get(validated_company_id)
+            company = await company_cache.get(validated_company_id)
             if not company:
                 raise HTTPException(status_code=404, detail=f"Company not found: {company_id}")
-            deal.company = company
+            update_data["company"] = link_ref(company)
+            update_data["company_id"] = company.id
+            update_data["company_name"] = company.name
         else:  # Empty string means clear the company
-            deal.company = None
+            update_data["company"] = None
+            update_data["company_id"] = None
+            update_data["company_name"] = None
     
     if contact_id is not None:
         if contact_id:  # Non-empty string means set a contact
@@ -144,19 +302,40 @@ async def update_deal(id: str, deal_in: DealUpdate):
             contact = await Person.get(validated_contact_id)
             if not contact:
                 raise HTTPException(status_code=404, detail=f"Contact not found: {contact_id}")
-            deal.contact = contact
+            update_data["contact"] = link_ref(contact)
+            update_data["contact_id"] = contact.id
         else:  # Empty string means clear the contact
-            deal.contact = None
-            
-    await deal.save()
+            update_data["contact"] = None
+            update_data["contact_id"] = None
     
-    # Prepare response
-    d_dict = deal.dict()
-    d_dict["id"] = str(deal.id)
-    d_dict["company_id"] = get_link_id(deal.company)
-    d_dict["contact_id"] = get_link_id(deal.contact)
-        
-    return d_dict
+    now = datetime.utcnow()
+    stage = update_data.get("stage")
+    if stage is not None:
+        # Only matches if the stage really changes; hands back the stage being left
+        result = await update_fields_with_previous(
+            Deal, validated_id, {**update_data, "stage_changed_at": now}, match={"stage": {"$ne": stage}}
+        )
+        if result:
+            before, deal = result
+            await record_stage_change(
+                deal.id, before.get("stage"), stage, now,
+                before.get("stage_changed_at") or before.get("created_at"), before.get("owner_id"),
+            )
+            await record_audit(Deal, deal.id, before, {**update_data, "stage_changed_at": now}, actor)
+            publish_change(Deal, "update", deal.id, list(update_data) + ["stage_changed_at"])
+            await record_activity("update", deal, list(update_data) + ["stage_changed_at"])
+            return build_deal_response(deal)
+    
+    # Only the submitted fields are written, in one round trip that also returns the previous values
+    result = await update_fields_with_previous(Deal, validated_id, update_data)
+    if not result:
+        raise HTTPException(status_code=404, detail="Deal not found")
+    before, deal = result
+    await record_audit(Deal, deal.id, before, update_data, actor)
+    publish_change(Deal, "update", deal.id, update_data)
+    await record_activity("update", deal, update_data)
+    
+    return build_deal_response(deal)
 
 
 @router.delete("/{id}")
@@ -166,4 +345,6 @@ async def delete_deal(id: str):
     if not deal:
         raise HTTPException(status_code=404, detail="Deal not found")
     await deal.delete()
+    publish_change(Deal, "delete", deal.id)
+    await record_activity("delete", deal)
     return {"message": "Deal deleted successfully"}
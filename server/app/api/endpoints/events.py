@@ -0,0 +1,61 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, List, Optional
+from app.core.config import EVENTS_HEARTBEAT
+from app.core.events import TOPICS, Subscriber, change_events
+
+router = APIRouter()
+
+def parse_topics(topics: Optional[str]) -> List[str]:
+    if not topics:
+        return list(TOPICS)
+    names = [name.strip() for name in topics.split(",") if name.strip()]
+    unknown = [name for name in names if name not in TOPICS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(unknown)} (available: {', '.join(TOPICS)})")
+    return names
+
+def format_event(event: dict) -> str:
+    return f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+
+async def event_stream(subscriber: Subscriber, replay: Optional[List[dict]]) -> AsyncIterator[str]:
+    try:
+        yield "retry: 3000\n\n"
+        if replay is None:
+            # The client missed more than we kept; it has to refetch what it shows
+            yield "event: reset\ndata: {}\n\n"
+        for event in replay or []:
+            yield format_event(event)
+        while not (subscriber.overflowed and subscriber.queue.empty()):
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), EVENTS_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield format_event(event)
+        # Fell a whole buffer behind: end the stream so the client resumes from its last id
+    finally:
+        change_events.bus.unsubscribe(subscriber)
+
+@router.get("/")
+async def stream_events(
+    topics: Optional[str] = Query(None, description=f"Comma-separated topics: {', '.join(TOPICS)} (default: all)"),
+    last_event_id: Optional[str] = Query(None, description="Resume after this event id"),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events for creates, updates and deletes.
+    
+    Each message's data is `{id, topic, op, entity_id, fields}`; `entity_id` is
+    null when many documents changed at once. EventSource sends Last-Event-ID
+    on reconnect by itself; `last_event_id` is for the first connection.
+    """
+    subscriber, replay = change_events.bus.subscribe(parse_topics(topics), last_event_id_header or last_event_id)
+    return StreamingResponse(
+        event_stream(subscriber, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,17 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from datetime import datetime
 from typing import List, Optional
 from app.models.lead import Lead
-from app.schemas.lead import LeadCreate, LeadUpdate, LeadOut
+from app.schemas.lead import LeadCreate, LeadUpdate, LeadOut, LeadBulkFilter
+from app.schemas.common import BatchGetRequest, BatchGetResponse, BulkUpdateRequest, BulkDeleteRequest, BulkResult
+from app.core.batch import fetch_by_ids, split_ids
+from app.core.activity import record_activity
+from app.core.audit import record_audit, current_actor
+from app.core.cascade import create_cascade_job, cascade_worker
+from app.core.bulk import bulk_query, bulk_update, bulk_delete
+from app.core.events import publish_change
+from app.core.projection import parse_fields, find_projected, get_projected, projected_response
+from app.core.updates import update_fields_with_previous
 from app.models.lead_thread import LeadThread
 from app.schemas.lead_thread import LeadThreadOut, SyncMailResponse
 from beanie import PydanticObjectId
@@ -13,38 +22,75 @@ router = APIRouter()
 async def create_lead(lead_in: LeadCreate):
     lead = Lead(**lead_in.dict())
     await lead.insert()
+    publish_change(Lead, "create", lead.id)
+    await record_activity("create", lead)
     return lead
 
 @router.get("/", response_model=List[LeadOut], response_model_by_alias=False)
 async def list_leads(
     skip: int = 0, 
     limit: int = 100,
-    status: Optional[str] = None
+    status: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
 ):
     query = {}
     if status:
         query["status"] = status
     
+    field_names = parse_fields(fields, LeadOut)
+    if field_names:
+        # Same id key as the unprojected rows below (response_model_by_alias=False)
+        return projected_response(await find_projected(Lead, query, field_names, skip=skip, limit=limit, id_key="id"))
+    
     leads = await Lead.find(query).skip(skip).limit(limit).to_list()
     return leads
 
+@router.get("/batch", response_model=BatchGetResponse[LeadOut])
+async def batch_get_leads(
+    ids: str = Query(..., description="Comma-separated lead ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    return await fetch_by_ids(Lead, split_ids(ids), LeadOut, fields=fields)
+
+@router.post("/batch", response_model=BatchGetResponse[LeadOut])
+async def batch_get_leads_by_body(body: BatchGetRequest):
+    # Same as GET /batch, for id sets too large for a query string
+    return await fetch_by_ids(Lead, body.ids, LeadOut, fields=body.fields)
+
+@router.post("/bulk-update", response_model=BulkResult)
+async def bulk_update_leads(body: BulkUpdateRequest[LeadBulkFilter, LeadUpdate]):
+    """Set fields on every lead matching the filter, in `_id`-range chunks."""
+    return await bulk_update(Lead, bulk_query(body.filter), body.set.dict(exclude_unset=True), body.dry_run)
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete_leads(body: BulkDeleteRequest[LeadBulkFilter]):
+    """Delete every lead matching the filter, in `_id`-range chunks."""
+    return await bulk_delete(Lead, bulk_query(body.filter), body.dry_run)
+
 @router.get("/{id}", response_model=LeadOut)
-async def get_lead(id: str):
+async def get_lead(id: str, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    field_names = parse_fields(fields, LeadOut)
+    if field_names:
+        row = await get_projected(Lead, id, field_names)
+        if not row:
+            raise HTTPException(status_code=404, detail="Lead not found")
+        return projected_response(row)
+    
     lead = await Lead.get(id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
     return lead
 
 @router.put("/{id}", response_model=LeadOut)
-async def update_lead(id: str, lead_in: LeadUpdate):
-    lead = await Lead.get(id)
-    if not lead:
-        raise HTTPException(status_code=404, detail="Lead not found")
-    
+async def update_lead(id: str, lead_in: LeadUpdate, actor: Optional[str] = Depends(current_actor)):
     update_data = lead_in.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(lead, key, value)
-    await lead.save()
+    result = await update_fields_with_previous(Lead, id, update_data)
+    if not result:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    before, lead = result
+    await record_audit(Lead, lead.id, before, update_data, actor)
+    publish_change(Lead, "update", lead.id, update_data)
+    await record_activity("update", lead, update_data)
     return lead
 
 @router.delete("/{id}")
@@ -52,8 +98,13 @@ async def delete_lead(id: str):
     lead = await Lead.get(id)
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
+    job = await create_cascade_job("lead", lead.id)
     await lead.delete()
-    return {"message": "Lead deleted successfully"}
+    publish_change(Lead, "delete", lead.id)
+    await record_activity("delete", lead)
+    # In the background: its mail threads and notes are deleted and its tasks unlinked
+    cascade_worker.enqueue(job.id)
+    return {"message": "Lead deleted successfully", "cascade_job_id": str(job.id)}
 
 @router.post("/{id}/sync-mail", response_model=SyncMailResponse)
 async def sync_mail(id: str):
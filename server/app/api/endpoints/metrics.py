@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from app.core import admission, coalescing, compression, deadlines, idempotency
+from app.core.stage_history import stage_events
+from app.core.activity import activity_log
+from app.core.audit import audit_log
+from app.core.cascade import cascade_worker
+from app.core.company_names import company_renames
+from app.core.events import change_events
+from app.core.reminders import reminders
+
+router = APIRouter()
+
+@router.get("/")
+async def get_metrics():
+    """In-process counters for the request-handling layers (per worker process)."""
+    return {
+        "admission": admission.snapshot(),
+        "coalescing": coalescing.stats.snapshot(),
+        "deadlines": deadlines.stats.snapshot(),
+        "compression_cache": compression.response_cache.stats(),
+        "idempotency": idempotency.stats.snapshot(),
+        "cascade_jobs_queued": cascade_worker.pending(),
+        "company_renames": company_renames.stats(),
+        "events": change_events.stats(),
+        "reminders": reminders.stats(),
+        "writers": {
+            stage_events.name: stage_events.stats(),
+            activity_log.name: activity_log.stats(),
+            audit_log.name: audit_log.stats(),
+        },
+    }
@@ -1,48 +1,115 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import Optional
+from pymongo import DESCENDING
 from app.models.note import Note
-from app.schemas.note import NoteCreate, NoteUpdate, NoteOut
+from app.schemas.note import NoteCreate, NoteUpdate, NoteOut, NoteListItem, NoteBulkFilter
+from app.schemas.common import BatchGetRequest, BatchGetResponse, BulkUpdateRequest, BulkDeleteRequest, BulkResult, CursorPage
+from app.core.batch import fetch_by_ids, split_ids
+from app.core.activity import record_activity
+from app.core.audit import record_audit, current_actor
+from app.core.bulk import bulk_query, bulk_update, bulk_delete
+from app.core.events import publish_change
+from app.core.pagination import decode_cursor, after_cursor, cursor_page
+from app.core.projection import parse_fields, selectable_fields, mongo_projection, project_row, iter_projected, get_projected, projected_response
+from app.core.streaming import stream_response, json_serializer, STREAM_PATTERN, STREAM_DESCRIPTION
+from app.core.config import STREAM_BATCH_SIZE
+from app.core.updates import update_fields_with_previous
 
 router = APIRouter()
 
-@router.get("/", response_model=List[NoteOut])
+# Pinned first, then newest; matches the related_pinned_created_at / pinned_created_at indexes
+NOTE_SORT = [("is_pinned", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+
+# What a list row carries by default: everything but the note body
+NOTE_LIST_FIELDS = [name for name in selectable_fields(NoteOut) if name != "content"]
+
+@router.get("/", response_model=CursorPage[NoteListItem])
 async def get_notes(
     related_to_type: Optional[str] = Query(None, description="Filter by entity type (company, deal, etc.)"),
-    related_to_id: Optional[str] = Query(None, description="Filter by generic entity ID")
+    related_to_id: Optional[str] = Query(None, description="Filter by generic entity ID"),
+    include_content: bool = Query(False, description="Also return each note's content"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    stream: Optional[str] = Query(None, pattern=STREAM_PATTERN, description=STREAM_DESCRIPTION)
 ):
     search_criteria = {}
     if related_to_type:
         search_criteria["related_to_type"] = related_to_type
     if related_to_id:
         search_criteria["related_to_id"] = related_to_id
-        
-    if search_criteria:
-        return await Note.find(search_criteria).sort("-created_at").to_list()
     
-    return await Note.find_all().sort("-created_at").to_list()
+    # Note bodies can be large; a list only reads them when asked to
+    field_names = parse_fields(fields, NoteOut) or NOTE_LIST_FIELDS + (["content"] if include_content else [])
+    
+    if stream:
+        # Exports the whole result in page order, batch by batch
+        rows = iter_projected(Note, search_criteria, field_names, sort=NOTE_SORT, batch_size=STREAM_BATCH_SIZE)
+        return stream_response(rows, json_serializer, stream)
+    
+    if cursor:
+        search_criteria.update(after_cursor(NOTE_SORT, decode_cursor(cursor)))
+    # The sort keys are read even when not returned, for the next cursor
+    projection = {**mongo_projection(field_names), "is_pinned": 1, "created_at": 1}
+    raw = await Note.get_motor_collection().find(search_criteria, projection).sort(NOTE_SORT).limit(limit + 1).to_list(limit + 1)
+    page, next_cursor = cursor_page(raw, limit, NOTE_SORT)
+    return projected_response({"items": [project_row(row, field_names) for row in page], "next_cursor": next_cursor})
 
 @router.post("/", response_model=NoteOut)
 async def create_note(note_in: NoteCreate):
     note = Note(**note_in.dict())
     await note.insert()
+    publish_change(Note, "create", note.id)
+    await record_activity("create", note)
     return note
 
+@router.get("/batch", response_model=BatchGetResponse[NoteOut])
+async def batch_get_notes(
+    ids: str = Query(..., description="Comma-separated note ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    return await fetch_by_ids(Note, split_ids(ids), NoteOut, fields=fields)
+
+@router.post("/batch", response_model=BatchGetResponse[NoteOut])
+async def batch_get_notes_by_body(body: BatchGetRequest):
+    # Same as GET /batch, for id sets too large for a query string
+    return await fetch_by_ids(Note, body.ids, NoteOut, fields=body.fields)
+
+@router.post("/bulk-update", response_model=BulkResult)
+async def bulk_update_notes(body: BulkUpdateRequest[NoteBulkFilter, NoteUpdate]):
+    """Set fields on every note matching the filter, in `_id`-range chunks."""
+    return await bulk_update(Note, bulk_query(body.filter), body.set.dict(exclude_unset=True), body.dry_run)
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete_notes(body: BulkDeleteRequest[NoteBulkFilter]):
+    """Delete every note matching the filter, in `_id`-range chunks."""
+    return await bulk_delete(Note, bulk_query(body.filter), body.dry_run)
+
 @router.get("/{id}", response_model=NoteOut)
-async def get_note(id: str):
+async def get_note(id: str, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    field_names = parse_fields(fields, NoteOut)
+    if field_names:
+        row = await get_projected(Note, id, field_names)
+        if not row:
+            raise HTTPException(status_code=404, detail="Note not found")
+        return projected_response(row)
+    
     note = await Note.get(id)
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return note
 
 @router.put("/{id}", response_model=NoteOut)
-async def update_note(id: str, note_in: NoteUpdate):
-    note = await Note.get(id)
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-    
+async def update_note(id: str, note_in: NoteUpdate, actor: Optional[str] = Depends(current_actor)):
     update_data = note_in.dict(exclude_unset=True)
-    await note.update({"$set": update_data})
-    
+    # Returns the note as stored after the update, plus the raw pre-update copy for the audit diff
+    result = await update_fields_with_previous(Note, id, update_data)
+    if not result:
+        raise HTTPException(status_code=404, detail="Note not found")
+    before, note = result
+    await record_audit(Note, note.id, before, update_data, actor)
+    publish_change(Note, "update", note.id, update_data)
+    await record_activity("update", note, update_data)
     return note
 
 @router.delete("/{id}")
@@ -51,4 +118,6 @@ async def delete_note(id: str):
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     await note.delete()
+    publish_change(Note, "delete", note.id)
+    await record_activity("delete", note)
     return {"message": "Note deleted successfully"}
@@ -1,10 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional, Dict
 from app.models.person import Person
 from app.models.company import Company
 from app.schemas.person import PersonCreate, PersonUpdate, PersonOut
+from app.schemas.common import BatchGetRequest, BatchGetResponse
+from app.core.batch import fetch_by_ids, split_ids
+from app.core.activity import record_activity
+from app.core.audit import record_audit, current_actor
+from app.core.cascade import create_cascade_job, cascade_worker
+from app.core.links import ref_id
+from app.core.company_cache import company_cache
+from app.core.loader import EntityLoader, Relations, expand_includes, include_id_fields, include_transform
+from app.core.projection import parse_fields, find_projected, iter_projected, get_projected, projected_response
+from app.core.streaming import stream_response, schema_serializer, json_serializer, STREAM_PATTERN, STREAM_DESCRIPTION
+from app.core.config import STREAM_BATCH_SIZE
+from app.core.updates import update_fields_with_previous, link_ref
+from app.schemas.company import CompanySummary
 from beanie import PydanticObjectId
-from datetime import datetime
 from bson.errors import InvalidId
 
 router = APIRouter()
@@ -18,7 +30,12 @@ def validate_object_id(id_str: str, field_name: str = "id") -> PydanticObjectId:
         raise HTTPException(status_code=400, detail=f"Invalid {field_name}: {id_str}")
 
 
-def build_person_response(person: Person, company_id: Optional[str]) -> dict:
+PERSON_RELATIONS: Relations = {
+    "company": (Company, "company_id", CompanySummary),
+}
+
+
+def build_person_response(person: Person) -> dict:
     """Build a consistent response dict for a Person."""
     return {
         "id": str(person.id),
@@ -29,7 +46,8 @@ def build_person_response(person: Person, company_id: Optional[str]) -> dict:
         "mobile": person.mobile,
         "job_title": (person.job_title or "").strip() if person.job_title else None,
         "department": person.department,
-        "company_id": company_id,
+        "company_id": ref_id(person, "company"),
+        "company_name": person.company_name,
         "linkedin": person.linkedin,
         "avatar_url": person.avatar_url,
         "is_primary_contact": person.is_primary_contact,
@@ -39,15 +57,6 @@ def build_person_response(person: Person, company_id: Optional[str]) -> dict:
     }
 
 
-def extract_company_id_from_dbref(raw_doc: dict) -> Optional[str]:
-    """Extract company_id from a raw MongoDB document's DBRef."""
-    if raw_doc and 'company' in raw_doc and raw_doc['company'] is not None:
-        company_ref = raw_doc['company']
-        if hasattr(company_ref, 'id'):
-            return str(company_ref.id)
-    return None
-
-
 @router.post("/", response_model=PersonOut)
 async def create_person(person_in: PersonCreate):
     person_data = person_in.dict()
@@ -63,73 +72,92 @@ async def create_person(person_in: PersonCreate):
     
     if company_id:
         validated_company_id = validate_object_id(company_id, "company_id")
-        company = await Company.get(validated_company_id)
+        company = await company_cache.get(validated_company_id)
         if not company:
             raise HTTPException(status_code=404, detail=f"Company not found: {company_id}")
         person.company = company
+        person.company_id = company.id
+        person.company_name = company.name
             
     await person.insert()
+    await record_activity("create", person)
     
-    return build_person_response(person, company_id)
+    return build_person_response(person)
 
 
 @router.get("/", response_model=List[PersonOut])
-async def list_people(skip: int = 0, limit: int = 100):
-    # Get raw documents from MongoDB to access company DBRef directly
-    motor_coll = Person.get_pymongo_collection()
-    cursor = motor_coll.find().skip(skip).limit(limit)
-    
-    # Collect all raw documents and their IDs first (avoiding N+1)
-    raw_docs: List[dict] = []
-    person_ids: List[PydanticObjectId] = []
-    
-    async for raw_doc in cursor:
-        raw_docs.append(raw_doc)
-        person_ids.append(raw_doc["_id"])
-    
-    if not person_ids:
-        return []
+async def list_people(
+    skip: int = 0,
+    limit: int = 100,
+    company_id: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Linked entities to embed: company"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[str] = Query(None, pattern=STREAM_PATTERN, description=STREAM_DESCRIPTION),
+    loader: EntityLoader = Depends(EntityLoader)
+):
+    query = {}
+    if company_id:
+        query["company_id"] = validate_object_id(company_id, "company_id")
     
-    # Batch fetch all Person documents in one query
-    persons = await Person.find({"_id": {"$in": person_ids}}).to_list()
-    person_map: Dict[PydanticObjectId, Person] = {p.id: p for p in persons}
+    field_names = parse_fields(fields, PersonOut)
+    if field_names:
+        # Keep the ids `include=` needs even if the caller didn't ask for them
+        field_names += [f for f in include_id_fields(include, PERSON_RELATIONS) if f not in field_names]
+        if stream:
+            rows = iter_projected(Person, query, field_names, skip=skip, limit=limit, batch_size=STREAM_BATCH_SIZE)
+            return stream_response(rows, json_serializer, stream, include_transform(include, PERSON_RELATIONS))
+        rows = await find_projected(Person, query, field_names, skip=skip, limit=limit)
+        return projected_response(await expand_includes(rows, include, PERSON_RELATIONS, loader))
     
-    # Build responses using the pre-fetched data
-    results = []
-    for raw_doc in raw_docs:
-        person_id = raw_doc["_id"]
-        person = person_map.get(person_id)
-        if person:
-            company_id = extract_company_id_from_dbref(raw_doc)
-            results.append(build_person_response(person, company_id))
+    if stream:
+        # Iterate the cursor batch by batch instead of materializing the whole page
+        cursor = Person.find(query, batch_size=STREAM_BATCH_SIZE).skip(skip).limit(limit)
+        rows = (build_person_response(person) async for person in cursor)
+        return stream_response(rows, schema_serializer(PersonOut), stream, include_transform(include, PERSON_RELATIONS))
     
-    return results
+    # company_id is a plain field now, so a single query covers the whole page
+    persons = await Person.find(query).skip(skip).limit(limit).to_list()
+    results = [build_person_response(person) for person in persons]
+    return await expand_includes(results, include, PERSON_RELATIONS, loader)
+
+
+@router.get("/batch", response_model=BatchGetResponse[PersonOut])
+async def batch_get_people(
+    ids: str = Query(..., description="Comma-separated person ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    return await fetch_by_ids(Person, split_ids(ids), PersonOut, build_person_response, fields)
+
+
+@router.post("/batch", response_model=BatchGetResponse[PersonOut])
+async def batch_get_people_by_body(body: BatchGetRequest):
+    # Same as GET /batch, for id sets too large for a query string
+    return await fetch_by_ids(Person, body.ids, PersonOut, build_person_response, body.fields)
 
 
 @router.get("/{id}", response_model=PersonOut)
-async def get_person(id: str):
+async def get_person(id: str, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
     # Validate ID format first
     validated_id = validate_object_id(id, "person id")
     
-    motor_coll = Person.get_pymongo_collection()
-    raw_doc = await motor_coll.find_one({"_id": validated_id})
+    field_names = parse_fields(fields, PersonOut)
+    if field_names:
+        row = await get_projected(Person, id, field_names)
+        if not row:
+            raise HTTPException(status_code=404, detail="Person not found")
+        return projected_response(row)
     
     person = await Person.get(validated_id)
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
     
-    company_id = extract_company_id_from_dbref(raw_doc)
-    return build_person_response(person, company_id)
+    return build_person_response(person)
 
 
 @router.put("/{id}", response_model=PersonOut)
-async def update_person(id: str, person_in: PersonUpdate):
+async def update_person(id: str, person_in: PersonUpdate, actor: Optional[str] = Depends(current_actor)):
     validated_id = validate_object_id(id, "person id")
     
-    person = await Person.get(validated_id)
-    if not person:
-        raise HTTPException(status_code=404, detail="Person not found")
-    
     update_data = person_in.dict(exclude_unset=True)
     company_id_input = update_data.pop("company_id", None)
     
@@ -139,32 +167,30 @@ async def update_person(id: str, person_in: PersonUpdate):
     if "last_name" in update_data and update_data["last_name"]:
         update_data["last_name"] = update_data["last_name"].strip()
     
-    # Update basic fields
-    for key, value in update_data.items():
-        setattr(person, key, value)
-    
     # Handle company link with proper validation
     if company_id_input is not None:
         if company_id_input:  # Non-empty string means set a company
             validated_company_id = validate_object_id(company_id_input, "company_id")
-            company = await Company.get(validated_company_id)
+            company = await company_cache.get(validated_company_id)
             if not company:
                 raise HTTPException(status_code=404, detail=f"Company not found: {company_id_input}")
-            person.company = company
+            update_data["company"] = link_ref(company)
+            update_data["company_id"] = company.id
+            update_data["company_name"] = company.name
         else:  # Empty string means clear the company
-            person.company = None
-    
-    # Update the timestamp
-    person.updated_at = datetime.utcnow()
+            update_data["company"] = None
+            update_data["company_id"] = None
+            update_data["company_name"] = None
     
-    await person.save()
-    
-    # Get the new company_id for response from raw doc
-    motor_coll = Person.get_pymongo_collection()
-    raw_doc = await motor_coll.find_one({"_id": person.id})
+    # Only the submitted fields are written; updated_at is stamped server-side
+    result = await update_fields_with_previous(Person, validated_id, update_data)
+    if not result:
+        raise HTTPException(status_code=404, detail="Person not found")
+    before, person = result
+    await record_audit(Person, person.id, before, update_data, actor)
+    await record_activity("update", person, update_data)
     
-    final_company_id = extract_company_id_from_dbref(raw_doc)
-    return build_person_response(person, final_company_id)
+    return build_person_response(person)
 
 
 @router.delete("/{id}")
@@ -174,5 +200,9 @@ async def delete_person(id: str):
     person = await Person.get(validated_id)
     if not person:
         raise HTTPException(status_code=404, detail="Person not found")
+    job = await create_cascade_job("person", person.id)
     await person.delete()
-    return {"message": "Person deleted successfully"}
+    await record_activity("delete", person)
+    # In the background: deals drop it as contact, its notes are deleted and its tasks unlinked
+    cascade_worker.enqueue(job.id)
+    return {"message": "Person deleted successfully", "cascade_job_id": str(job.id)}
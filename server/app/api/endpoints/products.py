@@ -1,9 +1,21 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Depends
 from typing import List, Optional, Any
 from app.models.product import Product
 from app.models.company import Company
-from app.schemas.product import ProductCreate, ProductUpdate, ProductOut
-from datetime import datetime
+from app.schemas.product import ProductCreate, ProductUpdate, ProductOut, ProductBulkFilter
+from app.schemas.common import BatchGetRequest, BatchGetResponse, BulkUpdateRequest, BulkDeleteRequest, BulkResult
+from app.core.batch import fetch_by_ids, split_ids
+from app.core.activity import record_activity
+from app.core.audit import record_audit, current_actor
+from app.core.bulk import bulk_query, bulk_update, bulk_delete
+from app.core.links import ref_id
+from app.core.company_cache import company_cache
+from app.core.loader import EntityLoader, Relations, expand_includes, include_id_fields, include_transform
+from app.core.projection import parse_fields, find_projected, iter_projected, get_projected, projected_response
+from app.core.streaming import stream_response, schema_serializer, json_serializer, STREAM_PATTERN, STREAM_DESCRIPTION
+from app.core.config import STREAM_BATCH_SIZE
+from app.core.updates import update_fields_with_previous, link_ref
+from app.schemas.company import CompanySummary
 from beanie import PydanticObjectId, Link
 from bson.errors import InvalidId
 
@@ -15,49 +27,57 @@ def validate_object_id(id_str: str, name: str = "id") -> PydanticObjectId:
     except (InvalidId, ValueError, TypeError):
         raise HTTPException(status_code=400, detail=f"Invalid {name} format")
 
-def get_link_id(link_obj: Any) -> Optional[str]:
-    """Safely extract ID from a Link field or fetched Document"""
-    if link_obj is None:
-        return None
-    
-    # If it's a Beanie Link object (DBRef wrapper)
-    if hasattr(link_obj, 'ref') and hasattr(link_obj.ref, 'id'):
-        return str(link_obj.ref.id)
-    
-    # If it's a fetched Document object or PydanticObjectId
-    if hasattr(link_obj, 'id'):
-        return str(link_obj.id)
-        
-    # If it's already an ID (string or ObjectId)
-    return str(link_obj)
-
-
+PRODUCT_RELATIONS: Relations = {
+    "company": (Company, "company_id", CompanySummary),
+}
 
+def build_product_response(product: Product) -> dict:
+    """Build a consistent response dict for a Product."""
+    p_dict = product.dict(exclude={"company"})
+    p_dict["id"] = str(product.id)
+    p_dict["company_id"] = ref_id(product, "company")
+    return p_dict
 
 @router.get("/", response_model=List[ProductOut])
 async def get_products(
     skip: int = 0, 
     limit: int = 100,
     category: Optional[str] = None,
-    status: Optional[str] = "active"
+    status: Optional[str] = "active",
+    company_id: Optional[str] = None,
+    include: Optional[str] = Query(None, description="Linked entities to embed: company"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[str] = Query(None, pattern=STREAM_PATTERN, description=STREAM_DESCRIPTION),
+    loader: EntityLoader = Depends(EntityLoader)
 ):
     query = {}
     if category:
         query["category"] = category
     if status:
         query["status"] = status
+    if company_id:
+        query["company_id"] = validate_object_id(company_id, "company_id")
         
+    field_names = parse_fields(fields, ProductOut)
+    if field_names:
+        # Keep the ids `include=` needs even if the caller didn't ask for them
+        field_names += [f for f in include_id_fields(include, PRODUCT_RELATIONS) if f not in field_names]
+        if stream:
+            rows = iter_projected(Product, query, field_names, skip=skip, limit=limit, batch_size=STREAM_BATCH_SIZE)
+            return stream_response(rows, json_serializer, stream, include_transform(include, PRODUCT_RELATIONS))
+        rows = await find_projected(Product, query, field_names, skip=skip, limit=limit)
+        return projected_response(await expand_includes(rows, include, PRODUCT_RELATIONS, loader))
+    
+    if stream:
+        # Iterate the cursor batch by batch instead of materializing the whole page
+        cursor = Product.find(query, batch_size=STREAM_BATCH_SIZE).skip(skip).limit(limit)
+        rows = (build_product_response(product) async for product in cursor)
+        return stream_response(rows, schema_serializer(ProductOut), stream, include_transform(include, PRODUCT_RELATIONS))
+    
     products = await Product.find(query).skip(skip).limit(limit).to_list()
     
-    # Manual response building to include company_id
-    results = []
-    for product in products:
-        p_dict = product.dict()
-        p_dict["id"] = str(product.id)
-        p_dict["company_id"] = get_link_id(product.company)
-        results.append(p_dict)
-        
-    return results
+    results = [build_product_response(product) for product in products]
+    return await expand_includes(results, include, PRODUCT_RELATIONS, loader)
 
 @router.post("/", response_model=ProductOut)
 async def create_product(product_in: ProductCreate):
@@ -68,66 +88,94 @@ async def create_product(product_in: ProductCreate):
     
     if company_id:
         validated_company_id = validate_object_id(company_id, "company_id")
-        company = await Company.get(validated_company_id)
+        company = await company_cache.get(validated_company_id)
         if not company:
             raise HTTPException(status_code=404, detail=f"Company not found: {company_id}")
         product.company = company
+        product.company_id = company.id
+        product.company_name = company.name
         
     await product.insert()
+    await record_activity("create", product)
     
-    # Prepare response
-    p_dict = product.dict()
-    p_dict["id"] = str(product.id)
-    p_dict["company_id"] = company_id
-    
-    return p_dict
+    return build_product_response(product)
+
+@router.get("/batch", response_model=BatchGetResponse[ProductOut])
+async def batch_get_products(
+    ids: str = Query(..., description="Comma-separated product ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    return await fetch_by_ids(Product, split_ids(ids), ProductOut, build_product_response, fields)
+
+@router.post("/batch", response_model=BatchGetResponse[ProductOut])
+async def batch_get_products_by_body(body: BatchGetRequest):
+    # Same as GET /batch, for id sets too large for a query string
+    return await fetch_by_ids(Product, body.ids, ProductOut, build_product_response, body.fields)
+
+@router.post("/bulk-update", response_model=BulkResult)
+async def bulk_update_products(body: BulkUpdateRequest[ProductBulkFilter, ProductUpdate]):
+    """Set fields on every product matching the filter, in `_id`-range chunks."""
+    return await bulk_update(Product, product_bulk_query(body.filter), await resolve_company_update(body.set.dict(exclude_unset=True)), body.dry_run)
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete_products(body: BulkDeleteRequest[ProductBulkFilter]):
+    """Delete every product matching the filter, in `_id`-range chunks."""
+    return await bulk_delete(Product, product_bulk_query(body.filter), body.dry_run)
 
 @router.get("/{product_id}", response_model=ProductOut)
-async def get_product(product_id: str):
+async def get_product(product_id: str, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
     validated_id = validate_object_id(product_id)
+    field_names = parse_fields(fields, ProductOut)
+    if field_names:
+        row = await get_projected(Product, product_id, field_names)
+        if not row:
+            raise HTTPException(status_code=404, detail="Product not found")
+        return projected_response(row)
+    
     product = await Product.get(validated_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
         
-    p_dict = product.dict()
-    p_dict["id"] = str(product.id)
-    p_dict["company_id"] = get_link_id(product.company)
-    
-    return p_dict
+    return build_product_response(product)
 
-@router.put("/{product_id}", response_model=ProductOut)
-async def update_product(product_id: str, product_in: ProductUpdate):
-    validated_id = validate_object_id(product_id)
-    product = await Product.get(validated_id)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
-    
-    update_data = product_in.dict(exclude_unset=True)
-    update_data["updated_at"] = datetime.utcnow()
-    
-    # Handle company update logic
+async def resolve_company_update(update_data: dict) -> dict:
+    """Turn `company_id` in update data into the Link + flat id pair; an empty value clears it."""
     if "company_id" in update_data:
         company_id = update_data.pop("company_id")
         if company_id:
             validated_company_id = validate_object_id(company_id, "company_id")
-            company = await Company.get(validated_company_id)
+            company = await company_cache.get(validated_company_id)
             if not company:
                 raise HTTPException(status_code=404, detail=f"Company not found: {company_id}")
-            update_data["company"] = company
+            update_data["company"] = link_ref(company)
+            update_data["company_id"] = company.id
+            update_data["company_name"] = company.name
         else:
             update_data["company"] = None
+            update_data["company_id"] = None
+            update_data["company_name"] = None
+    return update_data
+
+def product_bulk_query(filter_in: ProductBulkFilter) -> dict:
+    query = bulk_query(filter_in)
+    if "company_id" in query:
+        query["company_id"] = validate_object_id(query["company_id"], "company_id")
+    return query
+
+@router.put("/{product_id}", response_model=ProductOut)
+async def update_product(product_id: str, product_in: ProductUpdate, actor: Optional[str] = Depends(current_actor)):
+    validated_id = validate_object_id(product_id)
     
-    await product.set(update_data)
+    update_data = await resolve_company_update(product_in.dict(exclude_unset=True))
     
-    p_dict = product.dict()
-    p_dict["id"] = str(product.id)
-    # Ensure company_id is in response
-    if "company" in update_data:
-        p_dict["company_id"] = get_link_id(update_data["company"])
-    else:
-        p_dict["company_id"] = get_link_id(product.company)
-        
-    return p_dict
+    result = await update_fields_with_previous(Product, validated_id, update_data)
+    if not result:
+        raise HTTPException(status_code=404, detail="Product not found")
+    before, product = result
+    await record_audit(Product, product.id, before, update_data, actor)
+    await record_activity("update", product, update_data)
+    
+    return build_product_response(product)
 
 @router.delete("/{product_id}")
 async def delete_product(product_id: str):
@@ -135,4 +183,5 @@ async def delete_product(product_id: str):
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     await product.delete()
+    await record_activity("delete", product)
     return {"message": "Product deleted successfully"}
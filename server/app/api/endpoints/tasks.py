@@ -1,14 +1,30 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Depends
+from typing import List, Optional
+from datetime import date
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut
+from app.schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskBulkFilter, TaskCalendarDay
+from app.schemas.common import BatchGetRequest, BatchGetResponse, BulkUpdateRequest, BulkDeleteRequest, BulkResult, CursorPage
+from app.core.batch import fetch_by_ids, split_ids
+from app.core.activity import record_activity
+from app.core.audit import record_audit, current_actor
+from app.core.bulk import bulk_query, bulk_update, bulk_delete
+from app.core.events import publish_change
+from app.core.pagination import decode_cursor, after_cursor, cursor_page
+from app.core.task_due import DUE_SORT, due_query, calendar_pipeline, parse_timezone
+from app.core.projection import parse_fields, find_projected, iter_projected, get_projected, projected_response
+from app.core.streaming import stream_response, schema_serializer, json_serializer, STREAM_PATTERN, STREAM_DESCRIPTION
+from app.core.config import STREAM_BATCH_SIZE
+from app.core.reminders import reminders
+from app.core.updates import update_fields_with_previous
 
 router = APIRouter()
 
 @router.get("/", response_model=List[TaskOut])
 async def get_tasks(
     related_to_type: str = None,
-    related_to_id: str = None
+    related_to_id: str = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    stream: Optional[str] = Query(None, pattern=STREAM_PATTERN, description=STREAM_DESCRIPTION)
 ):
     search_criteria = {}
     if related_to_type:
@@ -16,6 +32,21 @@ async def get_tasks(
     if related_to_id:
         search_criteria["related_to_id"] = related_to_id
         
+    field_names = parse_fields(fields, TaskOut)
+    if field_names:
+        if stream:
+            rows = iter_projected(Task, search_criteria, field_names, sort=[("created_at", -1)], batch_size=STREAM_BATCH_SIZE)
+            return stream_response(rows, json_serializer, stream)
+        return projected_response(
+            await find_projected(Task, search_criteria, field_names, sort=[("created_at", -1)])
+        )
+        
+    if stream:
+        # Iterate the cursor batch by batch instead of materializing the whole list
+        cursor = Task.find(search_criteria, batch_size=STREAM_BATCH_SIZE).sort("-created_at")
+        rows = (task.dict(by_alias=True) async for task in cursor)
+        return stream_response(rows, schema_serializer(TaskOut), stream)
+        
     if search_criteria:
         return await Task.find(search_criteria).sort("-created_at").to_list()
         
@@ -25,11 +56,100 @@ async def get_tasks(
 async def create_task(task_in: TaskCreate):
     task = Task(**task_in.dict())
     await task.insert()
+    reminders.schedule(task)
+    publish_change(Task, "create", task.id)
+    await record_activity("create", task)
     return task
 
+@router.get("/batch", response_model=BatchGetResponse[TaskOut])
+async def batch_get_tasks(
+    ids: str = Query(..., description="Comma-separated task ids"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return")
+):
+    return await fetch_by_ids(Task, split_ids(ids), TaskOut, fields=fields)
+
+@router.post("/batch", response_model=BatchGetResponse[TaskOut])
+async def batch_get_tasks_by_body(body: BatchGetRequest):
+    # Same as GET /batch, for id sets too large for a query string
+    return await fetch_by_ids(Task, body.ids, TaskOut, fields=body.fields)
+
+@router.post("/bulk-update", response_model=BulkResult)
+async def bulk_update_tasks(body: BulkUpdateRequest[TaskBulkFilter, TaskUpdate]):
+    """Set fields on every task matching the filter, in `_id`-range chunks."""
+    set_data = body.set.dict(exclude_unset=True)
+    result = await bulk_update(Task, bulk_query(body.filter), set_data, body.dry_run)
+    if not body.dry_run and ("due_date" in set_data or "status" in set_data):
+        # The changed ids aren't known here; reread the upcoming reminders instead
+        await reminders.reload()
+    return result
+
+@router.post("/bulk-delete", response_model=BulkResult)
+async def bulk_delete_tasks(body: BulkDeleteRequest[TaskBulkFilter]):
+    """Delete every task matching the filter, in `_id`-range chunks."""
+    return await bulk_delete(Task, bulk_query(body.filter), body.dry_run)
+
+@router.get("/due", response_model=CursorPage[TaskOut])
+async def get_due_tasks(
+    owner_id: str,
+    view: str = Query(..., pattern="^(overdue|today|week)$", description="overdue, today or week"),
+    tz: str = Query("UTC", description="IANA timezone the day boundaries are taken in"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """An owner's open tasks that are overdue, due today or due this week, earliest first."""
+    query = due_query(owner_id, view, parse_timezone(tz))
+    if cursor:
+        query.update(after_cursor(DUE_SORT, decode_cursor(cursor)))
+    
+    rows = await Task.get_motor_collection().find(query).sort(DUE_SORT).limit(limit + 1).to_list(limit + 1)
+    items, next_cursor = cursor_page(rows, limit, DUE_SORT)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/calendar", response_model=List[TaskCalendarDay])
+async def get_task_calendar(
+    start: date,
+    end: date,
+    owner_id: Optional[str] = None,
+    tz: str = Query("UTC", description="IANA timezone the days are taken in"),
+):
+    """Number of tasks due on each day from `start` to `end` (inclusive), by status."""
+    pipeline = calendar_pipeline(start, end, parse_timezone(tz), owner_id)
+    return await Task.get_motor_collection().aggregate(pipeline).to_list(None)
+
 @router.get("/{id}", response_model=TaskOut)
-async def get_task(id: str):
+async def get_task(id: str, fields: Optional[str] = Query(None, description="Comma-separated fields to return")):
+    field_names = parse_fields(fields, TaskOut)
+    if field_names:
+        row = await get_projected(Task, id, field_names)
+        if not row:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return projected_response(row)
+    
     task = await Task.get(id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     return task
+
+@router.put("/{id}", response_model=TaskOut)
+async def update_task(id: str, task_in: TaskUpdate, actor: Optional[str] = Depends(current_actor)):
+    update_data = task_in.dict(exclude_unset=True)
+    result = await update_fields_with_previous(Task, id, update_data)
+    if not result:
+        raise HTTPException(status_code=404, detail="Task not found")
+    before, task = result
+    reminders.schedule(task)
+    await record_audit(Task, task.id, before, update_data, actor)
+    publish_change(Task, "update", task.id, update_data)
+    await record_activity("update", task, update_data)
+    return task
+
+@router.delete("/{id}")
+async def delete_task(id: str):
+    task = await Task.get(id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    await task.delete()
+    reminders.cancel(task.id)
+    publish_change(Task, "delete", task.id)
+    await record_activity("delete", task)
+    return {"message": "Task deleted successfully"}
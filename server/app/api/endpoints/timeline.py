@@ -0,0 +1,36 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from beanie import PydanticObjectId
+from bson.errors import InvalidId
+from app.core.pagination import decode_cursor
+from app.core.timeline import TIMELINE_TYPES, TIMELINE_KINDS, entity_timeline
+from app.schemas.common import CursorPage
+from app.schemas.timeline import TimelineItem
+
+router = APIRouter()
+
+@router.get("/{entity_type}/{id}", response_model=CursorPage[TimelineItem])
+async def get_timeline(
+    entity_type: str,
+    id: str,
+    kinds: Optional[str] = Query(None, description=f"Comma-separated: {', '.join(TIMELINE_KINDS)} (default: all)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Notes, tasks, deals and mail threads of one entity, newest first, in one aggregation."""
+    if entity_type not in TIMELINE_TYPES:
+        raise HTTPException(status_code=400, detail=f"Invalid entity type: {entity_type} (one of: {', '.join(TIMELINE_TYPES)})")
+    try:
+        entity_id = PydanticObjectId(id)
+    except (InvalidId, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid id: {id}")
+    
+    kind_names = [kind.strip() for kind in kinds.split(",") if kind.strip()] if kinds else None
+    unknown = [kind for kind in kind_names or [] if kind not in TIMELINE_KINDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown kinds: {', '.join(unknown)}")
+    
+    items, next_cursor = await entity_timeline(
+        entity_type, entity_id, kind_names, decode_cursor(cursor) if cursor else None, limit
+    )
+    return {"items": items, "next_cursor": next_cursor}
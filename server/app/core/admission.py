@@ -0,0 +1,192 @@
+"""
+Admission control: per-caller rate limits and a concurrency cap on expensive routes.
+
+Every /api/ request is charged one token from the bucket of its caller (the
+user of a valid access token, else the client address) for its route class:
+reads, writes or exports (streamed lists). An empty bucket is a 429 with Retry-After, so one
+runaway integration is throttled without slowing anyone else.
+
+Expensive routes (exports, analytics, bulk writes, timelines) also need one of
+a fixed number of process-wide slots. A request that can't get one within
+EXPENSIVE_QUEUE_TIMEOUT is shed with 503 + Retry-After instead of queueing
+behind work that would hold the Mongo pool.
+"""
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_READS,
+    RATE_LIMIT_READS_BURST,
+    RATE_LIMIT_WRITES,
+    RATE_LIMIT_WRITES_BURST,
+    RATE_LIMIT_EXPORTS,
+    RATE_LIMIT_EXPORTS_BURST,
+    RATE_LIMIT_MAX_BUCKETS,
+    EXPENSIVE_CONCURRENCY,
+    EXPENSIVE_QUEUE_TIMEOUT,
+)
+from app.core.security import bearer_subject
+
+# Route class -> (tokens per second, burst)
+RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "reads": (RATE_LIMIT_READS, RATE_LIMIT_READS_BURST),
+    "writes": (RATE_LIMIT_WRITES, RATE_LIMIT_WRITES_BURST),
+    "exports": (RATE_LIMIT_EXPORTS, RATE_LIMIT_EXPORTS_BURST),
+}
+
+EXPENSIVE_PATH_PARTS = ("/analytics/", "/bulk-update", "/bulk-delete", "/api/timeline/")
+
+
+def route_class(scope: Scope) -> str:
+    if scope["method"] not in ("GET", "HEAD"):
+        return "writes"
+    params = parse_qsl(scope.get("query_string", b"").decode("latin-1"))
+    return "exports" if any(name == "stream" for name, _ in params) else "reads"
+
+
+def is_expensive(scope: Scope, klass: str) -> bool:
+    return klass == "exports" or any(part in scope["path"] for part in EXPENSIVE_PATH_PARTS)
+
+
+def caller_key(scope: Scope) -> str:
+    # Only a verified subject gets its own bucket; made-up credentials would mint a fresh one per request
+    subject = bearer_subject(Headers(scope=scope).get("authorization", ""))
+    if subject:
+        return f"user:{subject}"
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else "anonymous"
+
+
+class TokenBuckets:
+    """Token buckets keyed by (caller, route class); idle buckets are evicted LRU-first."""
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]] = RATE_LIMITS, max_buckets: int = RATE_LIMIT_MAX_BUCKETS):
+        self.limits = limits
+        self.max_buckets = max_buckets
+        # (caller, class) -> (tokens, last refill)
+        self._buckets: "OrderedDict[Tuple[str, str], Tuple[float, float]]" = OrderedDict()
+
+    def take(self, caller: str, klass: str) -> Optional[float]:
+        """Spend one token; returns None if allowed, else seconds until a token is available."""
+        rate, burst = self.limits[klass]
+        key = (caller, klass)
+        now = time.monotonic()
+        tokens, last = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - last) * rate)
+        if tokens < 1:
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            return (1 - tokens) / rate if rate > 0 else 60.0
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+        # An evicted bucket comes back full; keys are verified users or addresses, so a
+        # caller can't force that by varying its credentials
+        while len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+        return None
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class ConcurrencyLimiter:
+    """Fixed number of slots; waits at most `timeout` for one."""
+
+    def __init__(self, limit: int = EXPENSIVE_CONCURRENCY, timeout: float = EXPENSIVE_QUEUE_TIMEOUT):
+        self.limit = limit
+        self.timeout = timeout
+        self.active = 0
+        self.waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def acquire(self) -> bool:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return True
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+
+class AdmissionStats:
+    def __init__(self):
+        self.allowed: Dict[str, int] = {klass: 0 for klass in RATE_LIMITS}
+        self.rate_limited: Dict[str, int] = {klass: 0 for klass in RATE_LIMITS}
+        self.shed = 0
+
+
+stats = AdmissionStats()
+buckets = TokenBuckets()
+expensive = ConcurrencyLimiter()
+
+
+def snapshot() -> dict:
+    return {
+        "allowed": dict(stats.allowed),
+        "rate_limited": dict(stats.rate_limited),
+        "shed": stats.shed,
+        "buckets": len(buckets),
+        "expensive_active": expensive.active,
+        "expensive_waiting": expensive.waiting,
+        "expensive_limit": expensive.limit,
+    }
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the per-caller rate limits and the expensive-route slots."""
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api/", enabled: bool = RATE_LIMIT_ENABLED):
+        self.app = app
+        self.prefix = prefix
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http" or not scope["path"].startswith(self.prefix) or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        klass = route_class(scope)
+        retry_after = buckets.take(caller_key(scope), klass)
+        if retry_after is not None:
+            stats.rate_limited[klass] += 1
+            response = JSONResponse(
+                {"detail": f"Rate limit exceeded for {klass}"},
+                429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+
+        if not is_expensive(scope, klass):
+            stats.allowed[klass] += 1
+            await self.app(scope, receive, send)
+            return
+
+        if not await expensive.acquire():
+            stats.shed += 1
+            response = JSONResponse({"detail": "Server busy, retry shortly"}, 503, headers={"Retry-After": "1"})
+            await response(scope, receive, send)
+            return
+        stats.allowed[klass] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            expensive.release()
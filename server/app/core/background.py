@@ -0,0 +1,14 @@
+import asyncio
+import contextvars
+from typing import Coroutine
+
+
+def start_background_task(coro: Coroutine) -> asyncio.Task:
+    """
+    Start a long-lived worker task in an empty context.
+
+    `create_task` copies the caller's context, and the workers are started
+    lazily from inside a request, so they would otherwise keep that request's
+    `pymongo.timeout()` deadline (see deadlines.py) for the rest of their life.
+    """
+    return contextvars.Context().run(asyncio.get_running_loop().create_task, coro)
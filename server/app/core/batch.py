@@ -0,0 +1,69 @@
+from typing import Callable, List, Optional, Type
+from fastapi import HTTPException
+from beanie import Document, PydanticObjectId
+from bson.errors import InvalidId
+from pydantic import BaseModel
+
+from app.core.config import MAX_BATCH_IDS
+from app.core.projection import parse_fields, mongo_projection, project_row, projected_response
+
+
+def split_ids(ids: Optional[str]) -> List[str]:
+    """Split a comma-separated `ids=` query value."""
+    if not ids:
+        return []
+    return [i.strip() for i in ids.split(",") if i.strip()]
+
+
+def validate_ids(ids: List[str]) -> List[PydanticObjectId]:
+    if not ids:
+        raise HTTPException(status_code=400, detail="At least one id is required")
+    if len(ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many ids: {len(ids)} (max {MAX_BATCH_IDS}); split the request",
+        )
+    object_ids = []
+    for id_str in ids:
+        try:
+            object_ids.append(PydanticObjectId(id_str))
+        except (InvalidId, ValueError, TypeError):
+            raise HTTPException(status_code=400, detail=f"Invalid id: {id_str}")
+    return object_ids
+
+
+async def fetch_by_ids(
+    model: Type[Document],
+    ids: List[str],
+    schema: Type[BaseModel],
+    build: Optional[Callable[[Document], dict]] = None,
+    fields=None,
+):
+    """
+    Fetch many documents with a single `$in` query.
+
+    Results come back in request order with None for ids that don't exist, plus
+    an explicit `missing` list. With `fields`, the query is projected and the
+    rows bypass the response model so unrequested fields are left out.
+    """
+    object_ids = validate_ids(ids)
+    unique_ids = list(dict.fromkeys(object_ids))
+
+    if isinstance(fields, list):
+        fields = ",".join(fields)
+    field_names = parse_fields(fields, schema)
+
+    if field_names:
+        cursor = model.get_motor_collection().find({"_id": {"$in": unique_ids}}, mongo_projection(field_names))
+        found = {str(raw["_id"]): project_row(raw, field_names) async for raw in cursor}
+    else:
+        docs = await model.find({"_id": {"$in": unique_ids}}).to_list()
+        found = {str(doc.id): build(doc) if build else doc for doc in docs}
+
+    results = [found.get(str(object_id)) for object_id in object_ids]
+    missing = [id_str for id_str, object_id in zip(ids, object_ids) if str(object_id) not in found]
+    payload = {"results": results, "missing": missing}
+
+    if field_names:
+        return projected_response(payload)
+    return payload
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+from app.core.background import start_background_task
+from app.core.config import WRITER_BATCH_SIZE, WRITER_FLUSH_INTERVAL, WRITER_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+Flush = Callable[[List[dict]], Awaitable[None]]
+
+
+class BufferedWriter:
+    """
+    Off-request batching for append-only writes (events, activity, audit).
+
+    Handlers `put()` documents into a bounded in-memory queue and return; a
+    background task drains it and calls `flush` with up to `batch_size`
+    documents, either when a batch fills up or `flush_interval` seconds after
+    the first queued document. When the queue is full `put()` waits, which
+    pushes back on the handlers instead of growing memory without bound.
+
+    The flush task starts on first use. `stop()` drains what is queued; call
+    it on application shutdown so nothing accepted is lost.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Flush,
+        batch_size: int = WRITER_BATCH_SIZE,
+        flush_interval: float = WRITER_FLUSH_INTERVAL,
+        max_queue: int = WRITER_QUEUE_SIZE,
+    ):
+        self.name = name
+        self._flush = flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Documents taken off the queue but not yet written, and the write in progress
+        self._batch: List[dict] = []
+        self._inflight: Optional[asyncio.Future] = None
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue(maxsize=self.max_queue)
+            self._task = start_background_task(self._run())
+
+    async def put(self, doc: dict) -> None:
+        self._ensure_started()
+        await self._queue.put(doc)
+
+    async def _fill_batch(self) -> None:
+        self._batch.append(await self._queue.get())
+        deadline = asyncio.get_running_loop().time() + self.flush_interval
+        while len(self._batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _write(self, batch: List[dict]) -> None:
+        try:
+            await self._flush(batch)
+            self.written += len(batch)
+        except Exception:
+            # A failed batch must not kill the writer; it is counted and logged
+            self.failed += len(batch)
+            logger.exception("%s: failed to write %d documents", self.name, len(batch))
+        finally:
+            self.flushes += 1
+
+    async def _run(self) -> None:
+        while True:
+            await self._fill_batch()
+            batch, self._batch = self._batch, []
+            # Shielded so stop() cancelling the loop never interrupts a write half-way
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+
+    async def drain(self) -> None:
+        """Write everything currently queued, in batches, without waiting for the timer."""
+        if self._queue is None:
+            return
+        while not self._queue.empty():
+            batch = []
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._write(batch)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._inflight is not None:
+            await self._inflight
+        if self._batch:
+            batch, self._batch = self._batch, []
+            await self._write(batch)
+        await self.drain()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue else 0,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
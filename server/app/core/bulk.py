@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import AsyncIterator, List, Type
+from uuid import uuid4
+from fastapi import HTTPException
+from beanie import Document
+from beanie.odm.utils.encoder import Encoder
+from pydantic import BaseModel
+
+from app.core.activity import record_bulk_activity
+from app.core.config import BULK_CHUNK_SIZE
+from app.core.events import publish_change
+
+
+def bulk_query(filter_in: BaseModel) -> dict:
+    """Equality filter from the set fields of a bulk filter schema; an empty filter is refused."""
+    query = Encoder().encode(filter_in.dict(exclude_none=True))
+    if not query:
+        raise HTTPException(status_code=400, detail="A bulk operation needs at least one filter field")
+    return query
+
+
+async def id_chunks(model: Type[Document], query: dict, chunk_size: int = BULK_CHUNK_SIZE) -> AsyncIterator[dict]:
+    """
+    Yield `_id` range filters covering the documents matching `query`, chunk by chunk.
+
+    Each chunk is one `update_many`/`delete_many`, so no single write holds the
+    collection for the whole operation and a large change interleaves with
+    normal traffic.
+    """
+    collection = model.get_motor_collection()
+    last_id = None
+    while True:
+        chunk_query = {**query, "_id": {"$gt": last_id}} if last_id else query
+        ids: List = [
+            raw["_id"]
+            async for raw in collection.find(chunk_query, {"_id": 1}).sort("_id", 1).limit(chunk_size)
+        ]
+        if not ids:
+            return
+        yield {**query, "_id": {"$gte": ids[0], "$lte": ids[-1]}}
+        last_id = ids[-1]
+
+
+async def bulk_update(model: Type[Document], query: dict, set_data: dict, dry_run: bool = False) -> dict:
+    collection = model.get_motor_collection()
+    if dry_run:
+        return {"matched": await collection.count_documents(query), "dry_run": True}
+    if not set_data:
+        raise HTTPException(status_code=400, detail="Nothing to update")
+
+    values = {**set_data, "updated_at": datetime.utcnow()}
+    matched = modified = 0
+    async for chunk in id_chunks(model, query):
+        if model.get_settings().use_revision:
+            values["revision_id"] = uuid4()
+        result = await collection.update_many(chunk, {"$set": Encoder().encode(values)})
+        matched += result.matched_count
+        modified += result.modified_count
+    if modified:
+        publish_change(model, "update", fields=values)
+        await record_bulk_activity(model, "update", modified, set_data)
+    return {"matched": matched, "modified": modified}
+
+
+async def bulk_delete(model: Type[Document], query: dict, dry_run: bool = False) -> dict:
+    collection = model.get_motor_collection()
+    if dry_run:
+        return {"matched": await collection.count_documents(query), "dry_run": True}
+
+    deleted = 0
+    async for chunk in id_chunks(model, query):
+        result = await collection.delete_many(chunk)
+        deleted += result.deleted_count
+    if deleted:
+        publish_change(model, "delete")
+        await record_bulk_activity(model, "delete", deleted)
+    # Everything deleted was matched; re-counting afterwards would race new inserts
+    return {"matched": deleted, "deleted": deleted}
@@ -0,0 +1,207 @@
+"""
+Background cleanup of dependents after a company, person or lead is deleted.
+
+The delete endpoints only remove the entity itself and queue a CascadeJob.
+A single worker task then walks the job's steps, one per dependent
+collection, and unlinks or deletes the referencing documents in batches.
+Every batch re-queries "documents still referencing the entity", so running a
+step twice is harmless, and progress is saved after each batch so jobs left
+pending or running by a restart are picked up again by `recover()`.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple, Type
+from uuid import uuid4
+
+from beanie import Document, PydanticObjectId
+from beanie.odm.utils.encoder import Encoder
+
+from app.core.background import start_background_task
+from app.core.config import CASCADE_BATCH_SIZE
+from app.core.events import publish_change
+from app.core.links import link_query
+from app.models.cascade_job import CascadeJob, CascadeStep
+from app.models.company import Company
+from app.models.person import Person
+from app.models.product import Product
+from app.models.deal import Deal
+from app.models.task import Task
+from app.models.note import Note
+from app.models.lead import Lead
+from app.models.lead_thread import LeadThread
+
+logger = logging.getLogger(__name__)
+
+ENTITY_MODELS: Dict[str, Type[Document]] = {
+    "company": Company,
+    "person": Person,
+    "lead": Lead,
+}
+
+
+def _link_match(field: str):
+    def match(entity_id: str) -> dict:
+        return link_query(field, PydanticObjectId(entity_id))
+    return match
+
+
+def _related_match(entity_type: str):
+    def match(entity_id: str) -> dict:
+        return {"related_to_type": entity_type, "related_to_id": entity_id}
+    return match
+
+
+# Per policy, for each dependent collection: (model, action, match builder, fields cleared on unlink)
+Policy = Tuple[Type[Document], str, Callable[[str], dict], Optional[dict]]
+
+CASCADE_POLICIES: Dict[str, List[Policy]] = {
+    "company": [
+        (Person, "unlink", _link_match("company"), {"company": None, "company_id": None, "company_name": None}),
+        (Deal, "unlink", _link_match("company"), {"company": None, "company_id": None, "company_name": None}),
+        (Product, "unlink", _link_match("company"), {"company": None, "company_id": None, "company_name": None}),
+        (Note, "delete", _related_match("company"), None),
+        (Task, "unlink", _related_match("company"), {"related_to_type": None, "related_to_id": None}),
+    ],
+    "person": [
+        (Deal, "unlink", _link_match("contact"), {"contact": None, "contact_id": None}),
+        (Note, "delete", _related_match("person"), None),
+        (Task, "unlink", _related_match("person"), {"related_to_type": None, "related_to_id": None}),
+    ],
+    "lead": [
+        (LeadThread, "delete", _link_match("lead"), None),
+        (Note, "delete", _related_match("lead"), None),
+        (Task, "unlink", _related_match("lead"), {"related_to_type": None, "related_to_id": None}),
+    ],
+}
+
+
+async def create_cascade_job(entity_type: str, entity_id) -> CascadeJob:
+    """
+    Record the cleanup job for an entity about to be deleted.
+
+    Call before deleting and `cascade_worker.enqueue(job.id)` after, so a crash
+    in between leaves a job that recovery can finish (or skip, see run_job).
+    """
+    now = datetime.utcnow()
+    job = CascadeJob(
+        entity_type=entity_type,
+        entity_id=str(entity_id),
+        steps=[
+            CascadeStep(collection=model.get_collection_name(), action=action)
+            for model, action, _, _ in CASCADE_POLICIES[entity_type]
+        ],
+        created_at=now,
+        updated_at=now,
+    )
+    await job.insert()
+    return job
+
+
+async def _run_step(job: CascadeJob, index: int, policy: Policy, batch_size: int) -> None:
+    # Steps are re-read through job.steps each time: saving the job may rebuild them
+    model, action, match, unset = policy
+    collection = model.get_motor_collection()
+    query = match(job.entity_id)
+    while True:
+        ids = [raw["_id"] async for raw in collection.find(query, {"_id": 1}).limit(batch_size)]
+        if not ids:
+            break
+        # Filter on the ids *and* the reference so a concurrent re-link is left alone
+        batch_query = {"$and": [{"_id": {"$in": ids}}, query]}
+        if action == "delete":
+            result = await collection.delete_many(batch_query)
+            job.steps[index].processed += result.deleted_count
+            for entity_id in ids:
+                publish_change(model, "delete", entity_id)
+        else:
+            values = {**unset, "updated_at": datetime.utcnow()}
+            if model.get_settings().use_revision:
+                values["revision_id"] = uuid4()
+            result = await collection.update_many(batch_query, {"$set": Encoder().encode(values)})
+            job.steps[index].processed += result.modified_count
+            for entity_id in ids:
+                publish_change(model, "update", entity_id, values)
+        job.updated_at = datetime.utcnow()
+        await job.save()
+    job.steps[index].done = True
+    job.updated_at = datetime.utcnow()
+    await job.save()
+
+
+async def run_job(job: CascadeJob, batch_size: int = CASCADE_BATCH_SIZE) -> None:
+    if job.status in ("done", "skipped"):
+        return
+
+    # The job is written before the entity is deleted; if it still exists the delete never happened
+    if await ENTITY_MODELS[job.entity_type].get(job.entity_id):
+        job.status = "skipped"
+        job.updated_at = datetime.utcnow()
+        await job.save()
+        return
+
+    job.status = "running"
+    job.error = None
+    await job.save()
+    policies = CASCADE_POLICIES[job.entity_type]
+    try:
+        for index, policy in enumerate(policies):
+            if not job.steps[index].done:
+                await _run_step(job, index, policy, batch_size)
+        job.status = "done"
+    except Exception as exc:
+        logger.exception("cascade job %s failed", job.id)
+        job.status = "failed"
+        job.error = str(exc)
+    job.updated_at = datetime.utcnow()
+    await job.save()
+
+
+class CascadeWorker:
+    """One background task draining queued cascade jobs in order."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, job_id) -> None:
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._task = start_background_task(self._run())
+        self._queue.put_nowait(job_id)
+
+    async def _run(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await CascadeJob.get(job_id)
+                if job:
+                    await run_job(job)
+            except Exception:
+                # Keep draining the queue; the job is still pending/running in Mongo and recover() picks it up
+                logger.exception("cascade job %s could not be run", job_id)
+
+    async def recover(self) -> int:
+        """Re-queue jobs a previous process left pending, running or failed."""
+        jobs = await CascadeJob.find(
+            {"status": {"$in": ["pending", "running", "failed"]}}
+        ).sort("created_at").to_list()
+        for job in jobs:
+            self.enqueue(job.id)
+        return len(jobs)
+
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def stop(self) -> None:
+        # Unfinished jobs stay pending/running in Mongo and resume on the next start
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+cascade_worker = CascadeWorker()
@@ -0,0 +1,123 @@
+"""
+Single-flight coalescing of identical concurrent GET requests.
+
+When several identical reads arrive while one is still running (a team opening
+the deals board at the same time), only the first runs the handler; the rest
+wait for it and replay its captured response. Nothing is cached afterwards: once
+the leader finishes, the next request runs normally.
+
+Requests are identical when they share the path, the normalized query string
+and the caller's credentials, so two users never share a response.
+"""
+import asyncio
+import hashlib
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.events import is_event_stream
+
+# Streamed responses are not buffered, so they are never shared
+SKIP_PARAMS = {"stream"}
+
+
+class CoalescingStats:
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+
+    def snapshot(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "fallbacks": self.fallbacks}
+
+
+stats = CoalescingStats()
+
+
+def caller_scope(headers: Headers) -> str:
+    """Opaque per-caller key: a hash of whatever credentials the request carries."""
+    credentials = headers.get("authorization") or headers.get("x-api-key") or ""
+    if not credentials:
+        return "anonymous"
+    return hashlib.sha1(credentials.encode()).hexdigest()
+
+
+def request_key(scope: Scope) -> Optional[Tuple[str, str, str]]:
+    """(path, sorted query, caller) for coalescable requests, None for everything else."""
+    # Event streams never finish, so there is no response to share
+    if is_event_stream(scope):
+        return None
+    headers = Headers(scope=scope)
+    params = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    if any(name in SKIP_PARAMS for name, _ in params):
+        return None
+    return scope["path"], urlencode(sorted(params)), caller_scope(headers)
+
+
+class CoalescingMiddleware:
+    """ASGI middleware sharing one in-flight handler run between identical GETs."""
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api/"):
+        self.app = app
+        self.prefix = prefix
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        key = request_key(scope)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            # shield: a follower going away must not cancel the shared result
+            messages = await asyncio.shield(inflight)
+            if messages is not None:
+                stats.coalesced += 1
+                await self._replay(messages, send)
+                return
+            # The leader failed; run this request on its own
+            stats.fallbacks += 1
+            await self.app(scope, receive, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        stats.leaders += 1
+        messages: List[Message] = []
+
+        async def capture(message: Message) -> None:
+            # Copy before sending: outer middleware may rewrite headers in place
+            messages.append(_copy_message(message))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException:
+            future.set_result(None)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        if not future.done():
+            future.set_result(messages)
+
+    @staticmethod
+    async def _replay(messages: List[Message], send: Send) -> None:
+        for message in messages:
+            message = _copy_message(message)
+            if message["type"] == "http.response.start":
+                message["headers"].append((b"x-coalesced", b"1"))
+            await send(message)
+
+
+def _copy_message(message: Message) -> Message:
+    message = dict(message)
+    if "headers" in message:
+        message["headers"] = list(message["headers"])
+    return message
@@ -0,0 +1,44 @@
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import COMPANY_CACHE_TTL, COMPANY_CACHE_SIZE
+from app.models.company import Company
+
+
+class CompanyCache:
+    """
+    Small per-process TTL cache of companies looked up when linking people, deals
+    and products, so their `company_name` snapshot costs no extra query on hot
+    companies. Renames invalidate the local entry; other processes catch up
+    within the TTL, and the rename fan-out plus check_company_names.py repair
+    anything written in between.
+    """
+
+    def __init__(self, ttl: float = COMPANY_CACHE_TTL, max_entries: int = COMPANY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Company]]" = OrderedDict()
+
+    async def get(self, company_id) -> Optional[Company]:
+        key = str(company_id)
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            return entry[1]
+
+        company = await Company.get(company_id)
+        if company is None:
+            self._entries.pop(key, None)
+            return None
+        self._entries[key] = (time.monotonic() + self.ttl, company)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return company
+
+    def invalidate(self, company_id) -> None:
+        self._entries.pop(str(company_id), None)
+
+
+company_cache = CompanyCache()
@@ -0,0 +1,140 @@
+"""
+Denormalized `company_name` on people, deals and products.
+
+The name is written alongside the company reference when a document is linked
+(see company_cache). When a company is renamed, `company_renames` propagates
+the new name in the background with chunked `update_many` calls, and
+`check_company_names` finds (and optionally repairs) any snapshot that still
+differs from its company, e.g. after a crash mid-propagation.
+"""
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Type
+
+from beanie import Document
+
+from app.core.background import start_background_task
+from app.core.bulk import id_chunks
+from app.core.company_cache import company_cache
+from app.core.events import publish_change
+from app.models.company import Company
+from app.models.person import Person
+from app.models.deal import Deal
+from app.models.product import Product
+
+logger = logging.getLogger(__name__)
+
+DENORMALIZED_MODELS: List[Type[Document]] = [Person, Deal, Product]
+
+
+async def propagate_company_name(company_id) -> int:
+    """Copy the company's current name onto every linked document that differs; returns changed count."""
+    company = await Company.get(company_id)
+    if company is None:
+        return 0
+    changed = 0
+    for model in DENORMALIZED_MODELS:
+        query = {"company_id": company.id, "company_name": {"$ne": company.name}}
+        modified = 0
+        async for chunk in id_chunks(model, query):
+            result = await model.get_motor_collection().update_many(
+                chunk, {"$set": {"company_name": company.name}}
+            )
+            modified += result.modified_count
+        if modified:
+            publish_change(model, "update", fields=["company_name"])
+        changed += modified
+    return changed
+
+
+class CompanyRenameWorker:
+    """
+    Runs rename propagation one company at a time, off the request path.
+
+    Each run reads the company's name when it starts, and renames are processed
+    in the order they were queued, so the last rename always wins. A company
+    queued again while waiting is only propagated once.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.propagated = 0
+
+    def enqueue(self, company_id) -> None:
+        company_cache.invalidate(company_id)
+        if self._task is None or self._task.done():
+            self._queue = self._queue or asyncio.Queue()
+            self._task = start_background_task(self._run())
+        key = str(company_id)
+        if key not in self._queued:
+            self._queued.add(key)
+            self._queue.put_nowait(key)
+
+    async def _run(self) -> None:
+        while True:
+            key = await self._queue.get()
+            self._queued.discard(key)
+            try:
+                self.propagated += await propagate_company_name(key)
+            except Exception:
+                logger.exception("company name propagation failed for %s", key)
+
+    def stats(self) -> dict:
+        return {"queued": self._queue.qsize() if self._queue else 0, "propagated": self.propagated}
+
+    async def stop(self) -> None:
+        # Anything still queued is caught by check_company_names.py
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+company_renames = CompanyRenameWorker()
+
+
+async def check_company_names(fix: bool = False, batch_size: int = 500) -> Dict[str, dict]:
+    """
+    Compare every company_name snapshot with its company, one batch of companies at a time.
+
+    Per batch and collection a single `$group` returns the distinct
+    (company_id, company_name) pairs, so the check reads the dependents once
+    without loading them. With `fix`, mismatched snapshots are rewritten.
+    References to deleted companies are left to the cascade worker.
+    """
+    report = {model.get_collection_name(): {"mismatched": 0, "fixed": 0, "sample_company_ids": []} for model in DENORMALIZED_MODELS}
+    companies = Company.get_motor_collection()
+    last_id = None
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id else {}
+        batch = await companies.find(query, {"name": 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        names = {company["_id"]: company.get("name") for company in batch}
+        last_id = batch[-1]["_id"]
+
+        for model in DENORMALIZED_MODELS:
+            entry = report[model.get_collection_name()]
+            pipeline = [
+                {"$match": {"company_id": {"$in": list(names)}}},
+                {"$group": {"_id": {"company_id": "$company_id", "name": "$company_name"}, "count": {"$sum": 1}}},
+            ]
+            async for group in model.get_motor_collection().aggregate(pipeline):
+                company_id = group["_id"]["company_id"]
+                if group["_id"].get("name") == names[company_id]:
+                    continue
+                entry["mismatched"] += group["count"]
+                if len(entry["sample_company_ids"]) < 20:
+                    entry["sample_company_ids"].append(str(company_id))
+                if fix:
+                    result = await model.get_motor_collection().update_many(
+                        {"company_id": company_id, "company_name": {"$ne": names[company_id]}},
+                        {"$set": {"company_name": names[company_id]}},
+                    )
+                    entry["fixed"] += result.modified_count
+    return report
@@ -0,0 +1,288 @@
+"""
+gzip / brotli response compression negotiated from Accept-Encoding.
+
+Buffered responses get a weak ETag computed from the identity body, so clients
+can revalidate with If-None-Match, and the compressed bytes are kept in a small
+LRU keyed by (ETag, encoding): a hot, unchanged list is compressed once and then
+served from memory. Streamed responses (stream=json|ndjson) are compressed
+chunk by chunk and never cached.
+"""
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import (
+    COMPRESSION_MIN_SIZE,
+    COMPRESSION_LEVEL,
+    BROTLI_QUALITY,
+    COMPRESSION_CACHE_SIZE,
+    COMPRESSION_CACHE_MAX_BYTES,
+)
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; fall back to gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Event streams are left alone: compressors buffer, and SSE messages must go out as they are written
+UNCOMPRESSED_TYPES = ("text/event-stream",)
+
+
+def _supported_encodings() -> List[str]:
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best encoding we support from an Accept-Encoding header, or None."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token] = q
+
+    best, best_q = None, 0.0
+    # Server preference order breaks ties: brotli first, then gzip
+    for encoding in _supported_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_LEVEL, mtime=0)
+
+
+def make_etag(body: bytes) -> str:
+    # Weak: the same ETag is valid for every content-coding of this body
+    return f'W/"{hashlib.sha1(body).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class CompressedBodyCache:
+    """Small LRU of compressed bodies keyed by (ETag, encoding), bounded by entries and bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str, encoding: str) -> Optional[bytes]:
+        body = self._entries.get((etag, encoding))
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((etag, encoding))
+        self.hits += 1
+        return body
+
+    def put(self, etag: str, encoding: str, body: bytes) -> None:
+        if self.max_entries <= 0 or len(body) > self.max_bytes:
+            return
+        key = (etag, encoding)
+        if key in self._entries:
+            return
+        self._entries[key] = body
+        self._bytes += len(body)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class _StreamCompressor:
+    """Incremental compressor for chunked responses; flushes after every chunk."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+response_cache = CompressedBodyCache(COMPRESSION_CACHE_SIZE, COMPRESSION_CACHE_MAX_BYTES)
+
+
+class CompressionMiddleware:
+    """ASGI middleware negotiating gzip/brotli with a size threshold and an ETag-keyed cache."""
+
+    def __init__(self, app: ASGIApp, cache: Optional[CompressedBodyCache] = None):
+        self.app = app
+        self.cache = cache or response_cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = negotiate_encoding(request_headers.get("accept-encoding", ""))
+        cacheable = scope["method"] == "GET"
+        if encoding is None and not cacheable:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(
+            self.cache, encoding, cacheable, request_headers.get("if-none-match"), send
+        )
+        await self.app(scope, receive, responder)
+
+
+class _CompressionResponder:
+    def __init__(
+        self,
+        cache: CompressedBodyCache,
+        encoding: Optional[str],
+        cacheable: bool,
+        if_none_match: Optional[str],
+        send: Send,
+    ):
+        self.cache = cache
+        self.encoding = encoding
+        self.cacheable = cacheable
+        self.if_none_match = if_none_match
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.body_parts: List[bytes] = []
+        self.passthrough = False
+        self.streamer: Optional[_StreamCompressor] = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+                or content_type.startswith(UNCOMPRESSED_TYPES)
+            )
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.streamer is not None:
+            data = self.streamer.chunk(body) if body else b""
+            if not more_body:
+                data += self.streamer.finish()
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        if more_body and not self.body_parts:
+            # First chunk of a streamed response: compress incrementally, no ETag/caching
+            await self._start_stream(body)
+            return
+
+        self.body_parts.append(body)
+        if not more_body:
+            await self._send_buffered(b"".join(self.body_parts))
+
+    async def _start_stream(self, first_chunk: bytes) -> None:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if self.encoding is None:
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": first_chunk, "more_body": True})
+            return
+
+        self.streamer = _StreamCompressor(self.encoding)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": self.streamer.chunk(first_chunk), "more_body": True})
+
+    async def _send_buffered(self, body: bytes) -> None:
+        message = self.start_message
+        headers = MutableHeaders(raw=message["headers"])
+        status = message["status"]
+
+        etag = None
+        # Only successful GETs get an ETag (and so a compressed-body cache entry)
+        if self.cacheable and status == 200:
+            etag = headers.get("etag") or make_etag(body)
+            headers["ETag"] = etag
+            if self.if_none_match and etag_matches(self.if_none_match, etag):
+                del headers["content-length"]
+                if "content-type" in headers:
+                    del headers["content-type"]
+                headers.add_vary_header("Accept-Encoding")
+                message["status"] = 304
+                await self.send(message)
+                await self.send({"type": "http.response.body", "body": b""})
+                return
+
+        if self.encoding is None or len(body) < COMPRESSION_MIN_SIZE:
+            await self.send(message)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+
+        compressed = self.cache.get(etag, self.encoding) if etag else None
+        if compressed is None:
+            compressed = compress(body, self.encoding)
+            if etag:
+                self.cache.put(etag, self.encoding, compressed)
+
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await self.send(message)
+        await self.send({"type": "http.response.body", "body": compressed})
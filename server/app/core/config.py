@@ -0,0 +1,79 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Upper bound on ids accepted by the batch multi-get endpoints
+MAX_BATCH_IDS = int(os.getenv("MAX_BATCH_IDS", "500"))
+
+# Documents fetched per cursor batch (and rows per chunk) for streamed list responses
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+# Response compression: bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# gzip level (1-9) and brotli quality (0-11); brotli is used only if the package is installed
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# Compressed bodies kept per (ETag, encoding); 0 disables the cache
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))
+COMPRESSION_CACHE_MAX_BYTES = int(os.getenv("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Buffered background writers (stage events, activity, audit): batch size, max seconds
+# a document waits before being written, and queue bound before handlers are slowed down
+WRITER_BATCH_SIZE = int(os.getenv("WRITER_BATCH_SIZE", "500"))
+WRITER_FLUSH_INTERVAL = float(os.getenv("WRITER_FLUSH_INTERVAL", "1.0"))
+WRITER_QUEUE_SIZE = int(os.getenv("WRITER_QUEUE_SIZE", "10000"))
+
+# Documents per _id-range chunk for filter-based bulk update/delete
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+
+# Dependents unlinked/deleted per batch by the cascade worker after a company/person/lead delete
+CASCADE_BATCH_SIZE = int(os.getenv("CASCADE_BATCH_SIZE", "500"))
+
+# Companies cached for write-time company_name snapshots (seconds, entries)
+COMPANY_CACHE_TTL = float(os.getenv("COMPANY_CACHE_TTL", "60"))
+COMPANY_CACHE_SIZE = int(os.getenv("COMPANY_CACHE_SIZE", "10000"))
+
+# Live change events (SSE): "auto" uses Mongo change streams when the deployment
+# supports them and falls back to events published by this process's handlers
+EVENTS_SOURCE = os.getenv("EVENTS_SOURCE", "auto")
+# Recent events kept for Last-Event-ID resume, events buffered per client, seconds between keep-alives
+EVENTS_HISTORY_SIZE = int(os.getenv("EVENTS_HISTORY_SIZE", "5000"))
+EVENTS_CLIENT_BUFFER = int(os.getenv("EVENTS_CLIENT_BUFFER", "1000"))
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+# Days an entry stays in the recent-activity feed (TTL index; changing it needs the index rebuilt)
+ACTIVITY_RETENTION_DAYS = int(os.getenv("ACTIVITY_RETENTION_DAYS", "90"))
+
+# Idempotency-Key records: seconds a stored response is replayed (TTL index), responses
+# cached in-process, seconds before an unfinished claim (crashed request) may be taken over
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+IDEMPOTENCY_LOCK_TIMEOUT = float(os.getenv("IDEMPOTENCY_LOCK_TIMEOUT", "60"))
+
+# Per-caller token buckets per route class: sustained requests/second and burst size
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+RATE_LIMIT_READS = float(os.getenv("RATE_LIMIT_READS", "20"))
+RATE_LIMIT_READS_BURST = float(os.getenv("RATE_LIMIT_READS_BURST", "100"))
+RATE_LIMIT_WRITES = float(os.getenv("RATE_LIMIT_WRITES", "5"))
+RATE_LIMIT_WRITES_BURST = float(os.getenv("RATE_LIMIT_WRITES_BURST", "30"))
+RATE_LIMIT_EXPORTS = float(os.getenv("RATE_LIMIT_EXPORTS", "0.2"))
+RATE_LIMIT_EXPORTS_BURST = float(os.getenv("RATE_LIMIT_EXPORTS_BURST", "3"))
+RATE_LIMIT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", "100000"))
+# Expensive routes (exports, analytics, bulk, timeline) running at once per process, and
+# seconds a request may wait for a slot before it is shed with 503
+EXPENSIVE_CONCURRENCY = int(os.getenv("EXPENSIVE_CONCURRENCY", "8"))
+EXPENSIVE_QUEUE_TIMEOUT = float(os.getenv("EXPENSIVE_QUEUE_TIMEOUT", "0.5"))
+
+# Seconds of database time a request may use, per route class; sent as maxTimeMS and
+# enforced client-side by pymongo.timeout()
+QUERY_TIMEOUT_READS = float(os.getenv("QUERY_TIMEOUT_READS", "10"))
+QUERY_TIMEOUT_WRITES = float(os.getenv("QUERY_TIMEOUT_WRITES", "10"))
+QUERY_TIMEOUT_EXPORTS = float(os.getenv("QUERY_TIMEOUT_EXPORTS", "120"))
+
+# Task reminders: set REMINDERS_ENABLED=0 on all but one process, or each fires its own copy.
+# Tasks due within the horizon (seconds) are held in memory; on startup, reminders that
+# came due up to REMINDER_CATCH_UP seconds ago are still sent
+REMINDERS_ENABLED = os.getenv("REMINDERS_ENABLED", "1") == "1"
+REMINDER_HORIZON = float(os.getenv("REMINDER_HORIZON", "86400"))
+REMINDER_CATCH_UP = float(os.getenv("REMINDER_CATCH_UP", "300"))
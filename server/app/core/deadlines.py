@@ -0,0 +1,116 @@
+"""
+Per-request database deadlines and cancellation when the client goes away.
+
+Each /api/ request runs under `pymongo.timeout()` for its route class, so every
+Motor query, aggregation and cursor batch it issues carries a maxTimeMS
+derived from the time left, and the server stops work nobody will wait for.
+A request that runs out of time gets 504.
+
+The handler runs in its own task while the middleware watches the connection;
+on `http.disconnect` the task is cancelled, which abandons pending Motor calls
+and closes the cursors being iterated (see iter_projected). Streamed responses
+get the same treatment from Starlette itself.
+"""
+import asyncio
+import logging
+from typing import Dict
+
+import pymongo
+from pymongo.errors import PyMongoError
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.admission import route_class
+from app.core.config import QUERY_TIMEOUT_READS, QUERY_TIMEOUT_WRITES, QUERY_TIMEOUT_EXPORTS
+from app.core.events import is_event_stream
+
+logger = logging.getLogger(__name__)
+
+QUERY_TIMEOUTS: Dict[str, float] = {
+    "reads": QUERY_TIMEOUT_READS,
+    "writes": QUERY_TIMEOUT_WRITES,
+    "exports": QUERY_TIMEOUT_EXPORTS,
+}
+
+
+class DeadlineStats:
+    def __init__(self):
+        self.timed_out: Dict[str, int] = {klass: 0 for klass in QUERY_TIMEOUTS}
+        self.cancelled: Dict[str, int] = {klass: 0 for klass in QUERY_TIMEOUTS}
+
+    def snapshot(self) -> dict:
+        return {"timeouts": dict(QUERY_TIMEOUTS), "timed_out": dict(self.timed_out), "cancelled": dict(self.cancelled)}
+
+
+stats = DeadlineStats()
+
+
+class DeadlineMiddleware:
+    """ASGI middleware applying the route-class database deadline and cancelling on disconnect."""
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api/"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        # Event streams are open-ended and run no queries
+        if is_event_stream(scope):
+            await self.app(scope, receive, send)
+            return
+
+        klass = route_class(scope)
+        # Read the body up front so the only thing left on `receive` is the disconnect
+        body_messages = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            body_messages.append(message)
+            if not message.get("more_body", False):
+                break
+
+        disconnected = asyncio.Event()
+        response_started = False
+
+        async def app_receive() -> Message:
+            if body_messages:
+                return body_messages.pop(0)
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def app_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        with pymongo.timeout(QUERY_TIMEOUTS[klass]):
+            # The task copies the context, deadline included
+            handler = asyncio.ensure_future(self.app(scope, app_receive, app_send))
+
+        async def watch() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            disconnected.set()
+            handler.cancel()
+
+        watcher = asyncio.ensure_future(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                raise
+            stats.cancelled[klass] += 1
+        except PyMongoError as exc:
+            if not exc.timeout:
+                raise
+            stats.timed_out[klass] += 1
+            logger.warning("%s %s exceeded its %ss database deadline", scope["method"], scope["path"], QUERY_TIMEOUTS[klass])
+            if not response_started:
+                response = JSONResponse({"detail": "The request took too long and was stopped"}, 504)
+                await response(scope, receive, send)
+        finally:
+            watcher.cancel()
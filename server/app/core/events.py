@@ -0,0 +1,218 @@
+"""
+Live create/update/delete events for deals, tasks, notes and leads.
+
+Events come from one of two sources, chosen by `change_events.start()`:
+
+- change streams: one watcher per process on the database change stream
+  (replica set / sharded cluster). Every write is seen, including those made by
+  scripts, other processes and the background workers, and an event's id is
+  its change stream resume token.
+- local: the endpoint handlers publish their own writes through
+  `publish_change`. Used on a standalone mongod, where change streams are not
+  available, and in tests; only this process's writes are seen.
+
+Both feed the same `EventBus`, which keeps a ring of recent events for
+Last-Event-ID resume and a bounded queue per subscriber. A subscriber that
+falls a whole buffer behind is disconnected instead of buffered without limit;
+EventSource reconnects with Last-Event-ID and is replayed from the ring, or
+sent a `reset` (refetch everything) if it has fallen out of the ring.
+"""
+import asyncio
+import itertools
+import logging
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Set, Tuple, Type, Union
+from uuid import uuid4
+
+from beanie import Document
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.core.background import start_background_task
+from app.core.config import EVENTS_SOURCE, EVENTS_HISTORY_SIZE, EVENTS_CLIENT_BUFFER
+
+logger = logging.getLogger(__name__)
+
+# Collections that publish events; the topic is the collection name
+TOPICS = ("deals", "tasks", "notes", "leads")
+
+OPERATIONS = {"insert": "create", "update": "update", "replace": "update", "delete": "delete"}
+
+# Where the SSE endpoint is mounted; coalescing and deadlines let it through untouched
+EVENTS_PATH = "/api/events"
+
+
+def is_event_stream(scope) -> bool:
+    """Whether a request is for the event stream, whatever its Accept header says."""
+    return scope["path"].rstrip("/") == EVENTS_PATH
+
+
+class Subscriber:
+    def __init__(self, topics: Set[str], buffer: int):
+        self.topics = topics
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        # Set when the queue overflowed; the stream ends once what is queued is sent
+        self.overflowed = False
+
+
+class EventBus:
+    """Fan-out of events to subscribers, with a ring of recent events for resuming."""
+
+    def __init__(self, history: int = EVENTS_HISTORY_SIZE, buffer: int = EVENTS_CLIENT_BUFFER):
+        self.buffer = buffer
+        self._history: Deque[dict] = deque(maxlen=history)
+        self._subscribers: Set[Subscriber] = set()
+        self.published = 0
+        self.overflows = 0
+
+    def publish(self, event: dict) -> None:
+        self._history.append(event)
+        self.published += 1
+        for subscriber in list(self._subscribers):
+            if event["topic"] not in subscriber.topics:
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscriber.overflowed = True
+                self._subscribers.discard(subscriber)
+                self.overflows += 1
+
+    def subscribe(self, topics: Iterable[str], last_event_id: Optional[str] = None) -> Tuple[Subscriber, Optional[List[dict]]]:
+        """
+        Register a subscriber and return it with the events to replay first.
+
+        The replay is None when `last_event_id` is no longer (or never was) in
+        the ring, i.e. the client missed events and has to refetch.
+        """
+        subscriber = Subscriber(set(topics), self.buffer)
+        replay: Optional[List[dict]] = []
+        if last_event_id:
+            replay = None
+            for index, event in enumerate(self._history):
+                if event["id"] == last_event_id:
+                    replay = [e for e in itertools.islice(self._history, index + 1, None) if e["topic"] in subscriber.topics]
+                    break
+        # No await between reading the ring and registering, so nothing falls in between
+        self._subscribers.add(subscriber)
+        return subscriber, replay
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "overflows": self.overflows,
+            "history": len(self._history),
+        }
+
+
+def change_stream_event(change: dict) -> Optional[dict]:
+    """Event for a change stream document, or None for operations we don't publish."""
+    op = OPERATIONS.get(change.get("operationType"))
+    if op is None:
+        return None
+    event = {
+        "id": change["_id"]["_data"],
+        "topic": change["ns"]["coll"],
+        "op": op,
+        "entity_id": str(change["documentKey"]["_id"]),
+        "fields": None,
+    }
+    description = change.get("updateDescription")
+    if description:
+        changed = list(description.get("updatedFields", {})) + list(description.get("removedFields", []))
+        event["fields"] = sorted({name.split(".")[0] for name in changed})
+    return event
+
+
+class ChangeEvents:
+    """Owns the event source and the bus the SSE endpoint subscribes to."""
+
+    def __init__(self):
+        self.bus = EventBus()
+        self.source = "local"
+        self._task: Optional[asyncio.Task] = None
+        # Local event ids are unique per process, so a Last-Event-ID from before a restart resets
+        self._boot = uuid4().hex[:8]
+        self._sequence = itertools.count(1)
+
+    async def start(self, database, source: str = EVENTS_SOURCE) -> None:
+        """Watch `database` if change streams are available (or required), else publish locally."""
+        if source == "local":
+            return
+        pipeline = [{"$match": {"ns.coll": {"$in": list(TOPICS)}, "operationType": {"$in": list(OPERATIONS)}}}]
+        stream = database.watch(pipeline)
+        try:
+            # Opens the cursor, which is where a standalone server refuses
+            first = await stream.try_next()
+        except OperationFailure as exc:
+            await stream.close()
+            if source == "change_stream":
+                raise
+            logger.info("change streams unavailable (%s); publishing events from handlers", exc)
+            return
+        self.source = "change_stream"
+        self._task = start_background_task(self._watch(database, pipeline, stream, first))
+
+    async def _watch(self, database, pipeline, stream, first) -> None:
+        if first is not None:
+            self._publish_change(first)
+        while True:
+            try:
+                async with stream:
+                    async for change in stream:
+                        self._publish_change(change)
+            except PyMongoError:
+                # Resumable errors are retried by the driver; this is anything it gave up on
+                logger.exception("change stream interrupted; reopening")
+                await asyncio.sleep(1)
+            stream = database.watch(pipeline, resume_after=stream.resume_token)
+
+    def _publish_change(self, change: dict) -> None:
+        event = change_stream_event(change)
+        if event:
+            self.bus.publish(event)
+
+    def publish_local(self, topic: str, op: str, entity_id=None, fields: Optional[List[str]] = None) -> None:
+        if self.source != "local" or topic not in TOPICS:
+            return
+        self.bus.publish({
+            "id": f"{self._boot}-{next(self._sequence)}",
+            "topic": topic,
+            "op": op,
+            "entity_id": str(entity_id) if entity_id is not None else None,
+            "fields": sorted(fields) if fields is not None else None,
+        })
+
+    def stats(self) -> dict:
+        return {"source": self.source, **self.bus.stats()}
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+change_events = ChangeEvents()
+
+
+def publish_change(
+    model: Union[Type[Document], str],
+    op: str,
+    entity_id=None,
+    fields: Optional[Iterable[str]] = None,
+) -> None:
+    """
+    Publish a write made by a handler; a no-op when change streams already see it.
+
+    `entity_id` None means "several documents changed" (bulk writes, cascades)
+    and tells clients to refetch the topic.
+    """
+    topic = model if isinstance(model, str) else model.get_collection_name()
+    change_events.publish_local(topic, op, entity_id, list(fields) if fields is not None else None)
@@ -0,0 +1,215 @@
+"""
+Idempotency-Key support for POST requests (creates in particular).
+
+The first request with a given key claims it by inserting an `in_progress`
+record; when the handler finishes, its response is stored on the record (TTL
+indexed) and in a per-process LRU. A retry with the same key, from the same
+caller to the same path, gets the stored response back with an
+`Idempotent-Replayed: true` header and the handler (insert, link lookups) does
+not run again. A retry arriving while the first request is still running waits
+for it when both are in this process, and gets 409 + Retry-After otherwise.
+
+Server errors (5xx), 409 and 429 are not stored, so those can be retried.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.coalescing import caller_scope
+from app.core.config import IDEMPOTENCY_TTL, IDEMPOTENCY_CACHE_SIZE, IDEMPOTENCY_LOCK_TIMEOUT
+from app.models.idempotency_record import IdempotencyRecord
+
+MAX_KEY_LENGTH = 255
+UNSTORED_STATUSES = {409, 429}
+
+
+class IdempotencyStats:
+    def __init__(self):
+        self.stored = 0
+        self.replayed = 0
+        self.conflicts = 0
+        self.mismatched = 0
+
+    def snapshot(self) -> dict:
+        return {"stored": self.stored, "replayed": self.replayed, "conflicts": self.conflicts, "mismatched": self.mismatched}
+
+
+stats = IdempotencyStats()
+
+
+class ResponseCache:
+    """Per-process LRU of finished records, so hot retries skip the Mongo read."""
+
+    def __init__(self, max_entries: int = IDEMPOTENCY_CACHE_SIZE, ttl: float = IDEMPOTENCY_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, dict]]" = OrderedDict()
+
+    def get(self, record_id: str) -> Optional[dict]:
+        entry = self._entries.get(record_id)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(record_id, None)
+            return None
+        self._entries.move_to_end(record_id)
+        return entry[1]
+
+    def put(self, record_id: str, record: dict) -> None:
+        self._entries[record_id] = (time.monotonic() + self.ttl, record)
+        self._entries.move_to_end(record_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+response_cache = ResponseCache()
+
+
+async def claim(record_id: str, request_hash: str) -> Optional[dict]:
+    """Claim the key for this request; returns None if claimed, else the existing record."""
+    collection = IdempotencyRecord.get_motor_collection()
+    now = datetime.utcnow()
+    try:
+        await collection.insert_one({"_id": record_id, "request_hash": request_hash, "status": "in_progress", "created_at": now})
+        return None
+    except DuplicateKeyError:
+        pass
+    # A claim whose request died without finishing (crash, restart) can be taken over
+    result = await collection.update_one(
+        {
+            "_id": record_id,
+            "request_hash": request_hash,
+            "status": "in_progress",
+            "created_at": {"$lt": now - timedelta(seconds=IDEMPOTENCY_LOCK_TIMEOUT)},
+        },
+        {"$set": {"created_at": now}},
+    )
+    if result.modified_count:
+        return None
+    return await collection.find_one({"_id": record_id})
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware storing and replaying the responses of POSTs that carry an Idempotency-Key."""
+
+    def __init__(self, app: ASGIApp, prefix: str = "/api/", cache: Optional[ResponseCache] = None):
+        self.app = app
+        self.prefix = prefix
+        self.cache = cache or response_cache
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await JSONResponse({"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"}, 400)(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        record_id = hashlib.sha256(f"{caller_scope(headers)}\n{scope['path']}\n{key}".encode()).hexdigest()
+        request_hash = hashlib.sha256(body).hexdigest()
+
+        inflight = self._inflight.get(record_id)
+        if inflight is not None:
+            # The first request is running in this process; wait for its response
+            await asyncio.shield(inflight)
+
+        record = self.cache.get(record_id) or await claim(record_id, request_hash)
+        if record is not None:
+            await self._respond_existing(record, request_hash, scope, receive, send)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[record_id] = future
+        try:
+            await self._run_and_store(record_id, request_hash, body, scope, receive, send)
+        finally:
+            self._inflight.pop(record_id, None)
+            future.set_result(None)
+
+    async def _respond_existing(self, record: dict, request_hash: str, scope: Scope, receive: Receive, send: Send) -> None:
+        if record["request_hash"] != request_hash:
+            stats.mismatched += 1
+            response = JSONResponse({"detail": "Idempotency-Key was already used with a different request body"}, 422)
+        elif record["status"] != "done":
+            stats.conflicts += 1
+            response = JSONResponse(
+                {"detail": "A request with this Idempotency-Key is still in progress"}, 409, headers={"Retry-After": "1"}
+            )
+        else:
+            stats.replayed += 1
+            raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+            await send({"type": "http.response.start", "status": record["status_code"], "headers": raw_headers + [(b"idempotent-replayed", b"true")]})
+            await send({"type": "http.response.body", "body": record["body"] or b""})
+            return
+        await response(scope, receive, send)
+
+    async def _run_and_store(self, record_id: str, request_hash: str, body: bytes, scope: Scope, receive: Receive, send: Send) -> None:
+        start: Optional[Message] = None
+        parts: List[bytes] = []
+
+        async def capture(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                parts.append(message.get("body", b""))
+            await send(message)
+
+        collection = IdempotencyRecord.get_motor_collection()
+        try:
+            await self.app(scope, _replay_body(body, receive), capture)
+        except BaseException:
+            await collection.delete_one({"_id": record_id})
+            raise
+        if start is None or start["status"] >= 500 or start["status"] in UNSTORED_STATUSES:
+            # Nothing worth replaying; let the client retry for real
+            await collection.delete_one({"_id": record_id})
+            return
+
+        values = {
+            "status": "done",
+            "status_code": start["status"],
+            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in start["headers"]],
+            "body": b"".join(parts),
+        }
+        await collection.update_one({"_id": record_id}, {"$set": values})
+        self.cache.put(record_id, {"_id": record_id, "request_hash": request_hash, **values})
+        stats.stored += 1
+
+
+async def _read_body(receive: Receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return replay
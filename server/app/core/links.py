@@ -0,0 +1,33 @@
+from typing import Any, Optional
+from beanie import PydanticObjectId
+
+
+def get_link_id(link_obj: Any) -> Optional[PydanticObjectId]:
+    """Safely extract ID from a Beanie Link, DBRef or fetched Document."""
+    if link_obj is None:
+        return None
+    # If it's a Link with ref attribute (unfetched)
+    if hasattr(link_obj, 'ref') and link_obj.ref is not None:
+        return link_obj.ref.id
+    # If it's a fetched document or a raw DBRef
+    if hasattr(link_obj, 'id') and link_obj.id is not None:
+        return link_obj.id
+    return None
+
+
+def ref_id(doc: Any, field: str) -> Optional[str]:
+    """
+    Return the referenced ID for `field` (e.g. "company") as a string.
+
+    Reads the flat `<field>_id` ObjectId first and falls back to the legacy
+    Link/DBRef for documents the link-id migration has not reached yet.
+    """
+    value = getattr(doc, f"{field}_id", None)
+    if value is None:
+        value = get_link_id(getattr(doc, field, None))
+    return str(value) if value is not None else None
+
+
+def link_query(field: str, object_id) -> dict:
+    """Match documents referencing `object_id` by flat `<field>_id` or by a legacy, unmigrated DBRef."""
+    return {"$or": [{f"{field}_id": object_id}, {f"{field}.$id": object_id}]}
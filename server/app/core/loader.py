@@ -0,0 +1,107 @@
+from typing import Dict, List, Optional, Set, Tuple, Type
+from fastapi import HTTPException
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel
+
+# include name -> (linked model, flat id field on the row, lean summary schema)
+Relations = Dict[str, Tuple[Type[Document], str, Type[BaseModel]]]
+
+
+class EntityLoader:
+    """
+    Per-request batching loader for linked documents.
+
+    Ids are queued from every row on the page first, then each model is
+    resolved with a single `$in` query. Ids are deduplicated per model, so two
+    relations pointing at the same collection still share one query.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Type[Document], Set] = {}
+        self._schemas: Dict[Type[Document], Type[BaseModel]] = {}
+        self._loaded: Dict[Type[Document], Dict] = {}
+
+    def queue(self, model: Type[Document], schema: Type[BaseModel], ref_id) -> None:
+        if ref_id is None:
+            return
+        self._schemas[model] = schema
+        ref_id = str(ref_id)
+        if ref_id not in self._loaded.get(model, {}):
+            self._pending.setdefault(model, set()).add(ref_id)
+
+    async def load(self) -> None:
+        pending, self._pending = self._pending, {}
+        for model, ids in pending.items():
+            schema = self._schemas[model]
+            # Lean projection: only the columns the summary schema exposes
+            projection = {field: 1 for field in schema.model_fields if field != "id"}
+            object_ids = [PydanticObjectId(ref_id) for ref_id in ids]
+            cursor = model.get_motor_collection().find({"_id": {"$in": object_ids}}, projection)
+            loaded = self._loaded.setdefault(model, {})
+            async for raw in cursor:
+                raw["id"] = str(raw.pop("_id"))
+                loaded[raw["id"]] = schema(**raw).model_dump()
+
+    def get(self, model: Type[Document], ref_id) -> Optional[dict]:
+        if ref_id is None:
+            return None
+        return self._loaded.get(model, {}).get(str(ref_id))
+
+
+def parse_include(include: Optional[str], relations: Relations) -> List[str]:
+    """Split `include=company,contact` and reject names the endpoint doesn't support."""
+    if not include:
+        return []
+    names = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in names if name not in relations]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported include: {', '.join(unknown)}. Allowed: {', '.join(relations)}",
+        )
+    return names
+
+
+def include_id_fields(include: Optional[str], relations: Relations) -> List[str]:
+    """Flat id fields a projected query must keep so `include=` can still resolve them."""
+    return [relations[name][1] for name in parse_include(include, relations)]
+
+
+async def expand_includes(
+    rows: List[dict],
+    include: Optional[str],
+    relations: Relations,
+    loader: EntityLoader,
+) -> List[dict]:
+    """Embed the requested linked entities into already-built response rows."""
+    names = parse_include(include, relations)
+    if not names or not rows:
+        return rows
+
+    for name in names:
+        model, id_field, schema = relations[name]
+        for row in rows:
+            loader.queue(model, schema, row.get(id_field))
+
+    await loader.load()
+
+    for name in names:
+        model, id_field, _ = relations[name]
+        for row in rows:
+            row[name] = loader.get(model, row.get(id_field))
+    return rows
+
+
+def include_transform(include: Optional[str], relations: Relations):
+    """
+    Per-chunk include expansion for streamed responses, or None if nothing to embed.
+
+    The include names are validated here, before the response starts, and each
+    chunk gets a fresh loader so memory stays bounded by the chunk.
+    """
+    if not parse_include(include, relations):
+        return None
+
+    async def transform(rows: List[dict]) -> List[dict]:
+        return await expand_includes(rows, include, relations, EntityLoader())
+    return transform
@@ -0,0 +1,55 @@
+"""
+Keyset (cursor) pagination.
+
+A cursor holds the sort key of the last row of a page, and the next page is a
+range query from there on the same index, so page 50 costs what page 1 does
+(unlike skip, which walks every row it skips). Cursors are opaque to clients.
+"""
+import base64
+from typing import List, Optional, Sequence, Tuple
+
+from bson import json_util
+from fastapi import HTTPException
+from pymongo import DESCENDING
+
+Sort = Sequence[Tuple[str, int]]
+
+
+def encode_cursor(values: list) -> str:
+    # Extended JSON keeps datetimes and ObjectIds typed across the round trip
+    return base64.urlsafe_b64encode(json_util.dumps(values).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        values = json_util.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def after_cursor(sort: Sort, values: list) -> dict:
+    """
+    Match the rows that come after `values` in `sort` order.
+
+    For sort (a, b, c) that is: a past x, or a == x and b past y, or a == x,
+    b == y and c past z. The last sort field must be unique (normally _id).
+    """
+    if len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    clauses = []
+    for index, (field, direction) in enumerate(sort):
+        clause = {name: value for (name, _), value in zip(sort[:index], values[:index])}
+        clause[field] = {"$lt" if direction == DESCENDING else "$gt": values[index]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def cursor_page(rows: List[dict], limit: int, sort: Sort) -> Tuple[List[dict], Optional[str]]:
+    """Split `limit + 1` fetched rows into the page and the cursor for the next one (None on the last page)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor([rows[-1].get(field) for field, _ in sort])
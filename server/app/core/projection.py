@@ -0,0 +1,133 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type, get_args
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel
+from bson import ObjectId, DBRef, Binary
+from bson.binary import UUID_SUBTYPE
+from bson.errors import InvalidId
+from uuid import UUID
+
+
+def _is_embedded(annotation: Any) -> bool:
+    candidates = get_args(annotation) or (annotation,)
+    return any(isinstance(c, type) and issubclass(c, BaseModel) for c in candidates)
+
+
+def selectable_fields(schema: Type[BaseModel]) -> List[str]:
+    """Plain columns of a response schema; embedded summaries only come from `include=`."""
+    return [name for name, field in schema.model_fields.items() if not _is_embedded(field.annotation)]
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Split `fields=name,domain` and reject names the response schema doesn't have."""
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    allowed = selectable_fields(schema)
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}",
+        )
+    return names
+
+
+def mongo_projection(fields: List[str]) -> Dict[str, int]:
+    """Mongo projection for the requested response fields (`id` maps to `_id`, which is always returned)."""
+    projection = {}
+    for name in fields:
+        if name == "id":
+            continue
+        projection[name] = 1
+        if name.endswith("_id"):
+            # Legacy documents may only carry the Link (DBRef) the flat id was derived from
+            projection[name[:-3]] = 1
+    return projection
+
+
+def to_jsonable(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, DBRef):
+        return str(value.id)
+    if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE:
+        return str(value.as_uuid())
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_jsonable(v) for v in value]
+    return value
+
+
+def project_row(raw: dict, fields: List[str], id_key: str = "_id") -> dict:
+    """
+    Turn a projected raw Mongo document into a response row holding only `fields`.
+
+    The id is keyed `id_key`: `_id` like the by-alias serialization of the
+    full response models, `id` for endpoints with `response_model_by_alias=False`.
+    """
+    row = {id_key: str(raw["_id"])}
+    for name in fields:
+        if name == "id":
+            continue
+        value = raw.get(name)
+        if value is None and name.endswith("_id"):
+            value = raw.get(name[:-3])
+        row[name] = to_jsonable(value)
+    return row
+
+
+def projected_response(payload: Any) -> JSONResponse:
+    """Send projected rows as-is; the full response model would reject (or refill) the missing fields."""
+    return JSONResponse(content=jsonable_encoder(payload))
+
+
+async def iter_projected(
+    model: Type[Document],
+    query: dict,
+    fields: List[str],
+    sort: Optional[List[Tuple[str, int]]] = None,
+    skip: int = 0,
+    limit: int = 0,
+    batch_size: int = 0,
+    id_key: str = "_id",
+) -> AsyncIterator[dict]:
+    """Iterate a projected list query lazily, one response row at a time."""
+    cursor = model.get_motor_collection().find(query, mongo_projection(fields), batch_size=batch_size)
+    if sort:
+        cursor = cursor.sort(sort)
+    cursor = cursor.skip(skip).limit(limit)
+    try:
+        async for raw in cursor:
+            yield project_row(raw, fields, id_key)
+    finally:
+        # Also runs when the consumer is cancelled (client gone), freeing the server-side cursor now
+        await cursor.close()
+
+
+async def find_projected(
+    model: Type[Document],
+    query: dict,
+    fields: List[str],
+    sort: Optional[List[Tuple[str, int]]] = None,
+    skip: int = 0,
+    limit: int = 0,
+    id_key: str = "_id",
+) -> List[dict]:
+    """Run a list query with a Mongo projection and return response rows holding only `fields`."""
+    return [row async for row in iter_projected(model, query, fields, sort, skip, limit, id_key=id_key)]
+
+
+async def get_projected(model: Type[Document], id: str, fields: List[str]) -> Optional[dict]:
+    """Projected single-document lookup; None when the document doesn't exist."""
+    try:
+        object_id = PydanticObjectId(id)
+    except (InvalidId, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail=f"Invalid id: {id}")
+    raw = await model.get_motor_collection().find_one({"_id": object_id}, mongo_projection(fields))
+    return project_row(raw, fields) if raw else None
@@ -0,0 +1,166 @@
+"""
+Task reminders, fired when an open task comes due.
+
+`reminders` holds the due dates of the open tasks due within the next
+REMINDER_HORIZON in a min-heap and sleeps until the earliest one, so nothing
+polls the tasks collection. The task handlers keep it current through
+`schedule` (create/update) and `cancel` (delete). Entries are never removed
+from the middle of the heap: `_due` maps each task to its current due date
+and a popped entry that no longer matches it is simply dropped.
+
+On start, and again whenever the horizon has been used up, the heap is
+(re)loaded with one range query on the `due_date` index. A restarted process
+therefore recovers every pending reminder by itself, plus those that came due
+in the last REMINDER_CATCH_UP seconds while it was down.
+
+Before a reminder is sent the task is read back by id, so writes this process
+didn't see (bulk updates, other processes, scripts) at worst cost a skipped
+reminder, never a wrong one. Reminders go to `reminders.sink`, an async
+callable taking the reminder dict; the default one logs it.
+"""
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from beanie import PydanticObjectId
+
+from app.core.background import start_background_task
+from app.core.config import REMINDER_HORIZON, REMINDER_CATCH_UP
+from app.core.task_due import OPEN_STATUS_QUERY, is_open
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+ReminderSink = Callable[[dict], Awaitable[None]]
+
+
+async def log_sink(reminder: dict) -> None:
+    logger.info("task %s is due (%s)", reminder["task_id"], reminder["title"])
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """A due date as Mongo stores it (naive UTC, millisecond precision), so the two compare equal."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+
+class ReminderScheduler:
+    def __init__(self, sink: ReminderSink = log_sink, horizon: float = REMINDER_HORIZON):
+        self.sink = sink
+        self.horizon = timedelta(seconds=horizon)
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due: Dict[str, datetime] = {}
+        # Due dates before this are in the heap already; later ones come with the next load
+        self._loaded_until: Optional[datetime] = None
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+        self.skipped = 0
+        self.failed = 0
+
+    async def start(self, catch_up: float = REMINDER_CATCH_UP) -> None:
+        now = datetime.utcnow()
+        await self._load(now - timedelta(seconds=catch_up), now + self.horizon)
+        self._task = start_background_task(self._run())
+
+    async def _load(self, since: datetime, until: datetime) -> None:
+        query = {"due_date": {"$gte": since, "$lt": until}, "status": OPEN_STATUS_QUERY}
+        async for raw in Task.get_motor_collection().find(query, {"due_date": 1}):
+            self._push(str(raw["_id"]), raw["due_date"])
+        self._loaded_until = until
+
+    def _push(self, task_id: str, due_date: datetime) -> None:
+        self._due[task_id] = due_date
+        heapq.heappush(self._heap, (due_date, task_id))
+        if self._heap[0] == (due_date, task_id):
+            # New earliest reminder; the run loop recomputes how long to sleep
+            self._wake.set()
+
+    def schedule(self, task: Task) -> None:
+        """Track a created or updated task; no-op unless the scheduler is running in this process."""
+        if self._loaded_until is None:
+            return
+        task_id = str(task.id)
+        due_date = _naive_utc(task.due_date) if task.due_date else None
+        if due_date is None or not is_open(task.status) or due_date >= self._loaded_until:
+            self._due.pop(task_id, None)
+        elif self._due.get(task_id) != due_date:
+            self._push(task_id, due_date)
+
+    def cancel(self, task_id) -> None:
+        self._due.pop(str(task_id), None)
+
+    async def reload(self) -> None:
+        """Rebuild the heap from the database, e.g. after a bulk update changed due dates."""
+        if self._loaded_until is None:
+            return
+        self._heap, self._due = [], {}
+        await self._load(datetime.utcnow(), datetime.utcnow() + self.horizon)
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            now = datetime.utcnow()
+            while self._heap and self._heap[0][0] <= now:
+                due_date, task_id = heapq.heappop(self._heap)
+                if self._due.get(task_id) != due_date:
+                    continue  # cancelled or rescheduled since it was pushed
+                del self._due[task_id]
+                await self._fire(task_id, due_date)
+            if now >= self._loaded_until:
+                try:
+                    await self._load(self._loaded_until, now + self.horizon)
+                except Exception:
+                    logger.exception("loading task reminders failed; retrying")
+                    await asyncio.sleep(60)
+                continue
+            next_at = min(self._heap[0][0], self._loaded_until) if self._heap else self._loaded_until
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=(next_at - now).total_seconds())
+            except asyncio.TimeoutError:
+                pass
+
+    async def _fire(self, task_id: str, due_date: datetime) -> None:
+        try:
+            task = await Task.get(PydanticObjectId(task_id))
+            if task is None or not is_open(task.status) or task.due_date is None or _naive_utc(task.due_date) != due_date:
+                self.skipped += 1
+                return
+            await self.sink({
+                "task_id": task_id,
+                "title": task.title,
+                "due_date": due_date,
+                "owner_id": task.owner_id,
+                "related_to_type": task.related_to_type,
+                "related_to_id": task.related_to_id,
+            })
+            self.fired += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("reminder failed for task %s", task_id)
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._due),
+            "next_due": min(self._due.values(), default=None),
+            "fired": self.fired,
+            "skipped": self.skipped,
+            "failed": self.failed,
+        }
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loaded_until = None
+
+
+reminders = ReminderScheduler()
@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
-from typing import Any, Union
-from jose import jwt
+from typing import Any, Optional, Union
+from jose import jwt, JWTError
 from passlib.context import CryptContext
 import os
 from dotenv import load_dotenv
@@ -29,3 +29,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+def token_subject(token: str) -> Optional[str]:
+    """Subject (user email) of a valid access token; None if it is expired, forged or not a token."""
+    if not SECRET_KEY:
+        return None
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+    except JWTError:
+        return None
+
+def bearer_subject(authorization: str) -> Optional[str]:
+    """Subject of the Bearer token in an Authorization header value; None unless it is valid."""
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    return token_subject(token)
@@ -0,0 +1,228 @@
+"""
+Deal stage history: buffered event writes plus daily rollups for analytics.
+
+Every stage transition is appended to `deal_stage_events` off the request path.
+`deal_stage_daily` holds one document per (day, from_stage, to_stage) with a
+count, the summed time spent in from_stage and a log-scale histogram of those
+durations. Conversion and time-in-stage queries only read the daily rollups,
+so their cost grows with the number of days and stage pairs, not with the
+number of events.
+
+The rollups are derived from the stored events, never incremented: after a
+batch is inserted, each day it touches is regrouped from `deal_stage_events`
+(a range scan on the `at` index) and its rollups overwritten. Rewriting a day
+is idempotent, so a retried batch doesn't count twice, and a day left stale
+by a crash between the two writes is corrected by its next flush, or by
+`rebuild_rollups` (see rebuild_stage_rollups.py).
+"""
+import bisect
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from app.core.buffered_writer import BufferedWriter
+from app.models.deal_stage_event import DealStageEvent, DealStageDaily
+
+# Upper bounds (seconds) of the time-in-stage histogram buckets: one minute to
+# roughly two years, each bucket ~19% wider than the previous one
+HISTOGRAM_BOUNDS = [60 * 2 ** (i / 4) for i in range(81)]
+
+
+def bucket_index(seconds: float) -> int:
+    return bisect.bisect_left(HISTOGRAM_BOUNDS, seconds)
+
+
+def day_of(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, moment.day)
+
+
+async def day_rollup_operations(day: datetime) -> List[UpdateOne]:
+    """One upsert per (from_stage, to_stage) setting the day's rollup to what its events add up to."""
+    pipeline = [
+        {"$match": {"at": {"$gte": day, "$lt": day + timedelta(days=1)}}},
+        {"$group": {
+            "_id": {"from": "$from_stage", "to": "$to_stage", "bucket": "$bucket"},
+            "transitions": {"$sum": 1},
+            "total_seconds": {"$sum": "$seconds_in_stage"},
+        }},
+    ]
+    rollups: Dict[tuple, dict] = {}
+    async for group in DealStageEvent.get_motor_collection().aggregate(pipeline):
+        key = (group["_id"].get("from"), group["_id"]["to"])
+        rollup = rollups.setdefault(key, {"transitions": 0, "total_seconds": 0.0, "histogram": {}})
+        rollup["transitions"] += group["transitions"]
+        rollup["total_seconds"] += group["total_seconds"]
+        if group["_id"].get("bucket") is not None:
+            rollup["histogram"][str(group["_id"]["bucket"])] = group["transitions"]
+
+    return [
+        UpdateOne(
+            {"day": day, "from_stage": from_stage, "to_stage": to_stage},
+            {"$set": rollup},
+            upsert=True,
+        )
+        for (from_stage, to_stage), rollup in rollups.items()
+    ]
+
+
+async def rollup_days(days: Iterable[datetime]) -> int:
+    """Recompute the rollups of the given days from their events; returns the rollups written."""
+    operations = []
+    for day in sorted(set(days)):
+        operations += await day_rollup_operations(day)
+    if operations:
+        await DealStageDaily.get_motor_collection().bulk_write(operations, ordered=False)
+    return len(operations)
+
+
+async def write_events(events: List[dict]) -> None:
+    try:
+        await DealStageEvent.get_motor_collection().insert_many(events, ordered=False)
+    except BulkWriteError as error:
+        # Events carry their _id from record_stage_change, so on a retried batch
+        # the ones already stored are duplicates; anything else is a real failure
+        if any(e["code"] != 11000 for e in error.details["writeErrors"]):
+            raise
+    await rollup_days(day_of(event["at"]) for event in events)
+
+
+async def rebuild_rollups(start: Optional[datetime] = None, end: Optional[datetime] = None) -> int:
+    """
+    Recompute the rollups of every day in [start, end] (default: all events).
+
+    Events written before they carried a histogram bucket get one first.
+    """
+    events = DealStageEvent.get_motor_collection()
+    match = {"at": _day_range(start, end)["day"]} if start or end else {}
+
+    legacy = {**match, "seconds_in_stage": {"$ne": None}, "bucket": {"$exists": False}}
+    async for event in events.find(legacy, {"seconds_in_stage": 1}):
+        await events.update_one(
+            {"_id": event["_id"]}, {"$set": {"bucket": bucket_index(event["seconds_in_stage"])}}
+        )
+
+    first = await events.find_one(match, {"at": 1}, sort=[("at", 1)])
+    last = await events.find_one(match, {"at": 1}, sort=[("at", -1)])
+    if first is None:
+        return 0
+    day, last_day, written = day_of(first["at"]), day_of(last["at"]), 0
+    while day <= last_day:
+        written += await rollup_days([day])
+        day += timedelta(days=1)
+    return written
+
+
+stage_events = BufferedWriter("deal_stage_events", write_events)
+
+
+async def record_stage_change(
+    deal_id,
+    from_stage: Optional[str],
+    to_stage: str,
+    at: datetime,
+    entered_at: Optional[datetime] = None,
+    owner_id: Optional[str] = None,
+) -> None:
+    """Queue a transition; `entered_at` is when the deal entered `from_stage`."""
+    seconds = (at - entered_at).total_seconds() if from_stage and entered_at else None
+    seconds = max(seconds, 0.0) if seconds is not None else None
+    await stage_events.put({
+        "_id": ObjectId(),
+        "deal_id": deal_id,
+        "from_stage": from_stage,
+        "to_stage": to_stage,
+        "at": at,
+        "seconds_in_stage": seconds,
+        "bucket": bucket_index(seconds) if seconds is not None else None,
+        "owner_id": owner_id,
+    })
+
+
+def _day_range(start: Optional[datetime], end: Optional[datetime]) -> dict:
+    match = {}
+    if start:
+        match["$gte"] = day_of(start)
+    if end:
+        match["$lt"] = day_of(end) + timedelta(days=1)
+    return {"day": match} if match else {}
+
+
+async def stage_conversion(start: Optional[datetime], end: Optional[datetime]) -> List[dict]:
+    """
+    Share of the exits from each stage that went to each other stage.
+
+    Deal creation (from_stage None) is not an exit and is left out.
+    """
+    match = {**_day_range(start, end), "from_stage": {"$ne": None}}
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": {"from": "$from_stage", "to": "$to_stage"}, "count": {"$sum": "$transitions"}}},
+    ]
+    rows = await DealStageDaily.get_motor_collection().aggregate(pipeline).to_list(None)
+
+    exits: Dict[str, int] = {}
+    for row in rows:
+        exits[row["_id"]["from"]] = exits.get(row["_id"]["from"], 0) + row["count"]
+
+    results = [
+        {
+            "from_stage": row["_id"]["from"],
+            "to_stage": row["_id"]["to"],
+            "count": row["count"],
+            "rate": row["count"] / exits[row["_id"]["from"]],
+        }
+        for row in rows
+    ]
+    return sorted(results, key=lambda r: (r["from_stage"], -r["count"]))
+
+
+def histogram_percentile(histogram: Dict[int, int], total: int, q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-th percentile (accurate to one bucket)."""
+    if not total:
+        return None
+    rank = q / 100 * total
+    seen = 0
+    for index in sorted(histogram):
+        seen += histogram[index]
+        if seen >= rank:
+            return HISTOGRAM_BOUNDS[min(index, len(HISTOGRAM_BOUNDS) - 1)]
+    return HISTOGRAM_BOUNDS[-1]
+
+
+async def time_in_stage(
+    start: Optional[datetime],
+    end: Optional[datetime],
+    percentiles: List[float],
+) -> List[dict]:
+    """Time spent in each stage before leaving it: count, mean and histogram percentiles."""
+    match = {**_day_range(start, end), "from_stage": {"$ne": None}}
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": "$from_stage",
+            "count": {"$sum": "$transitions"},
+            "total_seconds": {"$sum": "$total_seconds"},
+            "histograms": {"$push": "$histogram"},
+        }},
+    ]
+    rows = await DealStageDaily.get_motor_collection().aggregate(pipeline).to_list(None)
+
+    results = []
+    for row in rows:
+        merged: Dict[int, int] = {}
+        for histogram in row["histograms"]:
+            for index, count in (histogram or {}).items():
+                merged[int(index)] = merged.get(int(index), 0) + count
+        timed = sum(merged.values())
+        results.append({
+            "stage": row["_id"],
+            "count": row["count"],
+            "avg_seconds": row["total_seconds"] / timed if timed else None,
+            "percentiles": {
+                f"p{q:g}": histogram_percentile(merged, timed, q) for q in percentiles
+            },
+        })
+    return sorted(results, key=lambda r: r["stage"])
@@ -0,0 +1,82 @@
+import json
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Type
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.core.config import STREAM_BATCH_SIZE
+
+STREAM_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+# Query parameter shared by the streamable list endpoints
+STREAM_PATTERN = "^(json|ndjson)$"
+STREAM_DESCRIPTION = "Stream the result as JSON array chunks ('json') or newline-delimited JSON ('ndjson')"
+
+
+def schema_serializer(schema: Type[BaseModel]) -> Callable[[dict], str]:
+    """Serialize a row through its response model, the same way a normal response would."""
+    def serialize(row) -> str:
+        return schema.model_validate(row).model_dump_json(by_alias=True)
+    return serialize
+
+
+def json_serializer(row: dict) -> str:
+    """Serialize an already-projected row as-is."""
+    return json.dumps(jsonable_encoder(row))
+
+
+async def batched(rows: AsyncIterator, size: int) -> AsyncIterator[List]:
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _encode(
+    rows: AsyncIterator,
+    serialize: Callable[[dict], str],
+    fmt: str,
+    transform: Optional[Callable[[List[dict]], Awaitable[List[dict]]]],
+    batch_size: int,
+) -> AsyncIterator[str]:
+    first = True
+    if fmt == "json":
+        yield "["
+    async for batch in batched(rows, batch_size):
+        if transform:
+            batch = await transform(batch)
+        encoded = [serialize(row) for row in batch]
+        if fmt == "ndjson":
+            yield "\n".join(encoded) + "\n"
+        else:
+            yield ("" if first else ",") + ",".join(encoded)
+        first = False
+    if fmt == "json":
+        yield "]"
+
+
+def stream_response(
+    rows: AsyncIterator,
+    serialize: Callable[[dict], str],
+    fmt: str,
+    transform: Optional[Callable[[List[dict]], Awaitable[List[dict]]]] = None,
+    batch_size: int = STREAM_BATCH_SIZE,
+) -> StreamingResponse:
+    """
+    Stream list rows as they come off the cursor instead of building the whole list first.
+
+    Rows are written in chunks of `batch_size`, so peak memory is bounded by the
+    chunk rather than the result size. `transform` runs once per chunk (e.g. to
+    resolve `include=` links with one query per chunk).
+    """
+    return StreamingResponse(
+        _encode(rows, serialize, fmt, transform, batch_size),
+        media_type=STREAM_FORMATS[fmt],
+    )
@@ -0,0 +1,97 @@
+"""
+Due-date views of an owner's open tasks, and per-day calendar counts.
+
+Day boundaries are computed in the caller's timezone and converted to the
+naive UTC datetimes `due_date` is stored as. A view is then an equality on
+`owner_id`, a range on `due_date` and a `$nin` on the closed statuses, served
+by the `owner_due_date_status` index in that order (equality, sort, range):
+the index walk already yields (due_date, _id) order, so no page needs an
+in-memory sort, and closed tasks are skipped on the index keys without
+fetching them.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import HTTPException
+from pymongo import ASCENDING
+
+# Everything else is open: the API defaults to "Todo", the UI also uses "To Do", "Blocked" etc.
+CLOSED_STATUSES = ["Done", "Completed", "Archived"]
+OPEN_STATUS_QUERY = {"$nin": CLOSED_STATUSES}
+DUE_VIEWS = ("overdue", "today", "week")
+
+DUE_SORT = [("due_date", ASCENDING), ("_id", ASCENDING)]
+
+# Longest range one calendar request may aggregate over
+CALENDAR_MAX_DAYS = 366
+
+
+def parse_timezone(name: str) -> ZoneInfo:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Unknown timezone: {name}")
+
+
+def _utc(day: date, tz: ZoneInfo) -> datetime:
+    """Naive UTC datetime of local midnight starting `day`."""
+    return datetime.combine(day, time(), tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def due_window(view: str, tz: ZoneInfo, now: Optional[datetime] = None) -> Tuple[Optional[datetime], datetime]:
+    """
+    [start, end) of `due_date` for a view; start is None for "overdue".
+
+    "overdue" is anything due before now, "today" the whole local day and
+    "week" from the start of today up to next Monday's midnight.
+    """
+    now = now or datetime.utcnow()
+    today = now.replace(tzinfo=timezone.utc).astimezone(tz).date()
+    if view == "overdue":
+        return None, now
+    if view == "today":
+        return _utc(today, tz), _utc(today + timedelta(days=1), tz)
+    return _utc(today, tz), _utc(today + timedelta(days=7 - today.weekday()), tz)
+
+
+def is_open(status: Optional[str]) -> bool:
+    return status not in CLOSED_STATUSES
+
+
+def due_query(owner_id: str, view: str, tz: ZoneInfo, now: Optional[datetime] = None) -> dict:
+    start, end = due_window(view, tz, now)
+    due_date = {"$lt": end}
+    if start is not None:
+        due_date["$gte"] = start
+    return {"owner_id": owner_id, "due_date": due_date, "status": OPEN_STATUS_QUERY}
+
+
+def calendar_pipeline(start: date, end: date, tz: ZoneInfo, owner_id: Optional[str] = None) -> List[dict]:
+    """
+    Count tasks due on each local day of [start, end], split by status.
+
+    With an owner the match is served by `owner_due_date_status`, otherwise
+    by the plain `due_date` index. Days without tasks are not returned.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    if (end - start).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"A calendar range covers at most {CALENDAR_MAX_DAYS} days")
+    match = {"due_date": {"$gte": _utc(start, tz), "$lt": _utc(end + timedelta(days=1), tz)}}
+    if owner_id:
+        match["owner_id"] = owner_id
+    day = {"format": "%Y-%m-%d", "date": "$due_date"}
+    if tz.key != "UTC":
+        day["timezone"] = tz.key
+    return [
+        {"$match": match},
+        {"$group": {"_id": {"date": {"$dateToString": day}, "status": "$status"}, "n": {"$sum": 1}}},
+        {"$group": {
+            "_id": "$_id.date",
+            "count": {"$sum": "$n"},
+            "by_status": {"$push": {"k": "$_id.status", "v": "$n"}},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {"_id": 0, "date": "$_id", "count": 1, "by_status": {"$arrayToObject": "$by_status"}}},
+    ]
@@ -0,0 +1,82 @@
+"""
+Activity timeline of one company, person, lead or deal.
+
+Notes, tasks, deals and mail threads are read in a single aggregation: the
+notes branch runs on `notes` and every other source is appended with
+`$unionWith`. Each branch filters on its own (entity, time) index, applies the
+cursor and takes at most one page before the union, so the final sort only
+ever sees `sources x (limit + 1)` rows however long the history is.
+"""
+from typing import List, Optional, Tuple
+
+from beanie import PydanticObjectId
+from pymongo import DESCENDING
+
+from app.core.links import link_query
+from app.core.pagination import after_cursor, cursor_page
+from app.models.note import Note
+
+TIMELINE_TYPES = ("company", "person", "lead", "deal")
+TIMELINE_KINDS = ("note", "task", "deal", "mail_thread")
+
+TIMELINE_SORT = [("at", DESCENDING), ("_id", DESCENDING)]
+
+# kind -> (collection, time field, projected fields)
+SOURCES = {
+    "note": ("notes", "created_at", {"title": 1, "summary": "$content", "is_pinned": 1}),
+    "task": ("tasks", "created_at", {"title": 1, "summary": "$description", "status": 1, "due_date": 1, "priority": 1}),
+    "deal": ("deals", "created_at", {"title": 1, "summary": "$description", "status": "$stage", "value": 1, "currency": 1}),
+    "mail_thread": ("lead_threads", "last_message_at", {"title": "$subject", "summary": "$snippet", "status": 1}),
+}
+
+
+def source_matches(entity_type: str, entity_id: PydanticObjectId) -> List[Tuple[str, dict]]:
+    """(kind, filter) for every source that has activity for this kind of entity."""
+    related = {"related_to_type": entity_type, "related_to_id": str(entity_id)}
+    matches = [("note", related), ("task", related)]
+    # link_query also matches deals migrate_link_ids.py hasn't given a flat id yet
+    if entity_type == "company":
+        matches.append(("deal", link_query("company", entity_id)))
+    elif entity_type == "person":
+        matches.append(("deal", link_query("contact", entity_id)))
+    elif entity_type == "lead":
+        matches.append(("mail_thread", {"lead.$id": entity_id}))
+    return matches
+
+
+def _branch(kind: str, match: dict, cursor: Optional[list], limit: int) -> list:
+    _, time_field, fields = SOURCES[kind]
+    if cursor:
+        match = {"$and": [match, after_cursor([(time_field, DESCENDING), ("_id", DESCENDING)], cursor)]}
+    return [
+        {"$match": match},
+        {"$sort": {time_field: -1, "_id": -1}},
+        {"$limit": limit + 1},
+        {"$project": {**fields, "kind": {"$literal": kind}, "at": f"${time_field}"}},
+    ]
+
+
+def timeline_pipeline(matches: List[Tuple[str, dict]], cursor: Optional[list], limit: int) -> Tuple[str, list]:
+    """(collection to aggregate on, pipeline) unioning every source."""
+    (first_kind, first_match), rest = matches[0], matches[1:]
+    pipeline = _branch(first_kind, first_match, cursor, limit)
+    for kind, match in rest:
+        pipeline.append({"$unionWith": {"coll": SOURCES[kind][0], "pipeline": _branch(kind, match, cursor, limit)}})
+    pipeline += [{"$sort": {"at": -1, "_id": -1}}, {"$limit": limit + 1}]
+    return SOURCES[first_kind][0], pipeline
+
+
+async def entity_timeline(
+    entity_type: str,
+    entity_id: PydanticObjectId,
+    kinds: Optional[List[str]] = None,
+    cursor: Optional[list] = None,
+    limit: int = 50,
+) -> Tuple[List[dict], Optional[str]]:
+    matches = [(kind, match) for kind, match in source_matches(entity_type, entity_id) if not kinds or kind in kinds]
+    if not matches:
+        return [], None
+    collection, pipeline = timeline_pipeline(matches, cursor, limit)
+    database = Note.get_motor_collection().database
+    rows = await database[collection].aggregate(pipeline).to_list(limit + 1)
+    return cursor_page(rows, limit, TIMELINE_SORT)
@@ -0,0 +1,66 @@
+from datetime import datetime
+from uuid import uuid4
+from typing import Optional, Tuple, Type, TypeVar
+from beanie import Document, PydanticObjectId
+from beanie.odm.utils.encoder import Encoder
+from bson import DBRef
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+
+DocType = TypeVar("DocType", bound=Document)
+
+
+def link_ref(doc: Optional[Document]) -> Optional[DBRef]:
+    """DBRef to store in a Link field when writing with raw `$set`."""
+    if doc is None:
+        return None
+    return DBRef(doc.get_collection_name(), doc.id)
+
+
+async def _find_and_set(model: Type[Document], id, update_data: dict, match: Optional[dict], return_document):
+    try:
+        object_id = PydanticObjectId(id)
+    except (InvalidId, ValueError, TypeError):
+        return None, None
+
+    update_data = {**update_data, "updated_at": datetime.utcnow()}
+    if model.get_settings().use_revision:
+        # Keep revision-checked writes (e.g. deal board moves) aware of this change
+        update_data["revision_id"] = uuid4()
+    values = Encoder().encode(update_data)
+    raw = await model.get_motor_collection().find_one_and_update(
+        {**(match or {}), "_id": object_id},
+        {"$set": values},
+        return_document=return_document,
+    )
+    return raw, values
+
+
+async def update_fields(model: Type[DocType], id, update_data: dict, match: Optional[dict] = None) -> Optional[DocType]:
+    """
+    Apply a partial update in one round trip and return the updated document.
+
+    Only the given fields are `$set` (plus a server-side `updated_at`), so
+    concurrent updates to different fields no longer overwrite each other the
+    way get-then-save did. `match` adds conditions to the `_id` filter.
+    Returns None if the id is invalid or nothing matched.
+    """
+    raw, _ = await _find_and_set(model, id, update_data, match, ReturnDocument.AFTER)
+    if raw is None:
+        return None
+    return model.model_validate(raw)
+
+
+async def update_fields_with_previous(
+    model: Type[DocType], id, update_data: dict, match: Optional[dict] = None
+) -> Optional[Tuple[dict, DocType]]:
+    """
+    Like `update_fields`, but also returns the raw document as it was before the write.
+
+    Still one round trip: Mongo hands back the previous document and the updated
+    one is that document with the `$set` values applied.
+    """
+    raw, values = await _find_and_set(model, id, update_data, match, ReturnDocument.BEFORE)
+    if raw is None:
+        return None
+    return raw, model.model_validate({**raw, **values})
@@ -14,7 +14,25 @@ from app.models.task import Task
 from app.models.lead import Lead
 from app.models.lead_thread import LeadThread
 from app.models.note import Note
-from app.api.endpoints import auth, companies, people, products, deals, tasks, leads, notes
+from app.models.deal_stage_event import DealStageEvent, DealStageDaily
+from app.models.cascade_job import CascadeJob
+from app.models.activity import Activity
+from app.models.audit_entry import AuditEntry
+from app.models.idempotency_record import IdempotencyRecord
+from app.api.endpoints import auth, companies, people, products, deals, tasks, leads, notes, metrics, cascade_jobs, events, timeline, activity, audit
+from app.core.compression import CompressionMiddleware
+from app.core.coalescing import CoalescingMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.admission import AdmissionMiddleware
+from app.core.deadlines import DeadlineMiddleware
+from app.core.stage_history import stage_events
+from app.core.activity import activity_log
+from app.core.audit import audit_log
+from app.core.cascade import cascade_worker
+from app.core.company_names import company_renames
+from app.core.events import change_events, EVENTS_PATH
+from app.core.reminders import reminders
+from app.core.config import REMINDERS_ENABLED
 
 load_dotenv()
 
@@ -29,6 +47,27 @@ app.include_router(deals.router, prefix="/api/deals", tags=["deals"])
 app.include_router(tasks.router, prefix="/api/tasks", tags=["tasks"])
 app.include_router(leads.router, prefix="/api/leads", tags=["leads"])
 app.include_router(notes.router, prefix="/api/notes", tags=["notes"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(cascade_jobs.router, prefix="/api/cascade-jobs", tags=["cascade-jobs"])
+app.include_router(events.router, prefix=EVENTS_PATH, tags=["events"])
+app.include_router(timeline.router, prefix="/api/timeline", tags=["timeline"])
+app.include_router(activity.router, prefix="/api/activity", tags=["activity"])
+app.include_router(audit.router, prefix="/api/audit", tags=["audit"])
+
+# Database deadline per route class; the handler is cancelled if the client disconnects
+app.add_middleware(DeadlineMiddleware)
+
+# POSTs retried with the same Idempotency-Key get the stored response instead of a second insert
+app.add_middleware(IdempotencyMiddleware)
+
+# Identical concurrent GETs share one handler run (inside compression, so followers reuse its cache)
+app.add_middleware(CoalescingMiddleware)
+
+# gzip/brotli with ETag revalidation and a cache of compressed bodies
+app.add_middleware(CompressionMiddleware)
+
+# Per-caller rate limits and a concurrency cap on expensive routes; rejects before any other work
+app.add_middleware(AdmissionMiddleware)
 
 # CORS
 app.add_middleware(
@@ -42,8 +81,9 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    database = client[os.getenv("DATABASE_NAME")]
     await init_beanie(
-        database=client[os.getenv("DATABASE_NAME")],
+        database=database,
         document_models=[
             User,
             Company,
@@ -54,8 +94,32 @@ async def startup_event():
             Lead,
             LeadThread,
             Note,
+            DealStageEvent,
+            DealStageDaily,
+            CascadeJob,
+            Activity,
+            AuditEntry,
+            IdempotencyRecord,
         ]
     )
+    # Finish cleanups a previous process left unfinished
+    await cascade_worker.recover()
+    # Live events from change streams, or from the handlers on a standalone server
+    await change_events.start(database)
+    if REMINDERS_ENABLED:
+        # Pending task reminders come back with one range query on due_date
+        await reminders.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Write out buffered events before the process exits
+    await stage_events.stop()
+    await activity_log.stop()
+    await audit_log.stop()
+    await cascade_worker.stop()
+    await company_renames.stop()
+    await change_events.stop()
+    await reminders.stop()
 
 @app.get("/")
 async def root():
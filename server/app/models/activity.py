@@ -0,0 +1,27 @@
+from typing import List, Optional
+from beanie import Document
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from datetime import datetime
+from app.core.config import ACTIVITY_RETENTION_DAYS
+
+class Activity(Document):
+    """One create/update/delete in the recent-activity feed; expires after ACTIVITY_RETENTION_DAYS."""
+    entity_type: str # company, person, product, deal, task, note, lead
+    entity_id: Optional[str] = None # None for bulk operations
+    action: str # create, update, delete
+    label: Optional[str] = None # Title/name of the entity when it changed
+    fields: Optional[List[str]] = None # Changed fields, for updates
+    affected: Optional[int] = None # Documents changed, for bulk operations
+    owner_id: Optional[str] = None
+    created_by: Optional[str] = None
+    at: datetime
+
+    class Settings:
+        name = "activity"
+        # _id is assigned when the change is recorded, so _id order is feed order
+        indexes = [
+            IndexModel([("entity_type", ASCENDING), ("_id", DESCENDING)], name="entity_type_id"),
+            IndexModel([("owner_id", ASCENDING), ("_id", DESCENDING)], name="owner_id_id"),
+            IndexModel([("created_by", ASCENDING), ("_id", DESCENDING)], name="created_by_id"),
+            IndexModel([("at", ASCENDING)], name="at_ttl", expireAfterSeconds=ACTIVITY_RETENTION_DAYS * 86400),
+        ]
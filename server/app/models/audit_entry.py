@@ -0,0 +1,26 @@
+from typing import Any, List, Optional
+from beanie import Document
+from pydantic import BaseModel
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from datetime import datetime
+
+class FieldChange(BaseModel):
+    field: str
+    old: Any = None
+    new: Any = None
+
+class AuditEntry(Document):
+    """The fields one update changed on one entity, with their old and new values."""
+    entity_type: str # company, person, product, deal, task, note, lead
+    entity_id: str
+    actor: Optional[str] = None # Email from the caller's access token; None for unauthenticated calls
+    changes: List[FieldChange] = []
+    at: datetime
+
+    class Settings:
+        name = "audit_log"
+        # _id is assigned when the change is recorded, so _id order is history order
+        indexes = [
+            IndexModel([("entity_type", ASCENDING), ("entity_id", ASCENDING), ("_id", DESCENDING)], name="entity_history"),
+            IndexModel([("actor", ASCENDING), ("_id", DESCENDING)], name="actor_history"),
+        ]
@@ -0,0 +1,29 @@
+from typing import List, Optional
+from beanie import Document
+from pydantic import BaseModel
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from datetime import datetime
+
+class CascadeStep(BaseModel):
+    collection: str
+    action: str # unlink, delete
+    processed: int = 0
+    done: bool = False
+
+class CascadeJob(Document):
+    """Cleanup of the documents that referenced a deleted company, person or lead."""
+    entity_type: str # company, person, lead
+    entity_id: str
+    status: str = "pending" # pending, running, done, failed, skipped
+    steps: List[CascadeStep] = []
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Settings:
+        name = "cascade_jobs"
+        indexes = [
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+            IndexModel([("entity_type", ASCENDING), ("entity_id", ASCENDING)], name="entity"),
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        ]
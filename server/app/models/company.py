@@ -1,8 +1,8 @@
 from typing import Optional, List
 from beanie import Document, Indexed
-from datetime import datetime
+from .timestamps import Timestamped
 
-class Company(Document):
+class Company(Timestamped, Document):
     name: Indexed(str)
     domain: Optional[str] = None
     industry: Optional[str] = None
@@ -19,8 +19,6 @@ class Company(Document):
     description: Optional[str] = None
     logo_url: Optional[str] = None
     created_by: Optional[str] = None # User UUID
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
 
     class Settings:
         name = "companies"
@@ -1,22 +1,35 @@
 from typing import Optional
-from beanie import Document, Indexed, Link
+from beanie import Document, Indexed, Link, PydanticObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from datetime import datetime
 from .company import Company
 from .person import Person
+from .timestamps import Timestamped
 
-class Deal(Document):
+class Deal(Timestamped, Document):
     title: Indexed(str)
     value: float = 0.0
     currency: str = "INR"
     stage: str = "Qualification" # Qualification, Meeting, Proposal, Negotiation, Closed Won, Closed Lost
     probability: int = 20 # percentage
+    position: Optional[float] = None # Sort order within the stage column on the board
+    stage_changed_at: Optional[datetime] = None # When the deal entered its current stage
     expected_close_date: Optional[datetime] = None
     company: Optional[Link[Company]] = None
     contact: Optional[Link[Person]] = None
+    company_id: Optional[PydanticObjectId] = None # Flat copies of the refs above for indexing/querying
+    contact_id: Optional[PydanticObjectId] = None
+    company_name: Optional[str] = None # Snapshot of company.name, kept in sync when the company is renamed
     description: Optional[str] = None
     owner_id: Optional[str] = None # User UUID
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
 
     class Settings:
         name = "deals"
+        use_revision = True # revision_id changes on every write; board moves are checked against it
+        indexes = [
+            IndexModel([("company_id", ASCENDING), ("created_at", DESCENDING)], name="company_id_created_at"),
+            IndexModel([("contact_id", ASCENDING), ("created_at", DESCENDING)], name="contact_id_created_at"),
+            # The DBRef side of link_query, so its $or stays indexed (timeline, cascades)
+            IndexModel([("company.$id", ASCENDING), ("created_at", DESCENDING)], name="company_ref_created_at"),
+            IndexModel([("contact.$id", ASCENDING), ("created_at", DESCENDING)], name="contact_ref_created_at"),
+        ]
@@ -0,0 +1,40 @@
+from typing import Dict, Optional
+from beanie import Document, PydanticObjectId
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+
+class DealStageEvent(Document):
+    """Append-only record of one deal stage transition (from_stage is None on creation)."""
+    deal_id: PydanticObjectId
+    from_stage: Optional[str] = None
+    to_stage: str
+    at: datetime
+    seconds_in_stage: Optional[float] = None # Time spent in from_stage before this transition
+    bucket: Optional[int] = None # Histogram bucket of seconds_in_stage (see stage_history.HISTOGRAM_BOUNDS)
+    owner_id: Optional[str] = None
+
+    class Settings:
+        name = "deal_stage_events"
+        indexes = [
+            IndexModel([("deal_id", ASCENDING), ("at", ASCENDING)], name="deal_id_at"),
+            IndexModel([("at", ASCENDING)], name="at"),
+        ]
+
+class DealStageDaily(Document):
+    """Per-day rollup of transitions between two stages, recomputed from the day's events as they are written."""
+    day: datetime
+    from_stage: Optional[str] = None
+    to_stage: str
+    transitions: int = 0
+    total_seconds: float = 0.0
+    histogram: Dict[str, int] = {} # Bucket index (see stage_history.HISTOGRAM_BOUNDS) -> count
+
+    class Settings:
+        name = "deal_stage_daily"
+        indexes = [
+            IndexModel(
+                [("day", ASCENDING), ("from_stage", ASCENDING), ("to_stage", ASCENDING)],
+                name="day_from_to",
+                unique=True,
+            ),
+        ]
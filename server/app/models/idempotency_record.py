@@ -0,0 +1,21 @@
+from typing import List, Optional
+from beanie import Document
+from pymongo import IndexModel, ASCENDING
+from datetime import datetime
+from app.core.config import IDEMPOTENCY_TTL
+
+class IdempotencyRecord(Document):
+    """The stored response of a POST sent with an Idempotency-Key, replayed to retries."""
+    id: str # sha256 of caller, path and key
+    request_hash: str # sha256 of the request body; a reused key with another body is refused
+    status: str = "in_progress" # in_progress, done
+    status_code: Optional[int] = None
+    headers: List[List[str]] = []
+    body: Optional[bytes] = None
+    created_at: datetime
+
+    class Settings:
+        name = "idempotency_keys"
+        indexes = [
+            IndexModel([("created_at", ASCENDING)], name="created_at_ttl", expireAfterSeconds=IDEMPOTENCY_TTL),
+        ]
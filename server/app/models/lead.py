@@ -1,8 +1,8 @@
 from typing import Optional
 from beanie import Document, Indexed
-from datetime import datetime
+from .timestamps import Timestamped
 
-class Lead(Document):
+class Lead(Timestamped, Document):
     first_name: Indexed(str)
     last_name: Indexed(str)
     email: Indexed(str)
@@ -12,8 +12,6 @@ class Lead(Document):
     status: str = "New" # New, Contacted, Qualified, Lost
     notes: Optional[str] = None
     owner_id: Optional[str] = None
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
 
     class Settings:
         name = "leads"
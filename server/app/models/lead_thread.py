@@ -1,5 +1,7 @@
 from typing import Optional
 from beanie import Document, Indexed, Link
+from pydantic import Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from datetime import datetime
 from .lead import Lead
 
@@ -8,8 +10,11 @@ class LeadThread(Document):
     subject: str
     last_message: str
     status: str = "Unread" # Unread, Replied, Closed
-    last_message_at: datetime = datetime.utcnow()
+    last_message_at: datetime = Field(default_factory=datetime.utcnow)
     snippet: Optional[str] = None
     
     class Settings:
         name = "lead_threads"
+        indexes = [
+            IndexModel([("lead.$id", ASCENDING), ("last_message_at", DESCENDING)], name="lead_last_message_at"),
+        ]
@@ -1,16 +1,36 @@
 from typing import Optional
 from beanie import Document, Indexed
-from datetime import datetime
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from .timestamps import Timestamped
 
-class Note(Document):
+class Note(Timestamped, Document):
     title: Optional[str] = None
     content: str
     is_pinned: bool = False
     related_to_type: str # company, deal, lead, person, task, product
     related_to_id: str # The ID of the related entity as string
     created_by: Optional[str] = None # User UUID
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
 
     class Settings:
         name = "notes"
+        indexes = [
+            IndexModel(
+                [("related_to_type", ASCENDING), ("related_to_id", ASCENDING), ("created_at", DESCENDING)],
+                name="related_created_at",
+            ),
+            # List order: pinned first, then newest; _id breaks created_at ties for the cursor
+            IndexModel(
+                [
+                    ("related_to_type", ASCENDING),
+                    ("related_to_id", ASCENDING),
+                    ("is_pinned", DESCENDING),
+                    ("created_at", DESCENDING),
+                    ("_id", DESCENDING),
+                ],
+                name="related_pinned_created_at",
+            ),
+            IndexModel(
+                [("is_pinned", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="pinned_created_at",
+            ),
+        ]
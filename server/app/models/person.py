@@ -1,10 +1,10 @@
 from typing import Optional
-from beanie import Document, Indexed, Link
+from beanie import Document, Indexed, Link, PydanticObjectId
 from pydantic import EmailStr
-from datetime import datetime
 from .company import Company
+from .timestamps import Timestamped
 
-class Person(Document):
+class Person(Timestamped, Document):
     first_name: str
     last_name: str
     email: Indexed(EmailStr, unique=True)
@@ -13,13 +13,14 @@ class Person(Document):
     job_title: Optional[str] = None
     department: Optional[str] = None
     company: Optional[Link[Company]] = None
+    company_id: Optional[PydanticObjectId] = None # Flat copy of company ref for indexing/querying
+    company_name: Optional[str] = None # Snapshot of company.name, kept in sync when the company is renamed
     linkedin: Optional[str] = None
     avatar_url: Optional[str] = None
     is_primary_contact: bool = False
     notes: Optional[str] = None
     created_by: Optional[str] = None # User UUID
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
 
     class Settings:
         name = "people"
+        indexes = ["company_id"]
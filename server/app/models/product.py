@@ -1,10 +1,9 @@
 from typing import Optional
-from beanie import Document, Indexed, Link
+from beanie import Document, Indexed, Link, PydanticObjectId
 from app.models.company import Company
+from app.models.timestamps import Timestamped
 
-from datetime import datetime
-
-class Product(Document):
+class Product(Timestamped, Document):
     name: Indexed(str)
     code: Indexed(str) # SKU or Product Code
     description: Optional[str] = None
@@ -12,9 +11,10 @@ class Product(Document):
     currency: str = "INR"
     category: Optional[str] = None # Software, Service, Hardware, etc.
     company: Optional[Link[Company]] = None
+    company_id: Optional[PydanticObjectId] = None # Flat copy of company ref for indexing/querying
+    company_name: Optional[str] = None # Snapshot of company.name, kept in sync when the company is renamed
     status: str = "active" # active, archived
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
 
     class Settings:
         name = "products"
+        indexes = ["company_id"]
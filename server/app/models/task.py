@@ -1,10 +1,12 @@
 from typing import Optional
 from beanie import Document, Indexed, Link
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from datetime import datetime
 from .company import Company
 from .person import Person
+from .timestamps import Timestamped
 
-class Task(Document):
+class Task(Timestamped, Document):
     title: Indexed(str)
     description: Optional[str] = None
     due_date: Optional[datetime] = None
@@ -13,8 +15,19 @@ class Task(Document):
     related_to_type: Optional[str] = None # company, deal, lead, person
     related_to_id: Optional[str] = None
     owner_id: Optional[str] = None # User UUID
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
 
     class Settings:
         name = "tasks"
+        indexes = [
+            IndexModel(
+                [("related_to_type", ASCENDING), ("related_to_id", ASCENDING), ("created_at", DESCENDING)],
+                name="related_created_at",
+            ),
+            # Per-owner due views: equality on owner, then the (due_date, _id) sort, then status
+            # so closed tasks are filtered on the index keys
+            IndexModel(
+                [("owner_id", ASCENDING), ("due_date", ASCENDING), ("_id", ASCENDING), ("status", ASCENDING)],
+                name="owner_due_date_status",
+            ),
+            IndexModel([("due_date", ASCENDING)], name="due_date"),
+        ]
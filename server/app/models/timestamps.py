@@ -0,0 +1,27 @@
+from datetime import datetime
+from beanie import before_event, Insert, Replace, Save, SaveChanges
+from pydantic import BaseModel, Field
+
+class Timestamped(BaseModel):
+    """
+    created_at / updated_at taken when the document is written.
+
+    A plain `datetime.utcnow()` default is evaluated once, when the model is
+    imported, so every document a process inserted shared one timestamp.
+    Partial updates go through `update_fields`, which stamps `updated_at` in
+    the same `$set`.
+    """
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    @before_event(Insert)
+    def stamp_insert(self):
+        now = datetime.utcnow()
+        # An explicit created_at (imports, seeding) is kept
+        if "created_at" not in self.model_fields_set:
+            self.created_at = now
+        self.updated_at = max(now, self.created_at)
+
+    @before_event(Replace, Save, SaveChanges)
+    def stamp_update(self):
+        self.updated_at = datetime.utcnow()
@@ -0,0 +1,20 @@
+from typing import List, Optional, Annotated
+from pydantic import BaseModel, ConfigDict, Field, BeforeValidator
+from datetime import datetime
+
+# Represents a PydanticObjectId as a string in the schema
+PyObjectId = Annotated[str, BeforeValidator(str)]
+
+class ActivityOut(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    entity_type: str
+    entity_id: Optional[str] = None
+    action: str
+    label: Optional[str] = None
+    fields: Optional[List[str]] = None
+    affected: Optional[int] = None
+    owner_id: Optional[str] = None
+    created_by: Optional[str] = None
+    at: datetime
+
+    model_config = ConfigDict(populate_by_name=True)
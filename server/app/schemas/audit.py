@@ -0,0 +1,21 @@
+from typing import Any, List, Optional, Annotated
+from pydantic import BaseModel, ConfigDict, Field, BeforeValidator
+from datetime import datetime
+
+# Represents a PydanticObjectId as a string in the schema
+PyObjectId = Annotated[str, BeforeValidator(str)]
+
+class FieldChangeOut(BaseModel):
+    field: str
+    old: Any = None
+    new: Any = None
+
+class AuditEntryOut(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    entity_type: str
+    entity_id: str
+    actor: Optional[str] = None
+    changes: List[FieldChangeOut]
+    at: datetime
+
+    model_config = ConfigDict(populate_by_name=True)
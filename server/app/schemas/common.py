@@ -0,0 +1,37 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+class BatchGetRequest(BaseModel):
+    ids: List[str]
+    fields: Optional[List[str]] = None
+
+class BatchGetResponse(BaseModel, Generic[T]):
+    # One entry per requested id, in request order; None where the id was not found
+    results: List[Optional[T]]
+    missing: List[str]
+
+F = TypeVar("F")
+U = TypeVar("U")
+
+class BulkUpdateRequest(BaseModel, Generic[F, U]):
+    filter: F
+    set: U
+    # Only count what the filter matches; nothing is written
+    dry_run: bool = False
+
+class BulkDeleteRequest(BaseModel, Generic[F]):
+    filter: F
+    dry_run: bool = False
+
+class BulkResult(BaseModel):
+    matched: int
+    modified: int = 0
+    deleted: int = 0
+    dry_run: bool = False
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    # Pass back as `cursor` for the next page; None on the last page
+    next_cursor: Optional[str] = None
@@ -25,6 +25,14 @@ class CompanyBase(BaseModel):
             return None
         return v
 
+class CompanySummary(BaseModel):
+    """Lean projection of a company, embedded via `include=company`."""
+    id: str
+    name: str
+    domain: Optional[str] = None
+    industry: Optional[str] = None
+    logo_url: Optional[str] = None
+
 class CompanyCreate(CompanyBase):
     pass
 
@@ -1,6 +1,8 @@
-from typing import Optional, Annotated
+from typing import List, Optional, Annotated
 from pydantic import BaseModel, Field, BeforeValidator, field_validator, ConfigDict
 from datetime import datetime
+from app.schemas.company import CompanySummary
+from app.schemas.person import PersonSummary
 
 class DealBase(BaseModel):
     title: str
@@ -8,6 +10,7 @@ class DealBase(BaseModel):
     stage: str = "Discovery" # Discovery, Proposal, Negotiation, Won, Lost
     expected_close_date: Optional[datetime] = None
     probability: int = 20
+    position: Optional[float] = None
     company_id: Optional[str] = None
     contact_id: Optional[str] = None
     description: Optional[str] = None
@@ -28,10 +31,15 @@ class DealUpdate(BaseModel):
     stage: Optional[str] = None
     expected_close_date: Optional[datetime] = None
     probability: Optional[int] = None
+    position: Optional[float] = None
     description: Optional[str] = None
 
 class DealOut(DealBase):
     id: Annotated[str, BeforeValidator(str)] = Field(alias="_id")
+    company_name: Optional[str] = None
+    company: Optional[CompanySummary] = None
+    contact: Optional[PersonSummary] = None
+    revision_id: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -39,3 +47,21 @@ class DealOut(DealBase):
         from_attributes=True,
         populate_by_name=True,
     )
+
+class DealMove(BaseModel):
+    id: str
+    # Revision the client last saw; the move is rejected if the deal changed since
+    revision_id: Optional[str]
+    stage: Optional[str] = None
+    probability: Optional[int] = None
+    position: Optional[float] = None
+
+class DealMoveRequest(BaseModel):
+    moves: List[DealMove]
+
+class DealMoveResponse(BaseModel):
+    # New state of the deals that were moved
+    updated: List[DealOut]
+    # Current state of deals whose revision no longer matched; nothing was written to them
+    conflicts: List[DealOut]
+    missing: List[str]
@@ -41,3 +41,9 @@ class LeadOut(LeadBase):
         from_attributes=True,
         populate_by_name=True,
     )
+
+class LeadBulkFilter(BaseModel):
+    status: Optional[str] = None
+    source: Optional[str] = None
+    company: Optional[str] = None
+    owner_id: Optional[str] = None
@@ -38,3 +38,13 @@ class NoteOut(NoteBase):
             }
         }
     )
+
+class NoteListItem(NoteOut):
+    # Only sent when the list is asked for it (include_content or fields)
+    content: Optional[str] = None
+
+class NoteBulkFilter(BaseModel):
+    related_to_type: Optional[str] = None
+    related_to_id: Optional[str] = None
+    is_pinned: Optional[bool] = None
+    created_by: Optional[str] = None
@@ -1,6 +1,7 @@
 from typing import Optional, Annotated
 from pydantic import BaseModel, EmailStr, Field, BeforeValidator, field_validator, ConfigDict
 from datetime import datetime
+from app.schemas.company import CompanySummary
 
 class PersonBase(BaseModel):
     first_name: str
@@ -23,6 +24,14 @@ class PersonBase(BaseModel):
             return None
         return v
 
+class PersonSummary(BaseModel):
+    """Lean projection of a person, embedded via `include=contact`."""
+    id: str
+    first_name: str
+    last_name: str
+    email: Optional[str] = None
+    job_title: Optional[str] = None
+
 class PersonCreate(PersonBase):
     pass
 
@@ -50,10 +59,12 @@ class PersonOut(BaseModel):
     job_title: Optional[str] = None
     department: Optional[str] = None
     company_id: Optional[str] = None
+    company_name: Optional[str] = None
     linkedin: Optional[str] = None
     avatar_url: Optional[str] = None
     is_primary_contact: bool = False
     notes: Optional[str] = None
+    company: Optional[CompanySummary] = None
     created_at: datetime
     updated_at: datetime
 
@@ -1,6 +1,7 @@
 from typing import Optional, Annotated
 from pydantic import BaseModel, Field, BeforeValidator, field_validator, ConfigDict
 from datetime import datetime
+from app.schemas.company import CompanySummary
 
 class ProductBase(BaseModel):
     name: str
@@ -34,6 +35,8 @@ class ProductUpdate(BaseModel):
 
 class ProductOut(ProductBase):
     id: Annotated[str, BeforeValidator(str)] = Field(alias="_id")
+    company_name: Optional[str] = None
+    company: Optional[CompanySummary] = None
     created_at: datetime
     updated_at: datetime
 
@@ -41,3 +44,9 @@ class ProductOut(ProductBase):
         from_attributes=True,
         populate_by_name=True,
     )
+
+class ProductBulkFilter(BaseModel):
+    category: Optional[str] = None
+    status: Optional[str] = None
+    currency: Optional[str] = None
+    company_id: Optional[str] = None
@@ -1,4 +1,4 @@
-from typing import Optional, Annotated
+from typing import Dict, Optional, Annotated
 from pydantic import BaseModel, Field, BeforeValidator, field_validator, ConfigDict
 from datetime import datetime
 
@@ -10,8 +10,9 @@ class TaskBase(BaseModel):
     status: str = "Todo"
     related_to_type: Optional[str] = None
     related_to_id: Optional[str] = None
+    owner_id: Optional[str] = None
 
-    @field_validator("description", "due_date", "related_to_type", "related_to_id", mode="before")
+    @field_validator("description", "due_date", "related_to_type", "related_to_id", "owner_id", mode="before")
     @classmethod
     def empty_string_to_none(cls, v):
         if v == "":
@@ -27,6 +28,7 @@ class TaskUpdate(BaseModel):
     due_date: Optional[datetime] = None
     priority: Optional[str] = None
     status: Optional[str] = None
+    owner_id: Optional[str] = None
 
 class TaskOut(TaskBase):
     id: Annotated[str, BeforeValidator(str)] = Field(alias="_id")
@@ -37,3 +39,15 @@ class TaskOut(TaskBase):
         from_attributes=True,
         populate_by_name=True,
     )
+
+class TaskBulkFilter(BaseModel):
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    related_to_type: Optional[str] = None
+    related_to_id: Optional[str] = None
+    owner_id: Optional[str] = None
+
+class TaskCalendarDay(BaseModel):
+    date: str # YYYY-MM-DD in the requested timezone
+    count: int
+    by_status: Dict[str, int]
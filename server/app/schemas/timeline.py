@@ -0,0 +1,21 @@
+from typing import Optional, Annotated
+from pydantic import BaseModel, ConfigDict, Field, BeforeValidator
+from datetime import datetime
+
+# Represents a PydanticObjectId as a string in the schema
+PyObjectId = Annotated[str, BeforeValidator(str)]
+
+class TimelineItem(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    kind: str # note, task, deal, mail_thread
+    at: datetime # created_at, or last_message_at for mail threads
+    title: Optional[str] = None
+    summary: Optional[str] = None # Note content, task/deal description, mail snippet
+    status: Optional[str] = None # Task status, deal stage, thread status
+    is_pinned: Optional[bool] = None
+    due_date: Optional[datetime] = None
+    priority: Optional[str] = None
+    value: Optional[float] = None
+    currency: Optional[str] = None
+
+    model_config = ConfigDict(populate_by_name=True)
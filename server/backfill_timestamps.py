@@ -0,0 +1,169 @@
+"""
+Online backfill: give existing documents their real `created_at`.
+
+Until the models took their timestamps at write time, `created_at` and
+`updated_at` defaulted to the moment the model module was imported, so every
+document a process inserted carries the same (too early) value. That is the
+bug's signature: a pre-pass `$group` finds the `created_at` values shared by
+at least `--min-shared` documents (optionally only those before `--before`,
+e.g. when the fix was deployed). Only documents holding one of those values,
+or no `created_at` at all, are rewritten: `created_at` is taken from the
+ObjectId (the real insert time, to the second) when the stored value is more
+than `--tolerance` seconds before it, and `updated_at` is raised to it if it
+is older. A `created_at` given explicitly on insert (imports, seeded data) is
+older than its ObjectId by design and is never touched unless it is shared.
+
+Safe to run while the API is serving traffic: each update is guarded on the
+`created_at` value that was read, so it never overwrites a newer write.
+Progress is checkpointed per collection in the `migrations` collection;
+rerunning the script resumes after the last processed _id.
+
+Usage:
+    python backfill_timestamps.py [--batch-size 1000] [--min-shared 2] [--before 2026-10-20]
+                                  [--tolerance 2] [--restart] [--dry-run]
+"""
+import asyncio
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Set
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+from app.models.user import User
+from app.models.company import Company
+from app.models.person import Person
+from app.models.product import Product
+from app.models.deal import Deal
+from app.models.task import Task
+from app.models.lead import Lead
+from app.models.note import Note
+
+MIGRATION_NAME = "timestamps"
+
+MODELS = [User, Company, Person, Product, Deal, Task, Lead, Note]
+
+
+def object_id_time(object_id) -> datetime:
+    # generation_time is aware UTC; stored timestamps are naive UTC
+    return object_id.generation_time.replace(tzinfo=None)
+
+
+async def load_checkpoint(migrations, collection: str) -> dict:
+    checkpoint = await migrations.find_one({"_id": f"{MIGRATION_NAME}:{collection}"})
+    return checkpoint or {"last_id": None, "processed": 0, "updated": 0, "done": False}
+
+
+async def save_checkpoint(migrations, collection: str, checkpoint: dict):
+    checkpoint["updated_at"] = datetime.utcnow()
+    await migrations.update_one(
+        {"_id": f"{MIGRATION_NAME}:{collection}"},
+        {"$set": checkpoint},
+        upsert=True,
+    )
+
+
+async def shared_created_at(coll, min_shared: int, before: Optional[datetime]) -> Set[datetime]:
+    """`created_at` values held by at least `min_shared` documents: the import-time defaults."""
+    match = {"created_at": {"$ne": None}}
+    if before is not None:
+        match["created_at"]["$lt"] = before
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$created_at", "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gte": min_shared}}},
+    ]
+    return {group["_id"] async for group in coll.aggregate(pipeline, allowDiskUse=True)}
+
+
+def timestamp_update(doc: dict, shared: Set[datetime], tolerance: timedelta):
+    """The UpdateOne fixing one document's timestamps, or None when they aren't the import-time default."""
+    created = object_id_time(doc["_id"])
+    stored = doc.get("created_at")
+    if stored is not None and (stored not in shared or stored >= created - tolerance):
+        return None
+    changes = {"created_at": created}
+    if doc.get("updated_at") is None or doc["updated_at"] < created:
+        changes["updated_at"] = created
+    # Guard on the value read so a concurrent API write always wins
+    return UpdateOne({"_id": doc["_id"], "created_at": stored}, {"$set": changes})
+
+
+async def backfill_collection(db, collection: str, args):
+    coll = db[collection]
+    migrations = db["migrations"]
+    batch_size, tolerance, dry_run = args.batch_size, timedelta(seconds=args.tolerance), args.dry_run
+    checkpoint = {"last_id": None, "processed": 0, "updated": 0, "done": False} if args.restart or dry_run \
+        else await load_checkpoint(migrations, collection)
+    checkpoint.pop("_id", None)
+
+    if checkpoint.get("done"):
+        print(f"{collection}: already backfilled ({checkpoint['processed']:,} docs), skipping")
+        return
+
+    shared = await shared_created_at(coll, args.min_shared, args.before)
+    print(f"{collection}: {len(shared):,} shared created_at values")
+    started = time.perf_counter()
+
+    while True:
+        # Walk by _id so every batch is an index range scan and the run can resume anywhere
+        query = {"_id": {"$gt": checkpoint["last_id"]}} if checkpoint["last_id"] else {}
+        batch = await coll.find(query, {"created_at": 1, "updated_at": 1}).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        ops = [op for op in (timestamp_update(doc, shared, tolerance) for doc in batch) if op is not None]
+        if ops and not dry_run:
+            result = await coll.bulk_write(ops, ordered=False)
+            checkpoint["updated"] += result.modified_count
+        elif dry_run:
+            checkpoint["updated"] += len(ops)
+
+        checkpoint["last_id"] = batch[-1]["_id"]
+        checkpoint["processed"] += len(batch)
+        if not dry_run:
+            await save_checkpoint(migrations, collection, checkpoint)
+
+        elapsed = time.perf_counter() - started
+        print(f"  {collection}: {checkpoint['processed']:,} scanned, {checkpoint['updated']:,} "
+              f"{'to update' if dry_run else 'updated'} ({checkpoint['processed'] / max(elapsed, 1e-9):,.0f} docs/s)")
+
+    if not dry_run:
+        checkpoint["done"] = True
+        await save_checkpoint(migrations, collection, checkpoint)
+    print(f"{collection}: done in {time.perf_counter() - started:.1f}s")
+
+
+async def backfill(args):
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    db = client[os.getenv("DATABASE_NAME")]
+
+    # Builds the time-ordered indexes declared on the models
+    await init_beanie(database=db, document_models=MODELS)
+
+    for model in MODELS:
+        await backfill_collection(db, model.get_collection_name(), args)
+
+    client.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill created_at/updated_at from ObjectId timestamps.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per batch / bulk_write")
+    parser.add_argument("--min-shared", type=int, default=2,
+                        help="Documents that must share a created_at value for it to count as the import-time default")
+    parser.add_argument("--before", type=datetime.fromisoformat, default=None,
+                        help="Only fix created_at values before this UTC time (ISO), e.g. when the fix was deployed")
+    parser.add_argument("--tolerance", type=float, default=2.0,
+                        help="Seconds created_at may precede the ObjectId time before it is replaced")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved checkpoints and rescan from the start")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the documents that would be updated")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(backfill(parse_args()))
@@ -0,0 +1,54 @@
+"""
+Consistency check for the denormalized `company_name` on people, deals and
+products: reports every snapshot that differs from its company's current name
+and, with --fix, rewrites them.
+
+Also serves as the backfill after deploying the field: documents linked before
+it existed have no snapshot yet and are reported (and fixed) as mismatches.
+
+Usage:
+    python check_company_names.py [--fix] [--batch-size 500]
+"""
+import asyncio
+import argparse
+import os
+import time
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from dotenv import load_dotenv
+
+from app.models.company import Company
+from app.models.person import Person
+from app.models.product import Product
+from app.models.deal import Deal
+from app.core.company_names import check_company_names
+
+
+async def run(args):
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    await init_beanie(database=client[os.getenv("DATABASE_NAME")], document_models=[Company, Person, Product, Deal])
+
+    started = time.perf_counter()
+    report = await check_company_names(fix=args.fix, batch_size=args.batch_size)
+    for collection, entry in report.items():
+        line = f"{collection}: {entry['mismatched']:,} mismatched"
+        if args.fix:
+            line += f", {entry['fixed']:,} fixed"
+        print(line)
+        if entry["sample_company_ids"]:
+            print(f"  e.g. companies {', '.join(entry['sample_company_ids'][:5])}")
+    print(f"done in {time.perf_counter() - started:.1f}s")
+
+    client.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check (and fix) company_name snapshots against companies.")
+    parser.add_argument("--fix", action="store_true", help="Rewrite mismatched snapshots")
+    parser.add_argument("--batch-size", type=int, default=500, help="Companies checked per batch")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,152 @@
+"""
+Online migration: backfill flat `company_id` / `contact_id` ObjectId fields
+from the legacy Link (DBRef) fields on people, deals and products.
+
+Safe to run while the API is serving traffic: the endpoints already write
+both the Link and the flat id, and the backfill only fills documents that do
+not have the flat field yet, so it never overwrites a newer write. Progress is
+checkpointed per collection in the `migrations` collection; rerunning the
+script resumes after the last processed _id.
+
+Until the backfill has finished, `company_id` / `contact_id` filters only
+see documents that have already been migrated.
+
+Usage:
+    python migrate_link_ids.py [--batch-size 1000] [--restart] [--unset-links]
+"""
+import asyncio
+import argparse
+import os
+import time
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+from app.models.company import Company
+from app.models.person import Person
+from app.models.product import Product
+from app.models.deal import Deal
+
+MIGRATION_NAME = "link_ids"
+
+# collection -> [(link field, flat id field)]
+TARGETS = {
+    Person.Settings.name: [("company", "company_id")],
+    Product.Settings.name: [("company", "company_id")],
+    Deal.Settings.name: [("company", "company_id"), ("contact", "contact_id")],
+}
+
+
+def dbref_id(value):
+    """Return the ObjectId inside a DBRef (or a {$ref, $id} dict), else None."""
+    if value is None:
+        return None
+    if hasattr(value, 'id'):
+        return value.id
+    if isinstance(value, dict):
+        return value.get('$id')
+    return None
+
+
+async def load_checkpoint(migrations, collection: str) -> dict:
+    checkpoint = await migrations.find_one({"_id": f"{MIGRATION_NAME}:{collection}"})
+    return checkpoint or {"last_id": None, "processed": 0, "updated": 0, "done": False}
+
+
+async def save_checkpoint(migrations, collection: str, checkpoint: dict):
+    checkpoint["updated_at"] = datetime.utcnow()
+    await migrations.update_one(
+        {"_id": f"{MIGRATION_NAME}:{collection}"},
+        {"$set": checkpoint},
+        upsert=True,
+    )
+
+
+async def backfill_collection(db, collection: str, fields: list, batch_size: int, restart: bool):
+    coll = db[collection]
+    migrations = db["migrations"]
+    checkpoint = {"last_id": None, "processed": 0, "updated": 0, "done": False} if restart \
+        else await load_checkpoint(migrations, collection)
+    checkpoint.pop("_id", None)
+
+    if checkpoint.get("done"):
+        print(f"{collection}: already migrated ({checkpoint['processed']:,} docs), skipping")
+        return
+
+    projection = {link: 1 for link, _ in fields}
+    projection.update({flat: 1 for _, flat in fields})
+    started = time.perf_counter()
+
+    while True:
+        # Walk by _id so every batch is an index range scan and the run can resume anywhere
+        query = {"_id": {"$gt": checkpoint["last_id"]}} if checkpoint["last_id"] else {}
+        batch = await coll.find(query, projection).sort("_id", 1).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+
+        ops = []
+        for doc in batch:
+            for link, flat in fields:
+                ref = dbref_id(doc.get(link))
+                if ref is not None and doc.get(flat) is None:
+                    # Guard on the flat field so a concurrent API write always wins
+                    ops.append(UpdateOne({"_id": doc["_id"], flat: None}, {"$set": {flat: ref}}))
+
+        if ops:
+            result = await coll.bulk_write(ops, ordered=False)
+            checkpoint["updated"] += result.modified_count
+
+        checkpoint["last_id"] = batch[-1]["_id"]
+        checkpoint["processed"] += len(batch)
+        await save_checkpoint(migrations, collection, checkpoint)
+
+        elapsed = time.perf_counter() - started
+        print(f"  {collection}: {checkpoint['processed']:,} scanned, {checkpoint['updated']:,} updated "
+              f"({checkpoint['processed'] / max(elapsed, 1e-9):,.0f} docs/s)")
+
+    checkpoint["done"] = True
+    await save_checkpoint(migrations, collection, checkpoint)
+    print(f"{collection}: done in {time.perf_counter() - started:.1f}s")
+
+
+async def unset_links(db, collection: str, fields: list):
+    """Drop the legacy DBRef fields once every document carries the flat id."""
+    for link, flat in fields:
+        result = await db[collection].update_many(
+            {link: {"$ne": None}, flat: {"$ne": None}},
+            {"$set": {link: None}},
+        )
+        print(f"{collection}: cleared {result.modified_count:,} legacy '{link}' refs")
+
+
+async def migrate(args):
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    db = client[os.getenv("DATABASE_NAME")]
+
+    # Builds the new company_id / contact_id indexes declared on the models
+    await init_beanie(database=db, document_models=[Company, Person, Product, Deal])
+
+    for collection, fields in TARGETS.items():
+        await backfill_collection(db, collection, fields, args.batch_size, args.restart)
+
+    if args.unset_links:
+        for collection, fields in TARGETS.items():
+            await unset_links(db, collection, fields)
+
+    client.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill company_id/contact_id from legacy DBRef links.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per batch / bulk_write")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved checkpoints and rescan from the start")
+    parser.add_argument("--unset-links", action="store_true",
+                        help="After the backfill, clear the legacy DBRef fields that have a flat id")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate(parse_args()))
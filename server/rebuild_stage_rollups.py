@@ -0,0 +1,46 @@
+"""
+Rebuild the daily deal stage rollups (`deal_stage_daily`) from the event log
+(`deal_stage_events`).
+
+Each day in the range is regrouped from its events and its rollups
+overwritten, so the script is safe to rerun and to run while the API is
+serving traffic. Use it after restoring events, or to repair days a crash
+left stale between an event insert and its rollup.
+
+Usage:
+    python rebuild_stage_rollups.py [--start 2026-01-01] [--end 2026-01-31]
+"""
+import asyncio
+import argparse
+import os
+import time
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from beanie import init_beanie
+from dotenv import load_dotenv
+
+from app.models.deal_stage_event import DealStageEvent, DealStageDaily
+from app.core.stage_history import rebuild_rollups
+
+
+async def run(args):
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
+    await init_beanie(database=client[os.getenv("DATABASE_NAME")], document_models=[DealStageEvent, DealStageDaily])
+
+    started = time.perf_counter()
+    written = await rebuild_rollups(args.start, args.end)
+    print(f"{written:,} rollups written in {time.perf_counter() - started:.1f}s")
+
+    client.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Recompute deal stage rollups from the stage event log.")
+    parser.add_argument("--start", type=datetime.fromisoformat, default=None, help="First day to rebuild (UTC, ISO)")
+    parser.add_argument("--end", type=datetime.fromisoformat, default=None, help="Last day to rebuild (UTC, ISO)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
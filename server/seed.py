@@ -1,14 +1,29 @@
 import asyncio
+import argparse
+import hashlib
+import random
+import struct
+import time
+from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
+from bson import ObjectId, DBRef
 import os
 from dotenv import load_dotenv
 
 from app.models.user import User
 from app.models.company import Company
 from app.models.person import Person
+from app.models.product import Product
+from app.models.deal import Deal
+from app.models.task import Task
+from app.models.lead import Lead
+from app.models.lead_thread import LeadThread
+from app.models.note import Note
 from app.core.security import get_password_hash
 
+ALL_MODELS = [User, Company, Person, Product, Deal, Task, Lead, LeadThread, Note]
+
 async def seed_data():
     load_dotenv()
     client = AsyncIOMotorClient(os.getenv("MONGODB_URL"))
@@ -52,10 +67,383 @@ async def seed_data():
             last_name="Rivera",
             email="alex@acme.com",
             job_title="CTO",
-            company=company
+            company=company,
+            company_id=company.id
         )
         await person.insert()
         print("Person created.")
 
+
+# ---------------------------------------------------------------------------
+# Bulk synthetic data generator (load testing)
+# ---------------------------------------------------------------------------
+
+# Documents generated per company; everything scales off --companies.
+RATIOS = {
+    "users": 0.002,
+    "companies": 1,
+    "people": 5,
+    "products": 0.5,
+    "deals": 2,
+    "tasks": 3,
+    "notes": 4,
+    "leads": 2,
+    "lead_threads": 3,
+}
+
+# Insert order matters only for readability of progress output; every link is
+# derived from indexes, so no kind has to wait for another to be inserted.
+KINDS = ["users", "companies", "people", "products", "deals", "tasks", "notes", "leads", "lead_threads"]
+
+# Distinct 3-byte tag per kind so generated ObjectIds never collide across collections
+KIND_TAGS = {kind: i + 1 for i, kind in enumerate(KINDS)}
+
+COLLECTIONS = {
+    "users": User.Settings.name,
+    "companies": Company.Settings.name,
+    "people": Person.Settings.name,
+    "products": Product.Settings.name,
+    "deals": Deal.Settings.name,
+    "tasks": Task.Settings.name,
+    "notes": Note.Settings.name,
+    "leads": Lead.Settings.name,
+    "lead_threads": LeadThread.Settings.name,
+}
+
+FIRST_NAMES = ["Alex", "Priya", "Rahul", "Maria", "John", "Aisha", "Wei", "Sofia", "Arjun", "Emma",
+               "Liam", "Fatima", "Noah", "Ananya", "Lucas", "Meera", "Omar", "Chloe", "Vikram", "Hana"]
+LAST_NAMES = ["Rivera", "Sharma", "Patel", "Garcia", "Smith", "Khan", "Chen", "Rossi", "Iyer", "Brown",
+              "Müller", "Nair", "Kim", "Silva", "Das", "Novak", "Haddad", "Tanaka", "Reddy", "Lopez"]
+COMPANY_WORDS = ["Acme", "Globex", "Initech", "Umbrella", "Stark", "Wayne", "Hooli", "Vandelay",
+                 "Soylent", "Cyberdyne", "Tyrell", "Wonka", "Gringotts", "Nakatomi", "Oscorp"]
+COMPANY_SUFFIXES = ["Corp", "Labs", "Systems", "Industries", "Solutions", "Group", "Technologies", "Ltd"]
+INDUSTRIES = ["Software", "Manufacturing", "Finance", "Healthcare", "Retail", "Logistics", "Education", "Energy"]
+COMPANY_SIZES = ["1-10", "11-50", "51-200", "201-500", "500+"]
+CITIES = [("Austin", "USA"), ("Bengaluru", "India"), ("Berlin", "Germany"), ("Chennai", "India"),
+          ("London", "UK"), ("Mumbai", "India"), ("Singapore", "Singapore"), ("Toronto", "Canada")]
+JOB_TITLES = ["CTO", "CEO", "VP Sales", "Engineering Manager", "Procurement Lead", "Analyst", "Director"]
+DEPARTMENTS = ["Engineering", "Sales", "Finance", "Operations", "Marketing", "IT"]
+PRODUCT_CATEGORIES = ["Software", "Service", "Hardware", "Subscription", "Support"]
+DEAL_STAGES = ["Qualification", "Meeting", "Proposal", "Negotiation", "Closed Won", "Closed Lost"]
+# Funnel shape: most deals sit early in the pipeline
+DEAL_STAGE_WEIGHTS = [35, 25, 15, 10, 8, 7]
+TASK_PRIORITIES = ["Low", "Medium", "High", "Urgent"]
+TASK_STATUSES = ["Todo", "In Progress", "Completed", "Archived"]
+LEAD_SOURCES = ["Website", "Referral", "Cold Call", "LinkedIn"]
+LEAD_STATUSES = ["New", "Contacted", "Qualified", "Lost"]
+THREAD_STATUSES = ["Unread", "Replied", "Closed"]
+RELATED_TYPES = ["company", "person", "deal"]
+SUBJECTS = ["Requirement Discussion", "Pricing Inquiry", "Demo Follow-up", "Contract Review", "Onboarding"]
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut "
+         "labore et dolore magna aliqua proposal pricing renewal meeting follow up budget timeline").split()
+
+
+def uniform(seed: int, key: str, i: int) -> float:
+    """Deterministic uniform [0, 1) value for (seed, key, index), independent of generation order."""
+    digest = hashlib.blake2b(f"{seed}:{key}:{i}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def skewed_index(u: float, n: int, skew: float = 2.0) -> int:
+    """Map a uniform value to [0, n) so that low indexes are picked far more often (a few big accounts)."""
+    return min(n - 1, int(n * (u ** skew)))
+
+
+class Generator:
+    """Builds documents for any (kind, index) purely from the seed, so batches can run in any order."""
+
+    def __init__(self, seed: int, counts: dict, end: datetime, days: int, password_hash: str):
+        self.seed = seed
+        self.counts = counts
+        self.end = end
+        self.span = timedelta(days=days).total_seconds()
+        self.password_hash = password_hash
+
+    def created_at(self, kind: str, i: int) -> datetime:
+        # Index order == time order, so _id order and created_at order agree
+        n = max(self.counts[kind], 1)
+        return self.end - timedelta(seconds=self.span * (1 - i / n))
+
+    def oid(self, kind: str, i: int) -> ObjectId:
+        # created_at values are naive UTC, so don't let .timestamp() apply the local offset
+        ts = int((self.created_at(kind, i) - datetime(1970, 1, 1)).total_seconds())
+        return ObjectId(struct.pack(">I", ts) + KIND_TAGS[kind].to_bytes(3, "big") + (i % 2 ** 40).to_bytes(5, "big"))
+
+    def pick(self, key: str, i: int, kind: str, skew: float = 2.0) -> int:
+        return skewed_index(uniform(self.seed, key, i), self.counts[kind], skew)
+
+    def person_company(self, i: int) -> int:
+        return self.pick("person.company", i, "companies")
+
+    def owner_id(self, rng: random.Random) -> str:
+        return str(self.oid("users", rng.randrange(self.counts["users"])))
+
+    def words(self, rng: random.Random, lo: int, hi: int) -> str:
+        return " ".join(rng.choices(WORDS, k=rng.randint(lo, hi)))
+
+    def build(self, kind: str, i: int, rng: random.Random) -> dict:
+        created = self.created_at(kind, i)
+        updated = created + timedelta(seconds=rng.randint(0, 86400 * 30))
+        if updated > self.end:
+            updated = self.end
+        doc = getattr(self, f"build_{kind}")(i, rng)
+        doc["_id"] = self.oid(kind, i)
+        if kind == "lead_threads":
+            doc["last_message_at"] = updated
+        else:
+            doc["created_at"] = created
+            doc["updated_at"] = updated
+        return doc
+
+    def build_users(self, i, rng):
+        return {
+            "email": f"user{i}@relpro.io",
+            "password_hash": self.password_hash,
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "is_active": rng.random() > 0.05,
+        }
+
+    def build_companies(self, i, rng):
+        name = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)} {i}"
+        domain = f"{name.lower().replace(' ', '-')}.com"
+        city, country = rng.choice(CITIES)
+        return {
+            "name": name,
+            "domain": domain,
+            "industry": rng.choice(INDUSTRIES),
+            "company_size": rng.choices(COMPANY_SIZES, weights=[30, 30, 20, 12, 8])[0],
+            "address_street": f"{rng.randint(1, 999)} Main St",
+            "address_city": city,
+            "address_state": None,
+            "address_country": country,
+            "address_postal_code": f"{rng.randint(10000, 99999)}",
+            "phone": f"+1-555-{rng.randint(1000000, 9999999)}",
+            "email": f"info@{domain}",
+            "website": f"https://{domain}",
+            "linkedin": None,
+            "description": self.words(rng, 10, 60),
+            "logo_url": None,
+            "created_by": self.owner_id(rng),
+        }
+
+    def build_people(self, i, rng):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        company = self.oid("companies", self.person_company(i))
+        return {
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first.lower()}.{last.lower()}.{i}@example.com",
+            "phone": f"+1-555-{rng.randint(1000000, 9999999)}",
+            "mobile": None,
+            "job_title": rng.choice(JOB_TITLES),
+            "department": rng.choice(DEPARTMENTS),
+            "company": DBRef(COLLECTIONS["companies"], company),
+            "company_id": company,
+            "linkedin": None,
+            "avatar_url": None,
+            "is_primary_contact": rng.random() < 0.2,
+            "notes": self.words(rng, 0, 40) or None,
+            "created_by": self.owner_id(rng),
+        }
+
+    def build_products(self, i, rng):
+        company = self.oid("companies", self.pick("product.company", i, "companies", skew=1.5))
+        return {
+            "name": f"{rng.choice(PRODUCT_CATEGORIES)} Plan {i}",
+            "code": f"SKU-{i:08d}",
+            "description": self.words(rng, 5, 30),
+            "price": round(rng.lognormvariate(7, 1.2), 2),
+            "currency": "INR",
+            "category": rng.choice(PRODUCT_CATEGORIES),
+            "company": DBRef(COLLECTIONS["companies"], company),
+            "company_id": company,
+            "status": "active" if rng.random() < 0.85 else "archived",
+        }
+
+    def build_deals(self, i, rng):
+        # Deals hang off a contact; the company is that contact's employer
+        contact = self.pick("deal.contact", i, "people", skew=1.5)
+        person = self.oid("people", contact)
+        company = self.oid("companies", self.person_company(contact))
+        created = self.created_at("deals", i)
+        return {
+            "title": f"{rng.choice(SUBJECTS)} #{i}",
+            "value": round(rng.lognormvariate(10, 1.5), 2),
+            "currency": "INR",
+            "stage": rng.choices(DEAL_STAGES, weights=DEAL_STAGE_WEIGHTS)[0],
+            "probability": rng.choice([10, 20, 40, 60, 80, 100]),
+            "expected_close_date": created + timedelta(days=rng.randint(7, 180)),
+            "company": DBRef(COLLECTIONS["companies"], company),
+            "contact": DBRef(COLLECTIONS["people"], person),
+            "company_id": company,
+            "contact_id": person,
+            "description": self.words(rng, 5, 40),
+            "owner_id": self.owner_id(rng),
+        }
+
+    def related(self, key: str, i: int, rng: random.Random):
+        related_type = rng.choice(RELATED_TYPES)
+        kind = {"company": "companies", "person": "people", "deal": "deals"}[related_type]
+        return related_type, str(self.oid(kind, self.pick(key, i, kind)))
+
+    def build_tasks(self, i, rng):
+        related_type, related_id = self.related("task.related", i, rng)
+        created = self.created_at("tasks", i)
+        return {
+            "title": f"Follow up {i}",
+            "description": self.words(rng, 0, 30) or None,
+            "due_date": created + timedelta(days=rng.randint(-3, 30)) if rng.random() < 0.8 else None,
+            "priority": rng.choices(TASK_PRIORITIES, weights=[20, 50, 22, 8])[0],
+            "status": rng.choices(TASK_STATUSES, weights=[40, 20, 35, 5])[0],
+            "related_to_type": related_type,
+            "related_to_id": related_id,
+            "owner_id": self.owner_id(rng),
+        }
+
+    def build_notes(self, i, rng):
+        related_type, related_id = self.related("note.related", i, rng)
+        return {
+            "title": f"Note {i}" if rng.random() < 0.6 else None,
+            "content": self.words(rng, 10, 200),
+            "is_pinned": rng.random() < 0.05,
+            "related_to_type": related_type,
+            "related_to_id": related_id,
+            "created_by": self.owner_id(rng),
+        }
+
+    def build_leads(self, i, rng):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        return {
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first.lower()}.{last.lower()}.lead{i}@example.org",
+            "phone": f"+91-{rng.randint(7000000000, 9999999999)}",
+            "company": f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}",
+            "source": rng.choice(LEAD_SOURCES),
+            "status": rng.choices(LEAD_STATUSES, weights=[40, 30, 15, 15])[0],
+            "notes": self.words(rng, 0, 30) or None,
+            "owner_id": self.owner_id(rng),
+        }
+
+    def build_lead_threads(self, i, rng):
+        lead = self.oid("leads", self.pick("thread.lead", i, "leads", skew=1.5))
+        return {
+            "lead": DBRef(COLLECTIONS["leads"], lead),
+            "subject": rng.choice(SUBJECTS),
+            "last_message": self.words(rng, 3, 12),
+            "status": rng.choice(THREAD_STATUSES),
+            "snippet": self.words(rng, 8, 25),
+        }
+
+
+async def bulk_worker(db, generator: Generator, jobs: asyncio.Queue, inserted: dict, errors: list):
+    while True:
+        job = await jobs.get()
+        if job is None:
+            jobs.task_done()
+            return
+        kind, start, stop = job
+        try:
+            # One RNG per batch keeps output identical regardless of worker scheduling
+            rng = random.Random(f"{generator.seed}:{kind}:{start}")
+            docs = [generator.build(kind, i, rng) for i in range(start, stop)]
+            await db[COLLECTIONS[kind]].insert_many(docs, ordered=False)
+            inserted[kind] += len(docs)
+        except Exception as e:
+            # Keep going so one bad batch (e.g. duplicates from a previous run) doesn't stall the queue
+            errors.append((kind, start, e))
+            print(f"ERROR: {kind}[{start}:{stop}] {e}")
+        finally:
+            jobs.task_done()
+
+
+async def report_progress(inserted: dict, total: int, started: float, interval: float = 5.0):
+    while True:
+        await asyncio.sleep(interval)
+        done = sum(inserted.values())
+        elapsed = time.perf_counter() - started
+        print(f"  {done:,}/{total:,} docs  {done / elapsed:,.0f} docs/s")
+
+
+async def bulk_seed(args):
+    load_dotenv()
+    client = AsyncIOMotorClient(os.getenv("MONGODB_URL"), maxPoolSize=max(args.workers * 2, 10))
+    db = client[os.getenv("DATABASE_NAME")]
+
+    counts = {kind: max(int(args.companies * ratio), 1) for kind, ratio in RATIOS.items()}
+    total = sum(counts.values())
+    print(f"Generating {total:,} documents (seed={args.seed}, workers={args.workers}, batch={args.batch_size})")
+    for kind in KINDS:
+        print(f"  {kind}: {counts[kind]:,}")
+
+    if args.drop:
+        for kind in KINDS:
+            await db.drop_collection(COLLECTIONS[kind])
+        print("Dropped existing collections.")
+
+    # init_beanie builds every model index; deferring it lets the load run without index maintenance
+    if not args.skip_indexes:
+        await init_beanie(database=db, document_models=ALL_MODELS)
+
+    generator = Generator(
+        seed=args.seed,
+        counts=counts,
+        end=datetime.fromisoformat(args.end_date),
+        days=args.days,
+        password_hash=get_password_hash("password123"),
+    )
+
+    jobs: asyncio.Queue = asyncio.Queue(maxsize=args.workers * 4)
+    inserted = {kind: 0 for kind in KINDS}
+    errors: list = []
+    started = time.perf_counter()
+    workers = [asyncio.create_task(bulk_worker(db, generator, jobs, inserted, errors)) for _ in range(args.workers)]
+    reporter = asyncio.create_task(report_progress(inserted, total, started))
+
+    for kind in KINDS:
+        kind_started = time.perf_counter()
+        for start in range(0, counts[kind], args.batch_size):
+            await jobs.put((kind, start, min(start + args.batch_size, counts[kind])))
+        await jobs.join()
+        elapsed = time.perf_counter() - kind_started
+        print(f"{kind}: {inserted[kind]:,} docs in {elapsed:.1f}s ({inserted[kind] / elapsed:,.0f} docs/s)")
+
+    for _ in workers:
+        await jobs.put(None)
+    await asyncio.gather(*workers)
+    reporter.cancel()
+
+    elapsed = time.perf_counter() - started
+    print(f"Loaded {sum(inserted.values()):,} docs in {elapsed:.1f}s ({sum(inserted.values()) / elapsed:,.0f} docs/s)")
+    if errors:
+        print(f"{len(errors)} batches failed; rerun with --drop for a clean load")
+
+    if args.skip_indexes:
+        index_started = time.perf_counter()
+        await init_beanie(database=db, document_models=ALL_MODELS)
+        print(f"Built indexes in {time.perf_counter() - index_started:.1f}s")
+
+    client.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Seed the CRM database.")
+    parser.add_argument("--bulk", action="store_true", help="Generate synthetic load-test data instead of the demo records")
+    parser.add_argument("--companies", type=int, default=10_000, help="Number of companies; other kinds scale from RATIOS")
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed; the same seed always produces the same data")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many call")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent insert workers")
+    parser.add_argument("--skip-indexes", action="store_true", help="Build indexes after the load instead of before")
+    parser.add_argument("--drop", action="store_true", help="Drop the target collections before loading")
+    parser.add_argument("--end-date", default="2025-01-01", help="Newest created_at in the generated data (ISO date)")
+    parser.add_argument("--days", type=int, default=730, help="How many days of history to spread documents over")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(seed_data())
+    args = parse_args()
+    if args.bulk:
+        asyncio.run(bulk_seed(args))
+    else:
+        asyncio.run(seed_data())
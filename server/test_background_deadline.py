@@ -0,0 +1,39 @@
+"""
+Background writers must not inherit the deadline of the request that started them.
+
+Run with `python -m pytest test_background_deadline.py` or `python test_background_deadline.py`.
+"""
+import asyncio
+
+import pymongo
+from pymongo import _csot
+
+from app.core.buffered_writer import BufferedWriter
+
+
+async def writer_started_inside_a_deadline():
+    seen = []
+
+    async def flush(batch):
+        # What pymongo checks before every operation; <= 0 fails it as a timeout
+        seen.append(_csot.remaining())
+
+    writer = BufferedWriter("test", flush, flush_interval=0.05)
+    with pymongo.timeout(0.1):
+        # As a handler would: the first put() starts the writer's task
+        await writer.put({"n": 1})
+    await asyncio.sleep(0.3)  # well past the request's deadline
+    await writer.put({"n": 2})
+    await writer.stop()
+    return seen, writer.stats()
+
+
+def test_writer_flushes_after_request_deadline():
+    seen, stats = asyncio.run(writer_started_inside_a_deadline())
+    assert seen and all(remaining is None for remaining in seen), seen
+    assert stats["written"] == 2 and stats["failed"] == 0, stats
+
+
+if __name__ == "__main__":
+    test_writer_flushes_after_request_deadline()
+    print("✅ background writer runs without the request deadline")
@@ -0,0 +1,104 @@
+"""
+Cascade jobs: skipped when the entity still exists, resumed from the first unfinished step.
+
+The job and the database are in-memory fakes. Run with
+`python -m pytest test_cascade.py` or `python test_cascade.py`.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core import cascade
+from app.models.cascade_job import CascadeStep
+
+
+class FakeJob(SimpleNamespace):
+    async def save(self):
+        self.saved.append(self.status)
+
+
+def make_job(done_steps: int) -> FakeJob:
+    steps = [
+        CascadeStep(collection=model.__name__, action=action, done=index < done_steps)
+        for index, (model, action, _, _) in enumerate(cascade.CASCADE_POLICIES["company"])
+    ]
+    return FakeJob(id="job", entity_type="company", entity_id="0" * 24, status="running",
+                   steps=steps, error=None, updated_at=None, saved=[])
+
+
+async def run(job: FakeJob, entity=None, fail_at=None):
+    ran = []
+
+    async def get(entity_id):
+        return entity
+
+    async def run_step(job, index, policy, batch_size):
+        if index == fail_at:
+            raise RuntimeError("connection reset")
+        ran.append(index)
+        job.steps[index].done = True
+
+    with patch.object(cascade.ENTITY_MODELS["company"], "get", get), \
+            patch.object(cascade, "_run_step", run_step):
+        await cascade.run_job(job)
+    return ran
+
+
+def test_job_is_skipped_while_the_entity_exists():
+    job = make_job(done_steps=0)
+    assert asyncio.run(run(job, entity=object())) == []
+    assert job.status == "skipped" and job.saved == ["skipped"]
+
+
+def test_job_resumes_after_the_finished_steps():
+    job = make_job(done_steps=2)
+    assert asyncio.run(run(job)) == [2, 3, 4]
+    assert job.status == "done" and job.saved == ["running", "done"]
+
+
+def test_failed_job_keeps_its_progress_for_the_retry():
+    job = make_job(done_steps=0)
+    assert asyncio.run(run(job, fail_at=3)) == [0, 1, 2]
+    assert job.status == "failed" and job.error == "connection reset"
+
+    assert asyncio.run(run(job)) == [3, 4]
+    assert job.status == "done" and job.error is None
+
+
+def test_finished_jobs_are_not_rerun():
+    for status in ("done", "skipped"):
+        job = make_job(done_steps=0)
+        job.status = status
+        assert asyncio.run(run(job)) == [] and job.saved == []
+
+
+def test_worker_keeps_draining_after_a_lookup_error():
+    async def drain():
+        ran = []
+
+        async def get(job_id):
+            if job_id == "broken":
+                raise RuntimeError("not primary")
+            return job_id
+
+        async def run_job(job):
+            ran.append(job)
+
+        worker = cascade.CascadeWorker()
+        with patch.object(cascade.CascadeJob, "get", get), patch.object(cascade, "run_job", run_job):
+            worker.enqueue("broken")
+            worker.enqueue("next")
+            await asyncio.sleep(0.05)
+            await worker.stop()
+        return ran
+
+    assert asyncio.run(drain()) == ["next"]
+
+
+if __name__ == "__main__":
+    test_job_is_skipped_while_the_entity_exists()
+    test_job_resumes_after_the_finished_steps()
+    test_failed_job_keeps_its_progress_for_the_retry()
+    test_finished_jobs_are_not_rerun()
+    test_worker_keeps_draining_after_a_lookup_error()
+    print("✅ cascade job skip/resume")
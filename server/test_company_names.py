@@ -0,0 +1,85 @@
+"""
+Renaming a company updates its dependents and publishes one event per collection that changed.
+
+The collections are in-memory fakes: no database is needed. Run with
+`python -m pytest test_company_names.py` or `python test_company_names.py`.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from bson import ObjectId
+
+from app.core import company_names
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def update_many(self, query, update):
+        modified = 0
+        for doc in self.docs:
+            if doc["company_id"] == query["company_id"] and doc["company_name"] != query["company_name"]["$ne"]:
+                doc.update(update["$set"])
+                modified += 1
+        return SimpleNamespace(modified_count=modified)
+
+
+class FakeModel:
+    def __init__(self, name, docs):
+        self.name = name
+        self.collection = FakeCollection(docs)
+
+    def get_collection_name(self):
+        return self.name
+
+    def get_motor_collection(self):
+        return self.collection
+
+
+async def one_chunk(model, query):
+    yield query
+
+
+async def propagate(company, models):
+    published = []
+
+    async def get(company_id):
+        return company if company_id == company.id else None
+
+    with patch.object(company_names.Company, "get", get), \
+            patch.object(company_names, "DENORMALIZED_MODELS", models), \
+            patch.object(company_names, "id_chunks", one_chunk), \
+            patch.object(company_names, "publish_change", lambda model, op, **kw: published.append(model.name)):
+        changed = await company_names.propagate_company_name(company.id)
+    return changed, published
+
+
+def test_rename_publishes_only_changed_collections():
+    company = SimpleNamespace(id=ObjectId(), name="Acme Corp")
+    other = ObjectId()
+    people = [{"company_id": company.id, "company_name": "Acme"} for _ in range(3)]
+    deals = [{"company_id": company.id, "company_name": "Acme Corp"}, {"company_id": other, "company_name": "Other"}]
+    products = []
+    models = [FakeModel("people", people), FakeModel("deals", deals), FakeModel("products", products)]
+
+    changed, published = asyncio.run(propagate(company, models))
+    assert changed == 3
+    assert published == ["people"], published
+    assert all(person["company_name"] == "Acme Corp" for person in people)
+    assert deals[1]["company_name"] == "Other"
+
+
+def test_no_stale_dependents_publishes_nothing():
+    company = SimpleNamespace(id=ObjectId(), name="Acme")
+    people = [{"company_id": ObjectId(), "company_name": "Acme"}]
+
+    changed, published = asyncio.run(propagate(company, [FakeModel("people", people)]))
+    assert changed == 0 and published == []
+
+
+if __name__ == "__main__":
+    test_rename_publishes_only_changed_collections()
+    test_no_stale_dependents_publishes_nothing()
+    print("✅ company_name propagation")
@@ -0,0 +1,59 @@
+"""
+Keyset cursors survive the round trip typed, and resume right after the last row.
+
+Run with `python -m pytest test_pagination.py` or `python test_pagination.py`.
+"""
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import HTTPException
+from pymongo import ASCENDING, DESCENDING
+
+from app.core.pagination import after_cursor, cursor_page, decode_cursor, encode_cursor
+
+SORT = [("is_pinned", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]
+
+
+def test_cursor_round_trip_keeps_types():
+    values = [True, datetime(2026, 10, 19, 8, 30, 15, 123000), ObjectId()]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor, cursor
+    assert decode_cursor(cursor) == values
+
+
+def test_invalid_cursor_is_a_400():
+    for cursor in ("not a cursor", encode_cursor({"a": 1})[:-2], "e30"):  # "e30" is `{}`
+        try:
+            decode_cursor(cursor)
+        except HTTPException as error:
+            assert error.status_code == 400
+        else:
+            raise AssertionError(f"{cursor!r} was accepted")
+
+
+def test_cursor_page_points_after_the_last_row():
+    rows = [{"_id": i, "is_pinned": False, "created_at": datetime(2026, 1, 1)} for i in range(4)]
+    page, cursor = cursor_page(rows, 3, SORT)
+    assert page == rows[:3]
+    assert decode_cursor(cursor) == [False, datetime(2026, 1, 1), 2]
+    assert cursor_page(rows[:3], 3, SORT) == (rows[:3], None)
+
+
+def test_after_cursor_breaks_ties_on_later_fields():
+    assert after_cursor([("due_date", ASCENDING), ("_id", ASCENDING)], [5, 7]) == {
+        "$or": [{"due_date": {"$gt": 5}}, {"due_date": 5, "_id": {"$gt": 7}}]
+    }
+    try:
+        after_cursor(SORT, [True])
+    except HTTPException as error:
+        assert error.status_code == 400
+    else:
+        raise AssertionError("a cursor for another sort was accepted")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip_keeps_types()
+    test_invalid_cursor_is_a_400()
+    test_cursor_page_points_after_the_last_row()
+    test_after_cursor_breaks_ties_on_later_fields()
+    print("✅ cursor pagination")
@@ -0,0 +1,49 @@
+"""
+Sparse fieldset rows: only the requested fields, ids as strings, keyed like the full rows.
+
+Run with `python -m pytest test_projection.py` or `python test_projection.py`.
+"""
+import uuid
+
+from bson import DBRef, ObjectId
+from fastapi import HTTPException
+
+from app.core.projection import mongo_projection, parse_fields, project_row
+from app.schemas.deal import DealOut
+
+
+def test_project_row_keeps_only_requested_fields():
+    raw = {"_id": ObjectId(), "title": "Renewal", "value": 10.0, "revision_id": uuid.uuid4()}
+    row = project_row(raw, ["id", "title", "revision_id"])
+    assert row == {"_id": str(raw["_id"]), "title": "Renewal", "revision_id": str(raw["revision_id"])}
+
+
+def test_project_row_id_key_matches_the_endpoint():
+    raw = {"_id": ObjectId(), "status": "New"}
+    assert project_row(raw, ["status"], id_key="id") == {"id": str(raw["_id"]), "status": "New"}
+
+
+def test_project_row_falls_back_to_the_link_for_flat_ids():
+    company_id = ObjectId()
+    raw = {"_id": ObjectId(), "company": DBRef("companies", company_id)}
+    assert project_row(raw, ["company_id"])["company_id"] == str(company_id)
+    assert mongo_projection(["id", "company_id"]) == {"company_id": 1, "company": 1}
+
+
+def test_parse_fields_rejects_unknown_and_embedded_fields():
+    assert parse_fields("title, value", DealOut) == ["title", "value"]
+    assert parse_fields(None, DealOut) is None
+    try:
+        parse_fields("title,company", DealOut)
+    except HTTPException as error:
+        assert error.status_code == 400 and "company" in error.detail
+    else:
+        raise AssertionError("embedded field was accepted")
+
+
+if __name__ == "__main__":
+    test_project_row_keeps_only_requested_fields()
+    test_project_row_id_key_matches_the_endpoint()
+    test_project_row_falls_back_to_the_link_for_flat_ids()
+    test_parse_fields_rejects_unknown_and_embedded_fields()
+    print("✅ projected rows")